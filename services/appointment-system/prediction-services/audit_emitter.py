@@ -0,0 +1,309 @@
+# audit_emitter.py
+
+import asyncio
+import json
+import os
+import uuid
+from datetime import date, datetime, timezone
+from typing import Any, Callable, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # Optional speed-up; the stdlib encoder produces the same JSON
+    orjson = None
+
+AuditMessage = Tuple[Optional[bytes], bytes]  # (key, value)
+
+
+# --- Encoding ---
+
+def _json_default(obj: Any):
+    if isinstance(obj, (date, datetime)):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump() if hasattr(obj, 'model_dump') else obj.dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact JSON bytes, via orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_json_default)
+    return json.dumps(obj, default=_json_default, separators=(',', ':')).encode('utf-8')
+
+
+def encode_audit_event(service_name: str, event_name: str, status: str, trace_id: Optional[str] = None,
+                       payload: Any = None, error: Optional[dict] = None) -> bytes:
+    """Serializes one event in the StandardAuditEvent schema without building the model.
+
+    ``payload`` may be a dict or an already-validated pydantic model.
+    """
+    return dumps({
+        "eventId": uuid.uuid4(),
+        "serviceName": service_name,
+        "eventName": event_name,
+        "timestamp": datetime.now(timezone.utc),
+        "status": status,
+        "traceId": trace_id,
+        "payload": payload,
+        "error": error
+    })
+
+
+def _spool_line(key: Optional[bytes], value: bytes) -> str:
+    return json.dumps({
+        "key": key.decode('utf-8') if key is not None else None,
+        "value": value.decode('utf-8')
+    }) + "\n"
+
+
+class AuditEmitter:
+    """Ships audit events to Kafka from a background task.
+
+    ``emit`` only puts the event on a bounded in-memory queue, so request
+    handlers never wait on Kafka. A drainer task sends the queue in batches
+    (up to ``batch_size`` events, collected for at most ``linger_ms``). While
+    Kafka is unreachable, events are appended to a size-capped JSON-lines spool
+    file, which is replayed in order once the producer reconnects.
+    """
+
+    def __init__(self, topic: str, producer_factory: Callable, queue_size: int = 10000,
+                 batch_size: int = 100, linger_ms: float = 50, spool_path: Optional[str] = None,
+                 spool_max_bytes: int = 50 * 1024 * 1024, reconnect_seconds: float = 5.0):
+        self.topic = topic
+        self.producer_factory = producer_factory  # () -> unstarted AIOKafkaProducer (or a test double)
+        self.queue_size = queue_size
+        self.batch_size = max(1, batch_size)
+        self.linger_seconds = linger_ms / 1000
+        self.spool_path = spool_path
+        self.spool_max_bytes = spool_max_bytes
+        self.reconnect_seconds = reconnect_seconds
+
+        self.sent = 0
+        self.batches = 0
+        self.spooled = 0
+        self.replayed = 0
+        self.dropped = 0
+        self.send_errors = 0
+        self.last_error: Optional[str] = None
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._producer = None
+        self._task: Optional[asyncio.Task] = None
+        self._holding: List[AuditMessage] = []  # Taken off the queue but not yet sent or spooled
+
+    @property
+    def connected(self) -> bool:
+        return self._producer is not None
+
+    @property
+    def _replay_path(self) -> str:
+        return self.spool_path + ".replay"
+
+    def _spool_pending(self) -> bool:
+        if not self.spool_path:
+            return False
+        return os.path.exists(self.spool_path) or os.path.exists(self._replay_path)
+
+    # --- Request path ---
+
+    def emit(self, key: Optional[bytes], value: bytes) -> bool:
+        """Queues one event without waiting. Returns False if it was spooled or dropped instead."""
+        if self._queue is None:
+            self.dropped += 1  # Not started (e.g. the app is running without its startup hooks)
+            return False
+        try:
+            self._queue.put_nowait((key, value))
+            return True
+        except asyncio.QueueFull:
+            self._spool([(key, value)])
+            return False
+
+    # --- Lifecycle ---
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 5.0):
+        """Stops the drainer; queued events are sent if Kafka is up, otherwise spooled."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        remaining = self._holding + self._take_queued()
+        self._holding = []
+        if remaining and self._producer is not None:
+            try:
+                await asyncio.wait_for(self._send(remaining), timeout)
+                remaining = []
+            except Exception as e:
+                self.last_error = str(e)
+        self._spool(remaining)
+        await self._disconnect()
+        self._queue = None
+
+    # --- Drainer ---
+
+    async def _run(self):
+        while True:
+            if self._producer is None and not await self._connect():
+                # Kafka is down: move queued events to disk so the queue keeps accepting
+                self._spool(self._take_queued())
+                await asyncio.sleep(self.reconnect_seconds)
+                continue
+
+            try:
+                if self._spool_pending():
+                    await self._replay()
+                    continue
+                batch = await self._next_batch()
+            except Exception as e:
+                self._on_send_error(e)
+                await self._disconnect()
+                continue
+
+            try:
+                await self._send(batch)
+            except Exception as e:
+                self._on_send_error(e)
+                self._spool(batch)
+                await self._disconnect()
+            self._holding = []
+
+    async def _next_batch(self) -> List[AuditMessage]:
+        batch = self._holding = [await self._queue.get()]
+        if self._queue.qsize() < self.batch_size - 1 and self.linger_seconds > 0:
+            await asyncio.sleep(self.linger_seconds)  # Let a burst accumulate into one batch
+        batch.extend(self._take_queued(self.batch_size - 1))
+        return batch
+
+    def _take_queued(self, limit: Optional[int] = None) -> List[AuditMessage]:
+        events = []
+        while self._queue is not None and (limit is None or len(events) < limit):
+            try:
+                events.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return events
+
+    async def _send(self, batch: List[AuditMessage]):
+        # send() only appends to the producer's own batch; the futures resolve once the broker acks
+        futures = [await self._producer.send(self.topic, key=key, value=value) for key, value in batch]
+        await asyncio.gather(*futures)
+        self.sent += len(batch)
+        self.batches += 1
+
+    def _on_send_error(self, e: Exception):
+        self.send_errors += 1
+        self.last_error = str(e)
+        print(f"CRITICAL: Could not send audit events to Kafka: {e}")
+
+    # --- Connection ---
+
+    async def _connect(self) -> bool:
+        producer = self.producer_factory()
+        try:
+            await producer.start()
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"ERROR: Audit producer could not connect: {e}")
+            try:
+                await producer.stop()
+            except Exception:
+                pass
+            return False
+        self._producer = producer
+        print("Audit producer connected.")
+        return True
+
+    async def _disconnect(self):
+        producer, self._producer = self._producer, None
+        if producer is not None:
+            try:
+                await producer.stop()
+            except Exception:
+                pass
+
+    # --- Spool ---
+
+    def _spool(self, events: List[AuditMessage]):
+        """Appends events to the spool file; events past the size cap are dropped."""
+        if not events:
+            return
+        if not self.spool_path:
+            self.dropped += len(events)
+            return
+
+        size = os.path.getsize(self.spool_path) if os.path.exists(self.spool_path) else 0
+        with open(self.spool_path, 'a', encoding='utf-8') as f:
+            for key, value in events:
+                line = _spool_line(key, value)
+                if size + len(line) > self.spool_max_bytes:
+                    self.dropped += 1
+                    continue
+                f.write(line)
+                size += len(line)
+                self.spooled += 1
+
+    @staticmethod
+    def _read_spool(path: str) -> List[AuditMessage]:
+        events = []
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Partial line from a crash mid-write
+                key = record.get("key")
+                events.append((key.encode('utf-8') if key is not None else None,
+                               record["value"].encode('utf-8')))
+        return events
+
+    async def _replay(self):
+        """Sends the spool in order. A failure keeps the unsent tail for the next attempt."""
+        # Events spooled while replaying go to a fresh spool file
+        if not os.path.exists(self._replay_path):
+            os.replace(self.spool_path, self._replay_path)
+        events = self._read_spool(self._replay_path)
+        print(f"Replaying {len(events)} spooled audit events.")
+
+        for start in range(0, len(events), self.batch_size):
+            batch = events[start:start + self.batch_size]
+            try:
+                await self._send(batch)
+            except Exception:
+                tmp_path = self._replay_path + ".tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.writelines(_spool_line(key, value) for key, value in events[start:])
+                os.replace(tmp_path, self._replay_path)
+                raise
+            self.replayed += len(batch)
+        os.remove(self._replay_path)
+
+    def stats(self) -> dict:
+        spool_bytes = 0
+        if self.spool_path:
+            for path in (self.spool_path, self._replay_path):
+                if os.path.exists(path):
+                    spool_bytes += os.path.getsize(path)
+        return {
+            "connected": self.connected,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "sent": self.sent,
+            "batches": self.batches,
+            "spooled": self.spooled,
+            "replayed": self.replayed,
+            "dropped": self.dropped,
+            "send_errors": self.send_errors,
+            "spool_bytes": spool_bytes,
+            "last_error": self.last_error
+        }
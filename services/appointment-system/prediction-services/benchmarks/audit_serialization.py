@@ -0,0 +1,66 @@
+# benchmarks/audit_serialization.py
+"""
+Events/sec of building and serializing one suggest-start audit event.
+
+Compares the previous path (StandardAuditEvent(payload=request.dict()).json())
+with encode_audit_event on the validated request model, using orjson when it
+is installed and the stdlib encoder otherwise.
+
+    python benchmarks/audit_serialization.py --events 200000
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def rate(fn, n):
+    fn()  # Warm up
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return n / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=200000, help="events per variant")
+    args = parser.parse_args()
+
+    import audit_emitter
+    from audit_emitter import encode_audit_event
+    from main import AUDIT_SERVICE_NAME, EnhancedRepairRequest, StandardAuditEvent
+
+    request = EnhancedRepairRequest(
+        vehicleType="SUV", vehicleBrand="BMW", repairType="engine",
+        millage=120000, lastService="01-03-2025", vehicleModelYear=2015
+    )
+    trace_id = str(uuid.uuid4())
+
+    def model_json():
+        StandardAuditEvent(
+            eventName="PREDICTION_REQUESTED", status="INFO", traceId=trace_id, payload=request.dict()
+        ).json().encode('utf-8')
+
+    def lean():
+        encode_audit_event(AUDIT_SERVICE_NAME, "PREDICTION_REQUESTED", "INFO", trace_id, payload=request)
+
+    orjson = audit_emitter.orjson
+    results = [("pydantic .json()", rate(model_json, args.events))]
+    if orjson is not None:
+        results.append((f"lean (orjson {orjson.__version__})", rate(lean, args.events)))
+    audit_emitter.orjson = None
+    results.append(("lean (stdlib json)", rate(lean, args.events)))
+    audit_emitter.orjson = orjson
+
+    baseline = results[0][1]
+    print(f"\n{'variant':<24}{'events/sec':>14}{'speed-up':>10}")
+    for label, events_per_second in results:
+        print(f"{label:<24}{events_per_second:>14,.0f}{events_per_second / baseline:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
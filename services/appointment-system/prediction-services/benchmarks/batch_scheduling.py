@@ -0,0 +1,85 @@
+# benchmarks/batch_scheduling.py
+"""
+Joint batch scheduling vs. one suggest-start call per job.
+
+Builds a synthetic workload (existing bookings plus a batch of new repairs with
+random types and durations) on the configured workshop, then compares
+placing the batch greedily in arrival order (what repeated suggest-start calls
+do) with schedule_batch. Reports unscheduled jobs, mean start day, last end
+day and run time.
+
+    python benchmarks/batch_scheduling.py --jobs 1000 5000 --horizon 365 --capacity-scale 10
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from scheduling import build_capacity_index, list_schedule, schedule_batch
+
+
+def synthetic_workload(n_jobs, n_booked, horizon, seed=42):
+    rng = random.Random(seed)
+    origin = date(2025, 1, 1)
+    repair_types = [name for name in settings.REPAIR_REQUIREMENTS if name != "__default__"]
+    busy = []
+    for _ in range(n_booked):
+        start = origin + timedelta(days=rng.randint(-5, horizon // 3))
+        busy.append({
+            "start": start,
+            "end": start + timedelta(days=rng.randint(0, 6)),
+            "requirements": settings.REPAIR_REQUIREMENTS[rng.choice(repair_types)]
+        })
+    jobs = [(settings.REPAIR_REQUIREMENTS[rng.choice(repair_types)], rng.randint(1, 8)) for _ in range(n_jobs)]
+    return origin, busy, jobs
+
+
+def summarize(offsets, jobs, seconds):
+    durations = np.array([duration for _, duration in jobs])
+    placed = offsets >= 0
+    return {
+        "unscheduled": int((~placed).sum()),
+        "mean_start": float(offsets[placed].mean()) if placed.any() else float("nan"),
+        "last_end": int((offsets + durations - 1)[placed].max()) if placed.any() else -1,
+        "ms": 1000 * seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1000, 5000], help="batch sizes to run")
+    parser.add_argument("--booked", type=int, default=200, help="existing bookings in the schedule")
+    parser.add_argument("--horizon", type=int, default=365, help="days a job may start in")
+    parser.add_argument("--capacity-scale", type=int, default=10, help="multiply every workshop resource")
+    args = parser.parse_args()
+
+    resources = {name: count * args.capacity_scale for name, count in settings.WORKSHOP_RESOURCES.items()}
+    print(f"Workshop: {resources}")
+    print(f"\n{'jobs':>6}  {'method':<26}{'unscheduled':>12}{'mean start':>12}{'last end':>10}{'ms':>10}")
+    for n_jobs in args.jobs:
+        origin, busy, jobs = synthetic_workload(n_jobs, args.booked, args.horizon)
+        max_duration = max(duration for _, duration in jobs)
+        index = build_capacity_index(busy, origin, args.horizon + max_duration - 1, resources)
+
+        start = time.perf_counter()
+        greedy = list_schedule(index.copy(), jobs, range(len(jobs)), args.horizon)
+        rows = [("one call per job", summarize(greedy, jobs, time.perf_counter() - start))]
+
+        start = time.perf_counter()
+        offsets, rule = schedule_batch(index, jobs, args.horizon)
+        rows.append((f"batch ({rule})", summarize(offsets, jobs, time.perf_counter() - start)))
+
+        for label, r in rows:
+            print(f"{n_jobs:>6}  {label:<26}{r['unscheduled']:>12}{r['mean_start']:>12.1f}"
+                  f"{r['last_end']:>10}{r['ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# benchmarks/bench_hot_paths.py
+"""
+Micro-benchmarks of the per-request hot paths, for pytest-benchmark.
+
+Not part of the test suite (pytest.ini only collects tests/); run explicitly:
+
+    pytest benchmarks/bench_hot_paths.py --benchmark-autosave
+    pytest benchmarks/bench_hot_paths.py --benchmark-compare --benchmark-compare-fail=median:25%
+
+Cases listed in budgets.json also fail on their own when their median goes
+over the committed budget, so CI can gate on them without a saved run:
+
+    pytest benchmarks/bench_hot_paths.py -k suggest_start
+"""
+import asyncio
+import json
+import os
+from datetime import date, timedelta
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from benchmarks.service_load import configure_app, request_bodies, synthetic_active_jobs
+from synthetic_history import generate_history
+
+with open(os.path.join(os.path.dirname(__file__), "budgets.json")) as f:
+    BUDGETS_MS = json.load(f)
+
+
+def check_budget(benchmark, name):
+    """Fails ``name`` if its median is over the budget in budgets.json (skipped with --benchmark-disable)."""
+    if benchmark.stats is None:
+        return
+    median_ms = 1000 * benchmark.stats.stats.median
+    assert median_ms <= BUDGETS_MS[name], f"{name}: median {median_ms:.1f} ms over budget {BUDGETS_MS[name]} ms"
+
+
+@pytest.fixture(scope="module")
+def main():
+    import main
+    from training import EnhancedVehicleRepairModel
+
+    trainer = EnhancedVehicleRepairModel()
+    trainer.train_model(trainer.create_enhanced_features(generate_history(2000)))
+    main.model_handler.bundle = trainer.to_bundle("benchmark")
+    return main
+
+
+@pytest.fixture(scope="module")
+def requests(main):
+    return [main.EnhancedRepairRequest(**body) for body in request_bodies(100)]
+
+
+def test_predict_single(benchmark, main, requests):
+    bundle = main.model_handler.bundle
+    benchmark(main.predict_raw_durations, bundle.model, bundle.preprocessor, bundle.feature_encoder, requests[:1],
+              bundle.quantile_model)
+
+
+def test_predict_batch_100(benchmark, main, requests):
+    bundle = main.model_handler.bundle
+    benchmark(main.predict_raw_durations, bundle.model, bundle.preprocessor, bundle.feature_encoder, requests,
+              bundle.quantile_model)
+
+
+@pytest.mark.parametrize("n_jobs", [100, 1000, 10000])
+def test_build_busy_schedule(benchmark, main, n_jobs):
+    from config import settings
+    from workshop_config import WorkshopConfig
+
+    config = WorkshopConfig.build(0, settings.WORKSHOP_RESOURCES, settings.REPAIR_REQUIREMENTS, "")
+    jobs = synthetic_active_jobs(n_jobs)
+    benchmark(lambda: asyncio.run(main.build_busy_schedule(jobs, config)))
+
+
+def scheduling_base(main, n_jobs):
+    """The service's cached SchedulingBase for ``n_jobs`` synthetic active jobs, capacity scaled to fit."""
+    from config import settings
+    from workshop_config import WorkshopConfig
+
+    resources = {name: count * max(1, n_jobs // 50) for name, count in settings.WORKSHOP_RESOURCES.items()}
+    config = WorkshopConfig.build(0, resources, settings.REPAIR_REQUIREMENTS, "")
+    origin = date.today() + timedelta(days=1)
+    base = asyncio.run(main.build_scheduling_base(synthetic_active_jobs(n_jobs), config, origin))
+    return base, config, origin
+
+
+@pytest.mark.parametrize("n_jobs", [100, 1000, 10000])
+def test_capacity_index_build(benchmark, main, n_jobs):
+    """Paid once per snapshot version: the BusySchedule arrays into the shared CapacityIndex."""
+    from scheduling import build_capacity_index
+
+    base, config, origin = scheduling_base(main, n_jobs)
+    benchmark(build_capacity_index, base.schedule, origin, main.CAPACITY_BASE_DAYS, config.resources)
+
+
+@pytest.mark.parametrize("n_jobs", [100, 1000, 10000])
+def test_slot_search(benchmark, main, n_jobs):
+    """Paid per suggest-start: a window of the shared index, the holds, and the prefix-sum search."""
+    from config import settings
+
+    base, config, origin = scheduling_base(main, n_jobs)
+    engine = config.requirements_for("engine")
+    horizon = settings.SUGGEST_MAX_HORIZON_DAYS
+    held = [{"start": origin + timedelta(days=i), "end": origin + timedelta(days=i + 2), "requirements": engine}
+            for i in range(0, 50, 5)]
+
+    def search():
+        index = main.jobs_capacity_index(base, origin, horizon + 5 - 1, config)
+        index.add_jobs(held)
+        return index.find_start_offsets(engine, 5, horizon, limit=5)
+
+    assert len(search()) > 0
+    benchmark(search)
+
+
+def test_encode_audit_event(benchmark, main, requests):
+    from audit_emitter import encode_audit_event
+
+    benchmark(encode_audit_event, "prediction-service", "PREDICTION_REQUESTED", "INFO", "trace", requests[0])
+
+
+@pytest.mark.parametrize("n_jobs", [1000])
+def test_suggest_start(benchmark, main, n_jobs, tmp_path):
+    """POST /schedule/suggest-start end to end against a snapshot of ``n_jobs`` active jobs."""
+    import httpx
+
+    bodies = request_bodies(50)
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(configure_app(main, synthetic_active_jobs(n_jobs), str(tmp_path)))
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench")
+    calls = iter(range(10 ** 9))
+
+    def suggest():
+        body = bodies[next(calls) % len(bodies)]
+        response = loop.run_until_complete(
+            client.post("/schedule/suggest-start", json=body, params={"reserve": "false"})
+        )
+        assert response.status_code == 200
+        return response
+
+    try:
+        benchmark(suggest)
+    finally:
+        loop.run_until_complete(client.aclose())
+        loop.close()
+    check_budget(benchmark, f"test_suggest_start[{n_jobs}]")
@@ -0,0 +1,114 @@
+# benchmarks/model_loading.py
+"""
+Startup time and memory of loading the model: full joblib artifact vs. the
+memory-mapped serving artifact.
+
+Starts several worker processes per mode (like uvicorn --workers) that each
+load the current registry version, then reports load time, RSS and PSS (RSS
+with shared pages divided between the processes that map them).
+
+    python benchmarks/model_loading.py --jobs 20000 --workers 4
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic_history import generate_history
+
+
+def memory_kb():
+    """RSS and PSS of this process in kB (Linux)."""
+    stats = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:"):
+                stats[parts[0][:-1].lower()] = int(parts[1])
+    return stats
+
+
+def child(mmap, ready_file):
+    from config import settings
+    settings.MODEL_MMAP = mmap
+    from training import EnhancedVehicleRepairModel
+    import numpy as np
+
+    handler = EnhancedVehicleRepairModel()
+    before = memory_kb()
+    start = time.perf_counter()
+    assert handler.load_model()
+    elapsed = time.perf_counter() - start
+    # Touch every tree node once, as serving traffic eventually does
+    handler.bundle.model.predict(np.zeros((256, len(handler.bundle.feature_names)), dtype=np.float32))
+
+    # Wait until every worker has loaded so PSS reflects the shared pages
+    open(ready_file + f".{os.getpid()}", "w").close()
+    while len([f for f in os.listdir(os.path.dirname(ready_file)) if f.startswith(os.path.basename(ready_file))]) < int(os.environ["BENCH_WORKERS"]):
+        time.sleep(0.05)
+    after = memory_kb()
+    print(json.dumps({
+        "load_seconds": elapsed,
+        "rss_delta_kb": after["rss"] - before["rss"],
+        "pss_delta_kb": after["pss"] - before["pss"],
+    }))
+
+
+def run_mode(mmap, workers, tmpdir):
+    ready = os.path.join(tmpdir, f"ready-{int(mmap)}-{time.time_ns()}")
+    env = dict(os.environ, BENCH_WORKERS=str(workers))
+    procs = [
+        subprocess.Popen([sys.executable, __file__, "--child", "--mmap", str(int(mmap)), "--ready", ready],
+                         stdout=subprocess.PIPE, text=True, env=env)
+        for _ in range(workers)
+    ]
+    results = [json.loads(p.communicate()[0].strip().splitlines()[-1]) for p in procs]
+    return {
+        "load_ms": 1000 * sum(r["load_seconds"] for r in results) / workers,
+        "rss_mb": sum(r["rss_delta_kb"] for r in results) / 1024,
+        "pss_mb": sum(r["pss_delta_kb"] for r in results) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=20000, help="synthetic finished jobs to train on")
+    parser.add_argument("--workers", type=int, default=4, help="worker processes per mode")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--mmap", type=int, default=1, help=argparse.SUPPRESS)
+    parser.add_argument("--ready", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(bool(args.mmap), args.ready)
+        return
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.environ["MODEL_REGISTRY_DIR"] = os.path.join(tmpdir, "registry")
+        from config import settings
+        settings.MODEL_REGISTRY_DIR = os.environ["MODEL_REGISTRY_DIR"]
+        from training import EnhancedVehicleRepairModel
+
+        trainer = EnhancedVehicleRepairModel()
+        df = trainer.create_enhanced_features(generate_history(args.jobs))
+        trainer.train_model(df)
+        version = trainer.save_model()
+        print(f"\nModel: {type(trainer.model).__name__}, version {version}")
+        for name in ("model.joblib", "serving.joblib"):
+            path = os.path.join(settings.MODEL_REGISTRY_DIR, version, name)
+            if os.path.exists(path):
+                print(f"  {name}: {os.path.getsize(path) / 1024 / 1024:.1f} MB")
+
+        print(f"\n{'mode':<12}{'load ms/worker':>16}{'RSS MB total':>15}{'PSS MB total':>15}   ({args.workers} workers)")
+        for label, mmap in (("full", False), ("mmap", True)):
+            r = run_mode(mmap, args.workers, tmpdir)
+            print(f"{label:<12}{r['load_ms']:>16.1f}{r['rss_mb']:>15.1f}{r['pss_mb']:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
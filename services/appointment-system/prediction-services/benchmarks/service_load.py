@@ -0,0 +1,269 @@
+# benchmarks/service_load.py
+"""
+Load test of the prediction API: throughput and p50/p95/p99 latency.
+
+Runs main.py's FastAPI app in-process against a stub of the Node jobs API
+(serving a synthetic set of active jobs) and a stub Kafka producer, with a
+model trained on synthetic history. An asyncio driver keeps --concurrency
+requests in flight for each scenario:
+
+    predict        POST /predict/duration
+    predict_batch  POST /predict/duration/batch (--batch-size vehicles per call)
+    suggest        POST /schedule/suggest-start (reserve=false)
+
+Workshop capacity is scaled with the number of active jobs so suggest-start
+keeps finding slots. With --output the results are written as JSON; with
+--baseline a previous output is compared and the run fails if any p95 grew
+(or throughput dropped) by more than --max-regression.
+
+    python benchmarks/service_load.py --active-jobs 100 1000 10000 100000 --requests 2000
+    python benchmarks/service_load.py --output baseline.json
+    python benchmarks/service_load.py --baseline baseline.json --max-regression 1.25
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from synthetic_history import REPAIR_PROFILES, VEHICLE_BRANDS, VEHICLE_TYPES, generate_history
+
+SCENARIOS = ("predict", "predict_batch", "suggest")
+NODE_API_URL = "http://node-api.stub/api/appointments/active"
+
+
+# --- Stubs ---
+
+class StubKafkaProducer:
+    """Accepts every send immediately, so audit events cost only their encoding."""
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def send(self, topic, key=None, value=None):
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(None)
+        return future
+
+
+def synthetic_active_jobs(n, seed=7):
+    """Ongoing/scheduled jobs spread over the next few months; a fifth have no end date yet."""
+    rng = random.Random(seed)
+    today = date.today()
+    jobs = []
+    for i in range(n):
+        repair_type = rng.choice(list(REPAIR_PROFILES))
+        start = today + timedelta(days=rng.randint(-10, 90))
+        job = {
+            "_id": f"job-{i}",
+            "status": "Ongoing" if start <= today else "Scheduled",
+            "repairType": repair_type,
+            "vehicleType": rng.choice(list(VEHICLE_TYPES)),
+            "vehicleBrand": rng.choice(list(VEHICLE_BRANDS)),
+            "millage": rng.randint(5000, 250000),
+            "vehicleModelYear": rng.randint(2000, 2024),
+            "startDate": start.isoformat(),
+        }
+        if rng.random() >= 0.2:
+            job["endDate"] = (start + timedelta(days=REPAIR_PROFILES[repair_type][0])).isoformat()
+        jobs.append(job)
+    return jobs
+
+
+def request_bodies(n, seed=11):
+    """Distinct vehicles to cycle through; repeats exercise the prediction cache like real traffic."""
+    rng = random.Random(seed)
+    return [{
+        "vehicleType": rng.choice(list(VEHICLE_TYPES)),
+        "vehicleBrand": rng.choice(list(VEHICLE_BRANDS)),
+        "repairType": rng.choice(list(REPAIR_PROFILES)),
+        "millage": rng.randint(5000, 250000),
+        "lastService": (date.today() - timedelta(days=rng.randint(30, 700))).strftime("%d-%m-%Y"),
+        "vehicleModelYear": rng.randint(2000, 2024),
+    } for _ in range(n)]
+
+
+# --- App under test ---
+
+async def configure_app(main, active_jobs, tmpdir):
+    """Points main's globals at the stubs; returns the workshop capacity scale used."""
+    from audit_emitter import AuditEmitter
+    from config import settings
+    from job_snapshot import JobSnapshot
+    from reservations import InMemoryReservationStore
+    from workshop_config import WorkshopConfigStore
+
+    payload = json.dumps(active_jobs).encode()
+
+    def node_api(request):
+        return httpx.Response(200, content=payload, headers={"Content-Type": "application/json"})
+
+    settings.NODE_API_ALL_JOBS = NODE_API_URL
+    main.job_snapshot = JobSnapshot(NODE_API_URL, max_age_seconds=3600)
+    main.job_snapshot._client = httpx.AsyncClient(transport=httpx.MockTransport(node_api))
+    await main.job_snapshot.refresh()
+
+    scale = max(1, len(active_jobs) // 50)
+    main.workshop_config = WorkshopConfigStore(
+        os.path.join(tmpdir, f"workshop-{len(active_jobs)}.sqlite3"),
+        {name: count * scale for name, count in settings.WORKSHOP_RESOURCES.items()},
+        settings.REPAIR_REQUIREMENTS
+    )
+    main.reservation_store = InMemoryReservationStore()
+    main.availability_cache.clear()
+    main.prediction_cache.clear()
+
+    await main.audit_emitter.stop()
+    main.audit_emitter = AuditEmitter(settings.AUDIT_TOPIC, StubKafkaProducer, spool_path=None)
+    await main.audit_emitter.start()
+    return scale
+
+
+def scenario_call(name, bodies, batch_size):
+    """(method, path, kwargs) factory for the i-th request of a scenario."""
+    if name == "predict":
+        return lambda i: ("POST", "/predict/duration", {"json": bodies[i % len(bodies)]})
+    if name == "predict_batch":
+        return lambda i: ("POST", "/predict/duration/batch", {
+            "json": [bodies[(i * batch_size + j) % len(bodies)] for j in range(batch_size)]
+        })
+    return lambda i: ("POST", "/schedule/suggest-start", {
+        "json": bodies[i % len(bodies)], "params": {"reserve": "false"}
+    })
+
+
+async def drive(client, make_call, n_requests, concurrency, max_seconds=None):
+    """Keeps ``concurrency`` requests in flight until ``n_requests`` are done (or time runs out)."""
+    latencies = []
+    errors = 0
+    counter = iter(range(n_requests))
+    deadline = time.perf_counter() + max_seconds if max_seconds else float("inf")
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            if time.perf_counter() > deadline:
+                break
+            method, path, kwargs = make_call(i)
+            start = time.perf_counter()
+            response = await client.request(method, path, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    ms = 1000 * np.array(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+    }
+
+
+async def run(args, tmpdir):
+    import main
+    from training import EnhancedVehicleRepairModel
+
+    trainer = EnhancedVehicleRepairModel()
+    trainer.train_model(trainer.create_enhanced_features(generate_history(args.history)))
+    main.model_handler.bundle = trainer.to_bundle("benchmark")
+    print(f"Model: {type(trainer.model).__name__} trained on {args.history} jobs")
+
+    bodies = request_bodies(args.distinct)
+    results = []
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"\n{'active jobs':>11}  {'scenario':<14}{'requests':>9}{'req/s':>10}"
+              f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for n_active in args.active_jobs:
+            await configure_app(main, synthetic_active_jobs(n_active), tmpdir)
+            for name in args.scenarios:
+                make_call = scenario_call(name, bodies, args.batch_size)
+                n_requests = args.requests if name != "predict_batch" else max(1, args.requests // args.batch_size)
+                await drive(client, make_call, args.concurrency, args.concurrency, args.max_seconds)  # Warm up
+                r = await drive(client, make_call, n_requests, args.concurrency, args.max_seconds)
+                r.update(active_jobs=n_active, scenario=name)
+                results.append(r)
+                print(f"{n_active:>11}  {name:<14}{r['requests']:>9}{r['rps']:>10.1f}{r['p50_ms']:>10.2f}"
+                      f"{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['errors']:>8}")
+    await main.audit_emitter.stop()
+    return results
+
+
+def compare(results, baseline, max_regression):
+    """Regressions of p95 latency or throughput beyond the allowed factor."""
+    previous = {(r["active_jobs"], r["scenario"]): r for r in baseline}
+    failures = []
+    for r in results:
+        before = previous.get((r["active_jobs"], r["scenario"]))
+        if before is None:
+            continue
+        label = f"{r['scenario']} @ {r['active_jobs']} jobs"
+        if r["p95_ms"] > before["p95_ms"] * max_regression:
+            failures.append(f"{label}: p95 {before['p95_ms']:.2f} -> {r['p95_ms']:.2f} ms")
+        if r["rps"] * max_regression < before["rps"]:
+            failures.append(f"{label}: throughput {before['rps']:.1f} -> {r['rps']:.1f} req/s")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--active-jobs", type=int, nargs="+", default=[100, 1000, 10000],
+                        help="sizes of the stub Node API's active job list")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=1000, help="requests per scenario (vehicles for batch)")
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight")
+    parser.add_argument("--max-seconds", type=float, default=60,
+                        help="stop a scenario early after this long (0 = no limit)")
+    parser.add_argument("--batch-size", type=int, default=50, help="vehicles per batch call")
+    parser.add_argument("--distinct", type=int, default=500, help="distinct vehicles in the request mix")
+    parser.add_argument("--history", type=int, default=5000, help="synthetic finished jobs to train on")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against a previous --output file")
+    parser.add_argument("--max-regression", type=float, default=1.25,
+                        help="allowed p95 growth / throughput drop factor against the baseline")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        from config import settings
+        settings.WORKSHOP_CONFIG_DB = os.path.join(tmpdir, "workshop.sqlite3")
+        settings.AUDIT_SPOOL_FILE = ""
+        results = asyncio.run(run(args, tmpdir))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures = compare(results, json.load(f), args.max_regression)
+        if failures:
+            print(f"\nRegressions beyond {args.max_regression}x:")
+            for failure in failures:
+                print(f"  {failure}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.max_regression}x against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
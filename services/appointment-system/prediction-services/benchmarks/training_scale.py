@@ -0,0 +1,76 @@
+# benchmarks/training_scale.py
+"""
+Training time and memory as the job history grows.
+
+For each size, a fresh process generates that many synthetic finished jobs
+(synthetic_history.py, the same list-of-dicts shape fetch_training_data
+returns), engineers features and runs train_model. Reports the time of each
+step, the engineered frame's memory next to what it would take as object
+strings and 64-bit numbers (training_report['features']), and the process'
+peak RSS.
+
+    python benchmarks/training_scale.py --rows 10000 100000 1000000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def child(rows, seed):
+    from synthetic_history import generate_history
+    from training import EnhancedVehicleRepairModel
+
+    timings = {}
+    start = time.perf_counter()
+    jobs = generate_history(rows, seed)
+    timings["generate_s"] = time.perf_counter() - start
+
+    trainer = EnhancedVehicleRepairModel()
+    start = time.perf_counter()
+    df = trainer.create_enhanced_features(jobs)
+    timings["features_s"] = time.perf_counter() - start
+    del jobs
+
+    start = time.perf_counter()
+    ok = trainer.train_model(df)
+    timings["train_s"] = time.perf_counter() - start
+
+    features = (trainer.training_report or {}).get('features', {})
+    # ru_maxrss is in kB on Linux
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps(dict(timings, ok=bool(ok), samples=len(df), peak_rss_mb=peak_mb,
+                          frame_mb=features.get('memory_mb', 0.0),
+                          object_frame_mb=features.get('uncompacted_memory_mb', 0.0),
+                          preprocess_s=features.get('preprocess_seconds', 0.0))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        child(args.child, args.seed)
+        return
+
+    print(f"\n{'rows':>10}{'generate s':>12}{'features s':>12}{'preprocess s':>14}{'train s':>10}"
+          f"{'frame MB':>10}{'object MB':>11}{'peak RSS MB':>13}")
+    for rows in args.rows:
+        out = subprocess.run([sys.executable, __file__, "--child", str(rows), "--seed", str(args.seed)],
+                             stdout=subprocess.PIPE, text=True, check=True).stdout
+        r = json.loads(out.strip().splitlines()[-1])
+        print(f"{rows:>10}{r['generate_s']:>12.1f}{r['features_s']:>12.1f}{r['preprocess_s']:>14.2f}"
+              f"{r['train_s']:>10.1f}{r['frame_mb']:>10.0f}{r['object_frame_mb']:>11.0f}"
+              f"{r['peak_rss_mb']:>13.0f}" + ("" if r["ok"] else "  (training failed)"))
+
+
+if __name__ == "__main__":
+    main()
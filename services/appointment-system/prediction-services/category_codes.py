@@ -0,0 +1,151 @@
+# category_codes.py
+
+import sys
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+
+
+class CategoryVocabulary:
+    """Append-only category lists for the categorical training columns.
+
+    A value keeps its code once it has been seen, so engineered rows written in
+    earlier syncs and the encoder fitted on them agree on what each code means.
+    Persisted as plain lists (training store state and model artifact).
+    """
+
+    def __init__(self, categories: Optional[Dict[str, List[str]]] = None):
+        self.categories: Dict[str, List[str]] = {col: list(values) for col, values in (categories or {}).items()}
+        self._dtypes: Dict[str, pd.CategoricalDtype] = {}
+
+    def extend(self, col: str, values: Iterable[str]) -> pd.CategoricalDtype:
+        """Adds unseen ``values`` to the end of ``col``'s list and returns its dtype."""
+        known = self.categories.setdefault(col, [])
+        new = pd.Index(values).drop_duplicates().difference(known, sort=False)
+        if len(new) or col not in self._dtypes:
+            known.extend(new.tolist())
+            self._dtypes[col] = pd.CategoricalDtype(known)
+        return self._dtypes[col]
+
+    def dtype(self, col: str) -> pd.CategoricalDtype:
+        return self.extend(col, [])
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        return {col: list(values) for col, values in self.categories.items()}
+
+    @classmethod
+    def from_dict(cls, data: Optional[dict]) -> "CategoryVocabulary":
+        return cls(data or {})
+
+
+def recode(values: pd.Series, vocabulary: CategoryVocabulary, col: str, fill: str) -> pd.Categorical:
+    """``values`` lowercased (missing -> ``fill``) as a categorical in ``col``'s vocabulary.
+
+    Only the distinct values are lowercased and looked up; the rows are then
+    remapped with one integer take, so the cost no longer scales with string
+    operations per row.
+    """
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype('category')
+    names = pd.Series(values.cat.categories.astype(object), dtype=object).str.lower()
+    dtype = vocabulary.extend(col, names.dropna().tolist() + [fill])
+
+    fill_code = dtype.categories.get_loc(fill)
+    lookup = dtype.categories.get_indexer(names.fillna(fill))
+    # Append the fill code so the -1 code of missing rows maps onto it
+    lookup = np.append(lookup, fill_code)
+    codes = lookup[values.cat.codes.to_numpy()]
+    return pd.Categorical.from_codes(codes, dtype=dtype)
+
+
+def category_mask(values: pd.Categorical, members: Iterable[str]) -> np.ndarray:
+    """``values.isin(members)`` evaluated once per category instead of once per row."""
+    return values.categories.isin(list(members))[values.codes]
+
+
+# --- Encoder ---
+
+class CategoryCodeEncoder(TransformerMixin, BaseEstimator):
+    """One-hot encoder that reads pandas category codes directly.
+
+    Same output layout as ``OneHotEncoder(handle_unknown='ignore', sparse_output=False)``
+    with the categories taken from each column's dtype. Columns whose dtype
+    matches the fitted categories are encoded straight from their codes; any
+    other input (plain strings at prediction time, or a newer vocabulary) is
+    mapped onto the fitted categories first. Unknown values encode as all zeros.
+    """
+
+    handle_unknown = 'ignore'
+    drop_idx_ = None
+
+    def __init__(self, dtype=np.float64):
+        self.dtype = dtype
+
+    def fit(self, X: pd.DataFrame, y=None):
+        self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        self.n_features_in_ = len(self.feature_names_in_)
+        self.categories_ = []
+        for col in self.feature_names_in_:
+            values = X[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                categories = values.cat.categories
+            else:
+                categories = pd.Index(values.dropna().unique()).sort_values()
+            self.categories_.append(np.asarray(categories, dtype=object))
+        self._fitted_dtypes = [pd.CategoricalDtype(categories) for categories in self.categories_]
+        return self
+
+    def _codes(self, values: pd.Series, dtype: pd.CategoricalDtype) -> np.ndarray:
+        if values.dtype == dtype:
+            return values.cat.codes.to_numpy()
+        return pd.Categorical(np.asarray(values, dtype=object), dtype=dtype).codes
+
+    def transform(self, X: pd.DataFrame) -> np.ndarray:
+        if not isinstance(X, pd.DataFrame):
+            X = pd.DataFrame(X, columns=self.feature_names_in_)
+        n_outputs = sum(len(categories) for categories in self.categories_)
+        out = np.zeros((len(X), n_outputs), dtype=self.dtype)
+        rows = np.arange(len(X))
+        offset = 0
+        for col, dtype in zip(self.feature_names_in_, self._fitted_dtypes):
+            codes = self._codes(X[col], dtype)
+            known = codes >= 0
+            out[rows[known], offset + codes[known]] = 1
+            offset += len(dtype.categories)
+        return out
+
+    def get_feature_names_out(self, input_features=None) -> np.ndarray:
+        return np.asarray([f"{col}_{category}" for col, categories in zip(self.feature_names_in_, self.categories_)
+                           for category in categories], dtype=object)
+
+
+# --- Memory report ---
+
+def frame_memory_report(df: pd.DataFrame) -> dict:
+    """Deep memory of ``df`` next to what the same frame takes with object strings and 64-bit numbers.
+
+    The uncompacted figure is what ``memory_usage(deep=True)`` reports for the
+    object/int64/float64 frame, computed from per-category counts instead of by
+    materialising it.
+    """
+    compact = 0
+    uncompacted = 0
+    for col in df.columns:
+        values = df[col]
+        compact += int(values.memory_usage(index=False, deep=True))
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # A pointer per row plus the size of the string it points to (missing rows: just the pointer)
+            counts = np.bincount(values.cat.codes.to_numpy() + 1, minlength=len(values.cat.categories) + 1)
+            sizes = [0] + [sys.getsizeof(category) for category in values.cat.categories]
+            uncompacted += 8 * len(values) + int(np.dot(counts, sizes))
+        elif pd.api.types.is_numeric_dtype(values.dtype) or pd.api.types.is_datetime64_any_dtype(values.dtype):
+            uncompacted += 8 * len(values)
+        else:
+            uncompacted += int(values.memory_usage(index=False, deep=True))
+    return {
+        'rows': int(len(df)),
+        'memory_mb': compact / 2 ** 20,
+        'uncompacted_memory_mb': uncompacted / 2 ** 20
+    }
@@ -19,10 +19,88 @@ class Settings:
     # Node.js API URLs
     NODE_API_FINISHED_JOBS: str = os.getenv("NODE_API_FINISHED_JOBS", "")
     NODE_API_ALL_JOBS: str = os.getenv("NODE_API_ALL_JOBS", "")
+    # "Finished since" query parameter for incremental fetches, e.g. "finishedSince". Empty = full fetches.
+    NODE_API_FINISHED_SINCE_PARAM: str = os.getenv("NODE_API_FINISHED_SINCE_PARAM", "")
+    # Page through finished jobs with ?<page param>=1,2,...&<limit param>=<size>. 0 = one streamed request.
+    NODE_API_FINISHED_PAGE_SIZE: int = int(os.getenv("NODE_API_FINISHED_PAGE_SIZE", 0))
+    NODE_API_FINISHED_PAGE_PARAM: str = os.getenv("NODE_API_FINISHED_PAGE_PARAM", "page")
+    NODE_API_FINISHED_LIMIT_PARAM: str = os.getenv("NODE_API_FINISHED_LIMIT_PARAM", "limit")
+    # Finished jobs are parsed into typed columns this many records at a time
+    TRAINING_FETCH_CHUNK_SIZE: int = int(os.getenv("TRAINING_FETCH_CHUNK_SIZE", 50000))
+    
+    # Shared Outbound HTTP Client (see http_client.py)
+    HTTP_CLIENT_MAX_CONNECTIONS: int = int(os.getenv("HTTP_CLIENT_MAX_CONNECTIONS", 100))
+    HTTP_CLIENT_MAX_KEEPALIVE: int = int(os.getenv("HTTP_CLIENT_MAX_KEEPALIVE", 20))
+    HTTP_CLIENT_KEEPALIVE_EXPIRY: float = float(os.getenv("HTTP_CLIENT_KEEPALIVE_EXPIRY", 30))
+    HTTP_CLIENT_TIMEOUT: float = float(os.getenv("HTTP_CLIENT_TIMEOUT", 30))
+    HTTP_CLIENT_CONNECT_TIMEOUT: float = float(os.getenv("HTTP_CLIENT_CONNECT_TIMEOUT", 5))
+    HTTP_CLIENT_HTTP2: bool = os.getenv("HTTP_CLIENT_HTTP2", "false").lower() == "true"  # Needs httpx[http2]
+    
+    # Active Jobs Snapshot (see job_snapshot.py)
+    JOB_SNAPSHOT_REFRESH_SECONDS: int = int(os.getenv("JOB_SNAPSHOT_REFRESH_SECONDS", 60))
+    JOB_SNAPSHOT_MAX_AGE_SECONDS: int = int(os.getenv("JOB_SNAPSHOT_MAX_AGE_SECONDS", 300))
+    JOB_SNAPSHOT_FULL_SYNC_EVERY: int = int(os.getenv("JOB_SNAPSHOT_FULL_SYNC_EVERY", 10))
+    JOB_SNAPSHOT_KAFKA_REFRESH: bool = os.getenv("JOB_SNAPSHOT_KAFKA_REFRESH", "true").lower() == "true"
+    # Query parameter for "changed since" fetches, e.g. "updatedSince". Empty = full fetches only.
+    NODE_API_JOBS_SINCE_PARAM: str = os.getenv("NODE_API_JOBS_SINCE_PARAM", "")
     
     # Model Configuration
     MODEL_RETRAIN_HOURS: int = int(os.getenv("MODEL_RETRAIN_HOURS", 12))
-    MODEL_FILE: str = os.getenv("MODEL_FILE", "enhanced_duration_model.joblib")
+    MODEL_FILE: str = os.getenv("MODEL_FILE", "enhanced_duration_model.joblib")  # Legacy single-file artifact
+    MODEL_REGISTRY_DIR: str = os.getenv("MODEL_REGISTRY_DIR", "model_registry")
+    MODEL_REGISTRY_KEEP: int = int(os.getenv("MODEL_REGISTRY_KEEP", 5))
+    # Serve from memory-mapped flat tree arrays shared by all workers (see flat_forest.py)
+    MODEL_MMAP: bool = os.getenv("MODEL_MMAP", "true").lower() == "true"
+    # Local Parquet store of engineered training rows (see training_store.py)
+    TRAINING_STORE_ENABLED: bool = os.getenv("TRAINING_STORE_ENABLED", "true").lower() == "true"
+    TRAINING_STORE_DIR: str = os.getenv("TRAINING_STORE_DIR", "training_store")
+    # Model selection: CV folds run in parallel (-1 = all cores); 0 disables XGBoost early stopping
+    TRAINING_N_JOBS: int = int(os.getenv("TRAINING_N_JOBS", -1))
+    XGB_EARLY_STOPPING_ROUNDS: int = int(os.getenv("XGB_EARLY_STOPPING_ROUNDS", 20))
+    XGB_MAX_ESTIMATORS: int = int(os.getenv("XGB_MAX_ESTIMATORS", 300))
+    # P50/P90 duration model trained next to the point model (XGBoost quantile objective)
+    QUANTILE_MODEL_ENABLED: bool = os.getenv("QUANTILE_MODEL_ENABLED", "true").lower() == "true"
+    QUANTILE_ESTIMATORS: int = int(os.getenv("QUANTILE_ESTIMATORS", 100))
+    # Retrains: "auto" updates the current model on new jobs only, "full" always retrains from scratch
+    RETRAIN_MODE: str = os.getenv("RETRAIN_MODE", "auto").lower()
+    FULL_RETRAIN_EVERY: int = int(os.getenv("FULL_RETRAIN_EVERY", 7))  # Incremental updates between full retrains
+    INCREMENTAL_DRIFT_TOLERANCE: float = float(os.getenv("INCREMENTAL_DRIFT_TOLERANCE", 1.5))  # x baseline MSE
+    INCREMENTAL_MAX_UNSEEN_FRACTION: float = float(os.getenv("INCREMENTAL_MAX_UNSEEN_FRACTION", 0.05))
+    XGB_INCREMENTAL_ROUNDS: int = int(os.getenv("XGB_INCREMENTAL_ROUNDS", 20))
+    RF_INCREMENTAL_TREES: int = int(os.getenv("RF_INCREMENTAL_TREES", 10))
+    INFERENCE_THREADS: int = int(os.getenv("INFERENCE_THREADS", 4))
+    # /schedule/availability: short-lived cache of computed calendars, and the longest window served
+    AVAILABILITY_CACHE_TTL_SECONDS: float = float(os.getenv("AVAILABILITY_CACHE_TTL_SECONDS", 30))
+    AVAILABILITY_MAX_DAYS: int = int(os.getenv("AVAILABILITY_MAX_DAYS", 180))
+    # /schedule/suggest-start: default and maximum search horizon, and the most start dates returned
+    SUGGEST_HORIZON_DAYS: int = int(os.getenv("SUGGEST_HORIZON_DAYS", 30))
+    SUGGEST_MAX_HORIZON_DAYS: int = int(os.getenv("SUGGEST_MAX_HORIZON_DAYS", 365))
+    SUGGEST_MAX_TOP_K: int = int(os.getenv("SUGGEST_MAX_TOP_K", 20))
+    # Default for suggest-start's use_p90: book the P90 duration instead of the point estimate
+    SUGGEST_USE_P90: bool = os.getenv("SUGGEST_USE_P90", "false").lower() == "true"
+    BATCH_SCHEDULE_MAX_JOBS: int = int(os.getenv("BATCH_SCHEDULE_MAX_JOBS", 2000))  # /schedule/batch request size limit
+    PREDICT_BATCH_MAX_ITEMS: int = int(os.getenv("PREDICT_BATCH_MAX_ITEMS", 2000))  # /predict/duration/batch request size limit
+    # Suggested slots are held so concurrent suggestions do not hand out the same capacity
+    RESERVATIONS_ENABLED: bool = os.getenv("RESERVATIONS_ENABLED", "true").lower() == "true"
+    RESERVATION_HOLD_MINUTES: float = float(os.getenv("RESERVATION_HOLD_MINUTES", 10))
+    RESERVATION_CONFIRMED_HOURS: float = float(os.getenv("RESERVATION_CONFIRMED_HOURS", 24))
+    RESERVATION_MAX_RETRIES: int = int(os.getenv("RESERVATION_MAX_RETRIES", 3))
+    RESERVATION_REDIS_URL: str = os.getenv("RESERVATION_REDIS_URL", "")  # Share holds across workers (needs redis)
+    # Hold suggested slots unless the request says otherwise; off until callers confirm or release their holds
+    RESERVATION_HOLD_BY_DEFAULT: bool = os.getenv("RESERVATION_HOLD_BY_DEFAULT", "false").lower() == "true"
+    # Versioned workshop configuration; WORKSHOP_RESOURCES/REPAIR_REQUIREMENTS seed version 1
+    WORKSHOP_CONFIG_DB: str = os.getenv("WORKSHOP_CONFIG_DB", "workshop_config.sqlite3")
+    WORKSHOP_CONFIG_POLL_SECONDS: float = float(os.getenv("WORKSHOP_CONFIG_POLL_SECONDS", 2))
+    # Audit events: queued, sent to Kafka in batches, spooled to disk while Kafka is down
+    AUDIT_QUEUE_SIZE: int = int(os.getenv("AUDIT_QUEUE_SIZE", 10000))
+    AUDIT_BATCH_SIZE: int = int(os.getenv("AUDIT_BATCH_SIZE", 100))
+    AUDIT_LINGER_MS: int = int(os.getenv("AUDIT_LINGER_MS", 50))
+    AUDIT_COMPRESSION: str = os.getenv("AUDIT_COMPRESSION", "gzip")  # gzip, snappy, lz4, zstd or none
+    AUDIT_SPOOL_FILE: str = os.getenv("AUDIT_SPOOL_FILE", "audit_spool.jsonl")  # Empty disables the spool
+    AUDIT_SPOOL_MAX_BYTES: int = int(os.getenv("AUDIT_SPOOL_MAX_BYTES", 50 * 1024 * 1024))
+    AUDIT_RECONNECT_SECONDS: float = float(os.getenv("AUDIT_RECONNECT_SECONDS", 5))
+    PREDICTION_CACHE_SIZE: int = int(os.getenv("PREDICTION_CACHE_SIZE", 10000))  # 0 disables the cache
+    PREDICTION_CACHE_TTL_SECONDS: int = int(os.getenv("PREDICTION_CACHE_TTL_SECONDS", 3600))
     
     # Workshop Resources
     WORKSHOP_RESOURCES: Dict[str, int] = {
@@ -0,0 +1,115 @@
+# fast_features.py
+
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from category_codes import CategoryCodeEncoder
+
+
+class CompiledFeatureEncoder:
+    """NumPy-only replacement for the fitted ColumnTransformer, for single predictions.
+
+    Built once from the fitted StandardScaler and one-hot encoder at model-load time, so
+    encoding one request is a few array writes instead of a DataFrame round-trip.
+    Produces the same column layout as ``preprocessor.transform``.
+    """
+
+    def __init__(self, numeric_columns: List[str], means: np.ndarray, scales: np.ndarray,
+                 categorical_columns: List[str], category_positions: List[Dict[Any, int]],
+                 n_outputs: int, ignore_unknown: bool = True):
+        self.numeric_columns = numeric_columns
+        self.means = means
+        self.scales = scales
+        self.categorical_columns = categorical_columns
+        self.category_positions = category_positions
+        self.n_outputs = n_outputs
+        self.ignore_unknown = ignore_unknown
+        self._local = threading.local()
+
+    def _buffer(self) -> np.ndarray:
+        # One preallocated row per thread; inference may run on a thread pool
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is None:
+            buffer = np.zeros((1, self.n_outputs), dtype=np.float32)
+            self._local.buffer = buffer
+        return buffer
+
+    def encode(self, values: Dict[str, Any]) -> np.ndarray:
+        """Encodes one feature row into a (1, n_outputs) float32 array.
+
+        The array is reused by the next call on the same thread, so predict on it
+        straight away (or copy it).
+        """
+        out = self._buffer()
+        out.fill(0.0)
+
+        n_numeric = len(self.numeric_columns)
+        if n_numeric:
+            raw = np.fromiter((values[col] for col in self.numeric_columns), dtype=np.float64, count=n_numeric)
+            out[0, :n_numeric] = (raw - self.means) / self.scales
+
+        for col, positions in zip(self.categorical_columns, self.category_positions):
+            position = positions.get(values[col])
+            if position is not None:
+                out[0, position] = 1.0
+            elif not self.ignore_unknown:
+                raise ValueError(f"Unknown category {values[col]!r} for feature {col}")
+
+        return out
+
+
+def compile_feature_encoder(preprocessor) -> Optional[CompiledFeatureEncoder]:
+    """Builds a CompiledFeatureEncoder from a fitted preprocessor, or None if its layout is unsupported."""
+    if preprocessor is None or not hasattr(preprocessor, 'transformers_'):
+        return None
+    if getattr(preprocessor, 'sparse_output_', False):
+        return None
+
+    numeric_columns: List[str] = []
+    means: List[float] = []
+    scales: List[float] = []
+    categorical_columns: List[str] = []
+    category_positions: List[Dict[Any, int]] = []
+    ignore_unknown = True
+
+    # Output order follows the fitted transformers, so numeric columns must all come first
+    offset = 0
+    seen_categorical = False
+    for name, transformer, columns in preprocessor.transformers_:
+        if transformer == 'drop' or len(columns) == 0:
+            continue
+
+        if isinstance(transformer, StandardScaler):
+            if seen_categorical:
+                return None
+            n = len(columns)
+            numeric_columns.extend(columns)
+            means.extend(transformer.mean_ if transformer.mean_ is not None else np.zeros(n))
+            scales.extend(transformer.scale_ if transformer.scale_ is not None else np.ones(n))
+            offset += n
+
+        elif isinstance(transformer, (OneHotEncoder, CategoryCodeEncoder)):
+            if transformer.drop_idx_ is not None or getattr(transformer, '_infrequent_enabled', False):
+                return None
+            seen_categorical = True
+            ignore_unknown = ignore_unknown and transformer.handle_unknown != 'error'
+            for col, categories in zip(columns, transformer.categories_):
+                categorical_columns.append(col)
+                category_positions.append({category: offset + i for i, category in enumerate(categories)})
+                offset += len(categories)
+
+        else:
+            return None
+
+    return CompiledFeatureEncoder(
+        numeric_columns=numeric_columns,
+        means=np.asarray(means, dtype=np.float64),
+        scales=np.asarray(scales, dtype=np.float64),
+        categorical_columns=categorical_columns,
+        category_positions=category_positions,
+        n_outputs=offset,
+        ignore_unknown=ignore_unknown
+    )
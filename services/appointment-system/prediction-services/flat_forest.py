@@ -0,0 +1,161 @@
+# flat_forest.py
+
+import json
+from typing import Optional
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from xgboost import XGBRegressor
+
+
+class FlatForest:
+    """A tree ensemble stored as flat NumPy node arrays.
+
+    sklearn and XGBoost copy their trees into private memory when unpickled, so
+    every uvicorn worker holds its own copy. These plain arrays can instead be
+    loaded with ``joblib.load(..., mmap_mode='r')`` and shared read-only between
+    workers through the page cache. ``predict`` walks all trees level by level
+    with vectorized indexing.
+    """
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, left: np.ndarray,
+                 right: np.ndarray, missing: np.ndarray, value: np.ndarray, roots: np.ndarray,
+                 max_depth: int, strict_less: bool, base_score: float = 0.0,
+                 average: bool = False, source_type: str = ""):
+        self.feature = feature        # int32, -1 for leaves
+        self.threshold = threshold    # float64 split values
+        self.left = left              # int32 child taken when the split test passes
+        self.right = right            # int32 child taken otherwise
+        self.missing = missing        # int32 child for NaN inputs
+        self.value = value            # float64 leaf outputs
+        self.roots = roots            # int32 root node of each tree
+        self.max_depth = max_depth
+        self.strict_less = strict_less  # XGBoost tests x < t, sklearn tests x <= t
+        self.base_score = base_score
+        self.average = average          # Random forests average trees, boosting sums them
+        self.source_type = source_type
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def predict(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        n_rows = X.shape[0]
+        rows = np.arange(n_rows)[:, None]
+        nodes = np.broadcast_to(self.roots, (n_rows, self.n_trees)).copy()
+
+        for _ in range(self.max_depth):
+            features = self.feature[nodes]
+            is_leaf = features < 0
+            if is_leaf.all():
+                break
+            x = X[rows, np.where(is_leaf, 0, features)].astype(np.float64)
+            thresholds = self.threshold[nodes]
+            goes_left = x < thresholds if self.strict_less else x <= thresholds
+            next_nodes = np.where(goes_left, self.left[nodes], self.right[nodes])
+            next_nodes = np.where(np.isnan(x), self.missing[nodes], next_nodes)
+            nodes = np.where(is_leaf, nodes, next_nodes)
+
+        leaf_values = self.value[nodes]
+        if self.average:
+            return leaf_values.mean(axis=1)
+        return leaf_values.sum(axis=1) + self.base_score
+
+
+def _from_random_forest(model: RandomForestRegressor) -> FlatForest:
+    features, thresholds, lefts, rights, values, roots, depths = [], [], [], [], [], [], []
+    offset = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        is_leaf = tree.children_left < 0
+        roots.append(offset)
+        features.append(np.where(is_leaf, -1, tree.feature))
+        thresholds.append(tree.threshold)
+        lefts.append(np.where(is_leaf, -1, tree.children_left + offset))
+        rights.append(np.where(is_leaf, -1, tree.children_right + offset))
+        values.append(tree.value[:, 0, 0])
+        depths.append(tree.max_depth)
+        offset += tree.node_count
+
+    left = np.concatenate(lefts).astype(np.int32)
+    return FlatForest(
+        feature=np.concatenate(features).astype(np.int32),
+        threshold=np.concatenate(thresholds).astype(np.float64),
+        left=left,
+        right=np.concatenate(rights).astype(np.int32),
+        missing=left,  # sklearn has no missing-value routing for our inputs
+        value=np.concatenate(values).astype(np.float64),
+        roots=np.asarray(roots, dtype=np.int32),
+        max_depth=max(depths),
+        strict_less=False,
+        average=True,
+        source_type=type(model).__name__
+    )
+
+
+def _from_xgboost(model: XGBRegressor) -> Optional[FlatForest]:
+    booster = model.get_booster()
+    config = json.loads(booster.save_config())
+    if config['learner']['objective']['name'] != 'reg:squarederror':
+        return None  # Other objectives apply a link function to the margin
+    base_score = float(config['learner']['learner_model_param']['base_score'].strip('[]'))
+
+    features, thresholds, lefts, rights, missings, values, roots = [], [], [], [], [], [], []
+    max_depth = 0
+    offset = 0
+    for dump in booster.get_dump(dump_format='json'):
+        # Flatten the nested JSON tree; XGBoost node ids are dense within a tree
+        nodes = {}
+        stack = [(json.loads(dump), 0)]
+        while stack:
+            node, depth = stack.pop()
+            nodes[node['nodeid']] = node
+            max_depth = max(max_depth, depth)
+            stack.extend((child, depth + 1) for child in node.get('children', []))
+
+        roots.append(offset)
+        for node_id in range(len(nodes)):
+            node = nodes[node_id]
+            if 'leaf' in node:
+                features.append(-1)
+                thresholds.append(0.0)
+                lefts.append(-1)
+                rights.append(-1)
+                missings.append(-1)
+                values.append(node['leaf'])
+            else:
+                features.append(int(node['split'].lstrip('f')))
+                thresholds.append(np.float32(node['split_condition']))
+                lefts.append(node['yes'] + offset)
+                rights.append(node['no'] + offset)
+                missings.append(node['missing'] + offset)
+                values.append(0.0)
+        offset += len(nodes)
+
+    return FlatForest(
+        feature=np.asarray(features, dtype=np.int32),
+        threshold=np.asarray(thresholds, dtype=np.float64),
+        left=np.asarray(lefts, dtype=np.int32),
+        right=np.asarray(rights, dtype=np.int32),
+        missing=np.asarray(missings, dtype=np.int32),
+        value=np.asarray(values, dtype=np.float64),
+        roots=np.asarray(roots, dtype=np.int32),
+        max_depth=max_depth,
+        strict_less=True,
+        base_score=base_score,
+        average=False,
+        source_type=type(model).__name__
+    )
+
+
+def flatten_model(model) -> Optional[FlatForest]:
+    """Exports a fitted model to a FlatForest, or None if the model type is not supported."""
+    try:
+        if isinstance(model, RandomForestRegressor):
+            return _from_random_forest(model)
+        if isinstance(model, XGBRegressor):
+            return _from_xgboost(model)
+    except Exception as e:
+        print(f"Could not flatten {type(model).__name__}: {e}")
+    return None
@@ -0,0 +1,134 @@
+# http_client.py
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Optional
+
+import httpx
+
+from config import settings
+
+# App-lifetime client shared by all outbound calls (created in the startup hook)
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_requests_sent = 0
+_responses_received = 0
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401 -- installed with httpx[http2]
+        return True
+    except ImportError:
+        return False
+
+
+async def _on_request(request: httpx.Request):
+    global _requests_sent
+    _requests_sent += 1
+
+
+async def _on_response(response: httpx.Response):
+    global _responses_received
+    _responses_received += 1
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Builds an AsyncClient with the configured pool limits, keep-alive and timeouts."""
+    http2 = settings.HTTP_CLIENT_HTTP2
+    if http2 and not _http2_available():
+        print("WARNING: HTTP_CLIENT_HTTP2 is enabled but 'h2' is not installed. Using HTTP/1.1.")
+        http2 = False
+
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_CLIENT_MAX_KEEPALIVE,
+            keepalive_expiry=settings.HTTP_CLIENT_KEEPALIVE_EXPIRY
+        ),
+        timeout=httpx.Timeout(
+            settings.HTTP_CLIENT_TIMEOUT,
+            connect=settings.HTTP_CLIENT_CONNECT_TIMEOUT
+        ),
+        event_hooks={'request': [_on_request], 'response': [_on_response]}
+    )
+
+
+async def start_http_client() -> httpx.AsyncClient:
+    """Creates the shared client on the running event loop."""
+    global _client, _client_loop
+    if _client is None:
+        _client = create_http_client()
+        _client_loop = asyncio.get_running_loop()
+        print("Shared HTTP client started.")
+    return _client
+
+
+async def close_http_client():
+    global _client, _client_loop
+    if _client is not None:
+        await _client.aclose()
+        print("Shared HTTP client closed.")
+    _client = None
+    _client_loop = None
+
+
+def get_http_client() -> Optional[httpx.AsyncClient]:
+    """Returns the shared client, or None outside the event loop that owns it."""
+    if _client is None:
+        return None
+    try:
+        if asyncio.get_running_loop() is not _client_loop:
+            return None
+    except RuntimeError:
+        return None
+    return _client
+
+
+@asynccontextmanager
+async def outbound_client():
+    """Yields the shared client when available, otherwise a temporary one that is closed after use."""
+    client = get_http_client()
+    if client is not None:
+        yield client
+        return
+
+    temporary = create_http_client()
+    try:
+        yield temporary
+    finally:
+        await temporary.aclose()
+
+
+def pool_stats() -> dict:
+    """Connection pool utilisation of the shared client, for /health."""
+    stats = {
+        "started": _client is not None,
+        "http2": False,
+        "max_connections": settings.HTTP_CLIENT_MAX_CONNECTIONS,
+        "max_keepalive_connections": settings.HTTP_CLIENT_MAX_KEEPALIVE,
+        "requests_sent": _requests_sent,
+        "responses_received": _responses_received,
+        "connections": 0,
+        "idle_connections": 0,
+        "active_connections": 0,
+        "pool_introspection": False,
+    }
+    if _client is None:
+        return stats
+
+    # httpcore does not expose pool counters publicly; read them off the transport's pool
+    # when this httpx/httpcore version has one, otherwise leave them unreported
+    pool = getattr(getattr(_client, "_transport", None), "_pool", None)
+    connections = getattr(pool, "connections", None)
+    if connections is None:
+        return stats
+    connections = list(connections)
+    idle = sum(1 for conn in connections if callable(getattr(conn, "is_idle", None)) and conn.is_idle())
+    stats["pool_introspection"] = True
+    stats["http2"] = bool(getattr(pool, "_http2", False))
+    stats["connections"] = len(connections)
+    stats["idle_connections"] = idle
+    stats["active_connections"] = len(connections) - idle
+    return stats
@@ -0,0 +1,164 @@
+# job_ingest.py
+
+import hashlib
+import json
+from typing import Any, AsyncIterator, Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+ID_COLUMN = "job_id"
+CATEGORICAL_COLUMNS = ('vehicleType', 'vehicleBrand', 'repairType')
+DATE_COLUMNS = ('lastServiceDate', 'startDate', 'endDate')
+YEAR_COLUMNS = ('vehicleModelYear', 'vehicleRegistrationYear')
+MILLAGE_COLUMN = 'millage'
+TYPED_COLUMNS = CATEGORICAL_COLUMNS + (MILLAGE_COLUMN,) + DATE_COLUMNS + YEAR_COLUMNS
+
+
+def raw_job_id(job: dict) -> str:
+    """Job id from the API, or a content hash for jobs that have none."""
+    for field in ('_id', 'id', 'appointmentId'):
+        if job.get(field) is not None:
+            return str(job[field])
+    return hashlib.sha1(json.dumps(job, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def parse_dates(values: list) -> np.ndarray:
+    """ISO dates with or without time/offset (as naive UTC); anything else by pandas' format inference."""
+    raw = pd.Series(values, dtype=object)
+    dates = pd.to_datetime(raw, errors='coerce', format='ISO8601', utc=True)
+    retry = dates.isna() & raw.notna()
+    if retry.any():
+        dates[retry] = pd.to_datetime(raw[retry], errors='coerce', utc=True)
+    return dates.dt.tz_convert(None).to_numpy(dtype='datetime64[ns]')
+
+
+class JobFrameBuilder:
+    """Builds the finished-jobs DataFrame from a stream of job dicts, a chunk at a time.
+
+    Only ``chunk_size`` raw dicts are held at once; each full chunk is packed
+    into typed column buffers (category codes for the vehicle/repair columns,
+    int32 millage, datetime64 dates, float32 years), so ingestion memory grows
+    with the packed size of the history rather than with its JSON.
+    """
+
+    def __init__(self, chunk_size: int = 50000):
+        self.chunk_size = max(1, chunk_size)
+        self.rows = 0
+        self._pending: List[dict] = []
+        self._seen_columns = set()
+        self._vocab: Dict[str, Dict[str, int]] = {col: {} for col in CATEGORICAL_COLUMNS}
+        self._chunks: Dict[str, List[np.ndarray]] = {col: [] for col in TYPED_COLUMNS + (ID_COLUMN,)}
+        self._millage_missing: List[np.ndarray] = []
+
+    def add(self, job: dict):
+        self._pending.append(job)
+        if len(self._pending) >= self.chunk_size:
+            self._flush()
+
+    def extend(self, jobs: Iterable[dict]):
+        for job in jobs:
+            self.add(job)
+
+    def _flush(self):
+        jobs, self._pending = self._pending, []
+        if not jobs:
+            return
+        for job in jobs:
+            self._seen_columns.update(job.keys())
+
+        self._chunks[ID_COLUMN].append(np.array([raw_job_id(job) for job in jobs], dtype=object))
+
+        for col in CATEGORICAL_COLUMNS:
+            vocab = self._vocab[col]
+            codes = np.empty(len(jobs), dtype=np.int32)
+            for i, job in enumerate(jobs):
+                value = job.get(col)
+                codes[i] = -1 if value is None else vocab.setdefault(str(value), len(vocab))
+            self._chunks[col].append(codes)
+
+        millage = pd.to_numeric(pd.Series([job.get(MILLAGE_COLUMN) for job in jobs]), errors='coerce').to_numpy()
+        missing = np.isnan(millage)
+        self._chunks[MILLAGE_COLUMN].append(np.where(missing, 0, millage).astype(np.int32))
+        self._millage_missing.append(missing)
+
+        for col in YEAR_COLUMNS:
+            years = pd.to_numeric(pd.Series([job.get(col) for job in jobs]), errors='coerce')
+            self._chunks[col].append(years.to_numpy(dtype=np.float32))
+
+        for col in DATE_COLUMNS:
+            self._chunks[col].append(parse_dates([job.get(col) for job in jobs]))
+
+        self.rows += len(jobs)
+
+    def to_frame(self) -> pd.DataFrame:
+        """The jobs added so far, with the same column names as the API records plus ``job_id``."""
+        self._flush()
+        if self.rows == 0:
+            return pd.DataFrame()
+
+        columns: Dict[str, Any] = {ID_COLUMN: np.concatenate(self._chunks[ID_COLUMN])}
+        for col in TYPED_COLUMNS:
+            if col not in self._seen_columns:
+                continue  # Absent from the API response; create_enhanced_features warns about it
+            values = np.concatenate(self._chunks[col])
+            if col in CATEGORICAL_COLUMNS:
+                values = pd.Categorical.from_codes(values, categories=list(self._vocab[col]))
+            elif col == MILLAGE_COLUMN:
+                missing = np.concatenate(self._millage_missing)
+                if missing.any():
+                    values = np.where(missing, np.nan, values).astype(np.float32)
+            columns[col] = values
+        return pd.DataFrame(columns)
+
+
+def frame_from_jobs(jobs: Iterable[dict], chunk_size: int = 50000) -> pd.DataFrame:
+    builder = JobFrameBuilder(chunk_size)
+    builder.extend(jobs)
+    return builder.to_frame()
+
+
+# --- Streaming parsers ---
+
+async def iter_json_array(chunks: AsyncIterator[str]) -> AsyncIterator[Any]:
+    """Yields the elements of a JSON array as its text arrives, without holding the whole document."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    started = False
+    async for text in chunks:
+        buffer = buffer[pos:] + text
+        pos = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if not started:
+                if buffer[pos] != '[':
+                    raise ValueError("Expected a JSON array of jobs")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == ']':
+                return
+            try:
+                item, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break  # Element continues in the next chunk
+            yield item
+    raise ValueError("JSON array ended unexpectedly")
+
+
+async def iter_ndjson(lines: AsyncIterator[str]) -> AsyncIterator[Any]:
+    async for line in lines:
+        if line.strip():
+            yield json.loads(line)
+
+
+def iter_response_jobs(response) -> AsyncIterator[Any]:
+    """Job records of a streamed httpx response: NDJSON if the server sends it, else a JSON array."""
+    content_type = response.headers.get('Content-Type', '')
+    if 'ndjson' in content_type or 'jsonl' in content_type:
+        return iter_ndjson(response.aiter_lines())
+    return iter_json_array(response.aiter_text())
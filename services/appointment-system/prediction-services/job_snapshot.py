@@ -0,0 +1,225 @@
+# job_snapshot.py
+
+import asyncio
+import json
+import time
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+
+from config import settings
+from http_client import outbound_client
+
+# Only these jobs occupy workshop resources
+ACTIVE_JOB_STATUSES = ['Ongoing', 'Scheduled']
+
+
+def _job_key(job: dict) -> str:
+    """Stable identity of a job, used to merge delta fetches."""
+    for field in ('_id', 'id', 'appointmentId'):
+        if job.get(field) is not None:
+            return str(job[field])
+    return json.dumps(job, sort_keys=True, default=str)
+
+
+class JobSnapshot:
+    """In-memory copy of the Node API's active jobs, maintained in the background.
+
+    Scheduling requests read ``get_jobs()`` from memory; the upstream API sees one
+    (conditional) request per refresh instead of one per booking attempt.
+    """
+
+    def __init__(self, url: str, refresh_seconds: int = 60, max_age_seconds: int = 300,
+                 since_param: str = "", full_sync_every: int = 10):
+        self.url = url
+        self.refresh_seconds = refresh_seconds
+        self.max_age_seconds = max_age_seconds
+        self.since_param = since_param
+        self.full_sync_every = max(1, full_sync_every)
+
+        self.jobs: Dict[str, dict] = {}
+        self.version = 0                # Bumped whenever the job set changes
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.last_synced_at: Optional[datetime] = None  # Upstream "since" watermark
+        self.last_refresh: Optional[float] = None       # Monotonic time of last successful refresh
+        self.refresh_count = 0
+        self.not_modified_count = 0
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._deltas_since_full_sync = 0
+
+    @property
+    def is_configured(self) -> bool:
+        return bool(self.url) and "your_node_api" not in self.url
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.last_refresh is not None
+
+    def age_seconds(self) -> Optional[float]:
+        if self.last_refresh is None:
+            return None
+        return time.monotonic() - self.last_refresh
+
+    def get_jobs(self) -> List[dict]:
+        """Returns the current active jobs (a new list; the job dicts are shared)."""
+        return list(self.jobs.values())
+
+    def request_refresh(self):
+        """Wakes the background loop so the next refresh happens now."""
+        self._wake.set()
+
+    async def ensure_fresh(self):
+        """Refreshes inline only if the snapshot was never loaded or is too old."""
+        age = self.age_seconds()
+        if age is None or age > self.max_age_seconds:
+            await self.refresh()
+
+    async def refresh(self):
+        """Fetches changes from the Node API and applies them to the snapshot."""
+        async with self._lock, self._borrow_client() as client:
+            use_delta = (
+                bool(self.since_param)
+                and self.last_synced_at is not None
+                and self._deltas_since_full_sync < self.full_sync_every
+            )
+            params = {}
+            headers = {}
+            if use_delta:
+                params[self.since_param] = self.last_synced_at.isoformat()
+            else:
+                if self.etag:
+                    headers['If-None-Match'] = self.etag
+                if self.last_modified:
+                    headers['If-Modified-Since'] = self.last_modified
+
+            requested_at = datetime.now(timezone.utc)
+            response = await client.get(self.url, params=params, headers=headers)
+
+            if response.status_code == 304:
+                self.not_modified_count += 1
+            else:
+                response.raise_for_status()
+                payload = response.json()
+                if use_delta:
+                    self._apply_delta(payload)
+                    self._deltas_since_full_sync += 1
+                else:
+                    self._replace(payload)
+                    self._deltas_since_full_sync = 0
+                self.etag = response.headers.get('ETag')
+                self.last_modified = response.headers.get('Last-Modified')
+
+            self.last_synced_at = requested_at
+            self.last_refresh = time.monotonic()
+            self.refresh_count += 1
+
+    def _borrow_client(self):
+        if self._client is not None:
+            return nullcontext(self._client)
+        return outbound_client()
+
+    def _replace(self, all_jobs: List[dict]):
+        self._swap({
+            _job_key(job): job for job in all_jobs
+            if job.get('status') in ACTIVE_JOB_STATUSES
+        })
+
+    def _apply_delta(self, changed_jobs: List[dict]):
+        if not changed_jobs:
+            return
+        jobs = dict(self.jobs)
+        for job in changed_jobs:
+            key = _job_key(job)
+            if job.get('status') in ACTIVE_JOB_STATUSES:
+                jobs[key] = job
+            else:
+                jobs.pop(key, None)  # Finished/cancelled jobs free their resources
+        # Swap the whole dict so readers never see a half-applied delta
+        self._swap(jobs)
+
+    def _swap(self, jobs: Dict[str, dict]):
+        """Installs ``jobs``; the version (and with it every cache keyed on it) only moves if they changed."""
+        if jobs == self.jobs:
+            return
+        self.jobs = jobs
+        self.version += 1
+
+    # --- Background maintenance ---
+
+    async def start(self, client: Optional[httpx.AsyncClient] = None):
+        """Starts the periodic refresh loop (and the Kafka listener if enabled)."""
+        if not self.is_configured:
+            print("WARNING: NODE_API_ALL_JOBS not configured. Job snapshot disabled.")
+            return
+        self._client = client
+        self._tasks.append(asyncio.create_task(self._refresh_loop()))
+        if settings.JOB_SNAPSHOT_KAFKA_REFRESH:
+            self._tasks.append(asyncio.create_task(self._listen_for_changes()))
+        print(f"Job snapshot started. Refreshing every {self.refresh_seconds} seconds.")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._tasks = []
+        self._client = None
+
+    async def _refresh_loop(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"ERROR: Job snapshot refresh failed: {e}")
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.refresh_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def _listen_for_changes(self):
+        """Triggers a refresh whenever another service publishes an appointment event."""
+        from aiokafka import AIOKafkaConsumer
+
+        consumer = AIOKafkaConsumer(
+            settings.AUDIT_TOPIC,
+            bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS,
+            auto_offset_reset="latest"
+        )
+        try:
+            await consumer.start()
+        except Exception as e:
+            print(f"WARNING: Job snapshot Kafka listener could not start: {e}. Using interval refresh only.")
+            return
+
+        try:
+            async for msg in consumer:
+                try:
+                    event = json.loads(msg.value.decode('utf-8'))
+                except Exception:
+                    continue
+                if (event.get('serviceName') != "prediction-service"
+                        and str(event.get('eventName', '')).startswith("APPOINTMENT_")):
+                    self.request_refresh()
+        finally:
+            await consumer.stop()
+
+    def stats(self) -> dict:
+        age = self.age_seconds()
+        return {
+            "jobs": len(self.jobs),
+            "version": self.version,
+            "refreshes": self.refresh_count,
+            "not_modified": self.not_modified_count,
+            "age_seconds": round(age, 1) if age is not None else None
+        }
@@ -1,24 +1,35 @@
 # main.py
 
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Query, Request, Response
 from pydantic import BaseModel, validator, Field
-from typing import Optional, List, Dict, Any
-import joblib
+from typing import Optional, List, Dict, Any, NamedTuple
 import pandas as pd
 import numpy as np
 # --- THIS LINE IS MODIFIED ---
-from datetime import datetime, timedelta, timezone # <-- We added timezone
+from datetime import date, datetime, timedelta, timezone # <-- We added timezone
 # ---
-import httpx
 import asyncio
+import bisect
+import time
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 from config import settings
-from training import EnhancedVehicleRepairModel, train_enhanced_model
+from training import EnhancedVehicleRepairModel, run_training_job
+from scheduling import BusySchedule, CapacityIndex, build_capacity_index, schedule_batch
+from job_snapshot import JobSnapshot, ACTIVE_JOB_STATUSES
+from job_ingest import parse_dates
+from http_client import start_http_client, close_http_client, pool_stats
+from flat_forest import FlatForest
+from prediction_cache import PredictionCache
+from audit_emitter import AuditEmitter, encode_audit_event
+from reservations import Reservation, create_reservation_store
+from workshop_config import DEFAULT_REQUIREMENTS_KEY, WorkshopConfig, WorkshopConfigStore
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsRegistry
 
 # --- Kafka Imports ---
 from aiokafka import AIOKafkaProducer
-import json
 import uuid # <-- ADD THIS IMPORT
 # ---
 
@@ -31,33 +42,108 @@ app = FastAPI(
 # Global model handler
 model_handler = EnhancedVehicleRepairModel()
 
+# Prometheus-style metrics, served on /metrics
+metrics = MetricsRegistry()
+stage_seconds = metrics.histogram(
+    "prediction_stage_seconds",
+    "Time spent in one stage of request handling",
+    ["stage"]
+)
+request_seconds = metrics.histogram(
+    "http_request_duration_seconds",
+    "End-to-end request handling time",
+    ["method", "route", "status"]
+)
+fallback_predictions = metrics.counter(
+    "prediction_fallback_total",
+    "Durations served by get_fallback_duration instead of the model",
+    ["reason"]
+)
+
+# Bounded pool for model inference, and a separate process for retraining
+# (spawned, so the worker never inherits the server's event loop or threads)
+inference_executor = ThreadPoolExecutor(
+    max_workers=settings.INFERENCE_THREADS,
+    thread_name_prefix="inference"
+)
+training_executor = ProcessPoolExecutor(
+    max_workers=1,
+    mp_context=multiprocessing.get_context("spawn")
+)
+retrain_in_progress = False
+
+# Recent predictions, keyed on normalized features and scoped to the loaded model version
+prediction_cache = PredictionCache(
+    maxsize=settings.PREDICTION_CACHE_SIZE,
+    ttl_seconds=settings.PREDICTION_CACHE_TTL_SECONDS
+)
+
+# Jobs-only availability windows, scoped to the scheduling base they were cut from; holds are applied per request
+availability_cache = PredictionCache(
+    maxsize=128,
+    ttl_seconds=settings.AVAILABILITY_CACHE_TTL_SECONDS
+)
+
+# Workshop capacity configuration, versioned in a file shared by all workers
+workshop_config = WorkshopConfigStore(
+    settings.WORKSHOP_CONFIG_DB,
+    default_resources=settings.WORKSHOP_RESOURCES,
+    default_requirements=settings.REPAIR_REQUIREMENTS,
+    poll_seconds=settings.WORKSHOP_CONFIG_POLL_SECONDS
+)
+
+# Tentative holds on suggested slots (in-process, or shared through Redis)
+reservation_store = create_reservation_store(settings.RESERVATION_REDIS_URL)
+
+# Global snapshot of active jobs (refreshed in the background)
+job_snapshot = JobSnapshot(
+    settings.NODE_API_ALL_JOBS,
+    refresh_seconds=settings.JOB_SNAPSHOT_REFRESH_SECONDS,
+    max_age_seconds=settings.JOB_SNAPSHOT_MAX_AGE_SECONDS,
+    since_param=settings.NODE_API_JOBS_SINCE_PARAM,
+    full_sync_every=settings.JOB_SNAPSHOT_FULL_SYNC_EVERY
+)
+
 
 # ---
 # --- KAFKA PRODUCER LOGIC (Resilient)
 # ---
 
-# Global producer
-kafka_producer = None
+def create_audit_producer() -> AIOKafkaProducer:
+    """A new (unstarted) producer; the audit emitter calls this again after a disconnect."""
+    compression = settings.AUDIT_COMPRESSION if settings.AUDIT_COMPRESSION != "none" else None
+    return AIOKafkaProducer(
+        bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS,
+        linger_ms=settings.AUDIT_LINGER_MS,
+        compression_type=compression
+    )
+
+# Events are queued and sent in batches by a background task (see audit_emitter.py)
+audit_emitter = AuditEmitter(
+    settings.AUDIT_TOPIC,
+    create_audit_producer,
+    queue_size=settings.AUDIT_QUEUE_SIZE,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    linger_ms=settings.AUDIT_LINGER_MS,
+    spool_path=settings.AUDIT_SPOOL_FILE or None,
+    spool_max_bytes=settings.AUDIT_SPOOL_MAX_BYTES,
+    reconnect_seconds=settings.AUDIT_RECONNECT_SECONDS
+)
+
+AUDIT_SERVICE_NAME = "prediction-service"
+AUDIT_KEY = AUDIT_SERVICE_NAME.encode('utf-8')
 
-# THIS FUNCTION IS RENAMED and UPDATED
-async def send_audit_event(event: "StandardAuditEvent"):
+def send_audit_event(event_name: str, status: str, trace_id: Optional[str] = None,
+                     payload: Any = None, error: Optional[Dict[str, Any]] = None):
     """
-    Sends a standard audit event to Kafka.
+    Queues a StandardAuditEvent for Kafka. Never waits on the broker.
+    The event is encoded straight to JSON bytes; ``payload`` may be the validated request model.
     """
-    global kafka_producer
-    if kafka_producer is None:
-        print("ERROR: Kafka producer is not running. Skipping event.")
-        return
-        
-    try:
-        await kafka_producer.send(
-            settings.AUDIT_TOPIC, # <-- Make sure AUDIT_TOPIC="business_audit_events" is in config.py
-            key=event.serviceName.encode('utf-8'),
-            value=event.json().encode('utf-8')
+    with stage_seconds.time(stage="audit_emit"):
+        audit_emitter.emit(
+            key=AUDIT_KEY,
+            value=encode_audit_event(AUDIT_SERVICE_NAME, event_name, status, trace_id, payload, error)
         )
-        print(f"Sent audit event: {event.eventName}")
-    except Exception as e:
-        print(f"CRITICAL: Could not send prediction event to Kafka: {e}")
 
 # ---
 # --- END OF KAFKA LOGIC
@@ -85,12 +171,57 @@ class EnhancedRepairRequest(BaseModel):
 class DurationResponse(BaseModel):
     predictedDuration: int
     confidence: float
+    p90Duration: Optional[int] = None  # 90% of similar repairs finished within this many days
     features_used: List[str]
 
 class ScheduleResponse(BaseModel):
     suggestedStartDate: str
     predictedDuration: int
     confidence: float
+    p90Duration: Optional[int] = None
+    bookedDuration: int  # Days of capacity the slot search (and the hold) used
+    alternativeStartDates: List[str] = []  # Next feasible start dates when top_k > 1, earliest first
+    reservationId: Optional[str] = None  # Hold on the suggested slot; confirm or release it
+    reservedUntil: Optional[str] = None
+
+class BatchScheduleItem(EnhancedRepairRequest):
+    deadline: Optional[date] = None  # Latest day the repair should be finished
+
+class BatchAssignment(BaseModel):
+    index: int  # Position in the request list
+    suggestedStartDate: Optional[str]  # None when no slot fits in the horizon
+    predictedDuration: int
+    confidence: float
+    meetsDeadline: Optional[bool] = None
+    reservationId: Optional[str] = None
+
+class BatchScheduleResponse(BaseModel):
+    assignments: List[BatchAssignment]
+    scheduled: int
+    unscheduled: int
+    lastEndDate: Optional[str]
+    heuristic: str  # Priority rule that produced the assignment
+
+class ReservationConfirmRequest(BaseModel):
+    appointmentId: Optional[str] = None  # The booked appointment; the hold ends once it is in the job list
+
+class ReservationResponse(BaseModel):
+    reservationId: str
+    status: str
+    startDate: str
+    endDate: str
+    expiresAt: str
+    appointmentId: Optional[str] = None
+
+class AvailabilityDay(BaseModel):
+    date: str
+    remaining: Dict[str, int]  # Free units per workshop resource
+    feasibleRepairTypes: List[str]  # Repair types whose typical duration can start on this day
+
+class AvailabilityResponse(BaseModel):
+    startDate: str
+    endDate: str
+    days: List[AvailabilityDay]
 
 class ResourceUpdateRequest(BaseModel):
     resource_type: str
@@ -104,11 +235,14 @@ class ConfigurationResponse(BaseModel):
     workshop_resources: Dict[str, int]
     repair_requirements: Dict[str, Dict[str, int]]
     model_features: List[str]
+    version: Optional[int] = None
+    updated_at: Optional[str] = None
 
 # --- THIS IS THE NEW STANDARD DTO ---
+# send_audit_event encodes this schema directly (audit_emitter.encode_audit_event)
 class StandardAuditEvent(BaseModel):
     eventId: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    serviceName: str = "prediction-service" # Hard-code the service name
+    serviceName: str = "prediction-service" # Hard-code the service name (AUDIT_SERVICE_NAME)
     eventName: str
     
     # --- THIS LINE IS MODIFIED ---
@@ -123,68 +257,82 @@ class StandardAuditEvent(BaseModel):
 
 # --- Enhanced Prediction Functions ---
 # (Your original functions are perfect, no changes needed here)
+# Feature columns fed to the preprocessor, in a fixed order
+PREDICTION_FEATURE_COLUMNS = settings.MODEL_FEATURES + [
+    'high_millage', 'is_premium_brand', 'is_complex_repair', 'month', 'millage_category'
+]
+MILLAGE_BINS = [0, 30000, 60000, 100000, 200000, float('inf')]
+MILLAGE_LABELS = ['very_low', 'low', 'medium', 'high', 'very_high']
+PREMIUM_BRANDS = ['mercedes', 'bmw', 'audi', 'lexus', 'volvo']
+COMPLEX_REPAIRS = ['engine', 'transmission', 'electrical', 'hybrid']
+
 def create_prediction_features(request: EnhancedRepairRequest) -> pd.DataFrame:
     """Creates features for prediction from request data."""
-    
-    # Convert last service date
+    return create_prediction_features_batch([request])
+
+def create_prediction_feature_row(request: EnhancedRepairRequest) -> Dict[str, Any]:
+    """Same features as create_prediction_features, as a plain dict (no pandas)."""
+    now = datetime.now()
     last_service_date = datetime.strptime(request.lastService, "%d-%m-%Y")
-    days_since_service = (datetime.now() - last_service_date).days
-    
-    # Normalize inputs
-    vehicle_type = request.vehicleType.lower()
     vehicle_brand = request.vehicleBrand.lower()
     repair_type = request.repairType.lower()
     
-    # --- Calculate real vehicle age ---
-    current_year = datetime.now().year
-    vehicle_age = current_year - request.vehicleModelYear
-    vehicle_age = max(0, min(30, vehicle_age)) # Clip to reasonable values
-    # ---
+    # pd.cut(..., right=False) equivalent: bins are [low, high)
+    millage_category = None
+    if request.millage >= MILLAGE_BINS[0]:
+        millage_category = MILLAGE_LABELS[bisect.bisect_right(MILLAGE_BINS, request.millage) - 1]
     
-    # Create base features
-    features = {
-        'vehicleType': vehicle_type,
+    return {
+        'vehicleType': request.vehicleType.lower(),
         'vehicleBrand': vehicle_brand,
         'repairType': repair_type,
         'millage': request.millage,
-        'days_since_last_service': max(0, days_since_service),
-        'vehicle_age': vehicle_age,  # Use calculated age
+        'days_since_last_service': max(0, (now - last_service_date).days),
+        'vehicle_age': max(0, min(30, now.year - request.vehicleModelYear)),
         'season': get_current_season(),
         'high_millage': int(request.millage > settings.HIGH_MILLAGE_THRESHOLD),
-        'is_premium_brand': int(vehicle_brand in ['mercedes', 'bmw', 'audi', 'lexus', 'volvo']),
-        'is_complex_repair': int(repair_type in ['engine', 'transmission', 'electrical', 'hybrid']),
-        'month': datetime.now().month,
-        'millage_category': pd.cut([request.millage], 
-                                  bins=[0, 30000, 60000, 100000, 200000, float('inf')],
-                                  labels=['very_low', 'low', 'medium', 'high', 'very_high'],
-                                  right=False)[0]
+        'is_premium_brand': int(vehicle_brand in PREMIUM_BRANDS),
+        'is_complex_repair': int(repair_type in COMPLEX_REPAIRS),
+        'month': now.month,
+        'millage_category': millage_category
     }
+
+def create_prediction_features_batch(requests: List[EnhancedRepairRequest]) -> pd.DataFrame:
+    """Creates the feature frame for many requests at once, one column at a time."""
+    now = datetime.now()
     
-    # Ensure correct feature order
-    final_features = {}
+    # Days since last service
+    last_service_dates = pd.to_datetime([r.lastService for r in requests], format="%d-%m-%Y")
+    days_since_service = (pd.Timestamp(now) - last_service_dates).days.to_numpy()
     
-    # Get all potential feature names from the model preprocessor if available
-    if model_handler.preprocessor:
-        all_feature_names = []
-        try:
-            if 'num' in model_handler.preprocessor.named_transformers_:
-                all_feature_names.extend(model_handler.preprocessor.named_transformers_['num'].get_feature_names_out())
-            if 'cat' in model_handler.preprocessor.named_transformers_:
-                all_feature_names.extend(model_handler.preprocessor.named_transformers_['cat'].get_feature_names_out())
-        except Exception:
-             pass # Will just use the feature dict keys
-        
-        # We only need the *original* feature names, not the one-hot encoded ones
-        original_features_needed = set(settings.MODEL_FEATURES)
-        original_features_needed.update(['high_millage', 'is_premium_brand', 'is_complex_repair', 'month', 'millage_category'])
-        
-        for f_name in original_features_needed:
-            if f_name in features:
-                final_features[f_name] = features[f_name]
-    else:
-        final_features = features
-
-    return pd.DataFrame([final_features])
+    # Normalize inputs
+    vehicle_types = [r.vehicleType.lower() for r in requests]
+    vehicle_brands = [r.vehicleBrand.lower() for r in requests]
+    repair_types = [r.repairType.lower() for r in requests]
+    millage = np.array([r.millage for r in requests], dtype=np.int64)
+    
+    # Real vehicle age, clipped to reasonable values
+    model_years = np.array([r.vehicleModelYear for r in requests], dtype=np.int64)
+    vehicle_age = np.clip(now.year - model_years, 0, 30)
+    
+    millage_category = pd.cut(millage, bins=MILLAGE_BINS, labels=MILLAGE_LABELS, right=False)
+    
+    features = {
+        'vehicleType': vehicle_types,
+        'vehicleBrand': vehicle_brands,
+        'repairType': repair_types,
+        'millage': millage,
+        'days_since_last_service': np.maximum(0, days_since_service),
+        'vehicle_age': vehicle_age,
+        'season': get_current_season(),
+        'high_millage': (millage > settings.HIGH_MILLAGE_THRESHOLD).astype(int),
+        'is_premium_brand': pd.Series(vehicle_brands).isin(PREMIUM_BRANDS).astype(int).to_numpy(),
+        'is_complex_repair': pd.Series(repair_types).isin(COMPLEX_REPAIRS).astype(int).to_numpy(),
+        'month': now.month,
+        'millage_category': np.asarray(millage_category, dtype=object)
+    }
+    
+    return pd.DataFrame(features, columns=PREDICTION_FEATURE_COLUMNS, index=range(len(requests)))
 
 def get_current_season() -> str:
     """Determine current season."""
@@ -198,6 +346,31 @@ def get_current_season() -> str:
     else:
         return 'fall'
 
+# Base durations (in days) - REALISTIC VALUES
+BASE_DURATIONS = {
+    'tyre': 1,
+    'tire': 1,
+    'brake': 2,
+    'electrical': 3,
+    'full-service': 2,
+    'full service': 2,
+    'engine': 5,
+    'transmission': 4,
+    'oil change': 1,
+    'general': 2,
+    'suspension': 3,
+    'exhaust': 2,
+    'ac': 2
+}
+
+def base_duration_for(repair_type: str) -> int:
+    """Typical duration of ``repair_type`` in days, before vehicle adjustments (default 2)."""
+    repair_type = repair_type.lower()
+    for repair_key, duration in BASE_DURATIONS.items():
+        if repair_key in repair_type:
+            return duration
+    return 2
+
 def get_fallback_duration(request: EnhancedRepairRequest) -> int:
     """Realistic fallback duration calculation when model fails."""
     
@@ -205,29 +378,7 @@ def get_fallback_duration(request: EnhancedRepairRequest) -> int:
     repair_type = request.repairType.lower()
     vehicle_brand = request.vehicleBrand.lower()
     
-    # Base durations (in days) - REALISTIC VALUES
-    base_durations = {
-        'tyre': 1,
-        'tire': 1,
-        'brake': 2,
-        'electrical': 3,
-        'full-service': 2,
-        'full service': 2,
-        'engine': 5,
-        'transmission': 4,
-        'oil change': 1,
-        'general': 2,
-        'suspension': 3,
-        'exhaust': 2,
-        'ac': 2
-    }
-    
-    # Get base duration - default to 2 days
-    base_duration = 2
-    for repair_key, duration in base_durations.items():
-        if repair_key in repair_type:
-            base_duration = duration
-            break
+    base_duration = base_duration_for(repair_type)
     
     # Adjust for millage
     if request.millage > 150000:
@@ -251,56 +402,310 @@ def get_fallback_duration(request: EnhancedRepairRequest) -> int:
     
     return int(round(base_duration))
 
-async def get_enhanced_prediction(request: EnhancedRepairRequest) -> tuple:
-    """Get prediction with confidence estimation."""
+# For the Initial Phase - because of not enough data for the Model
+SIMPLE_REPAIRS = ['tyre', 'tire', 'oil change', 'general']
+
+class DurationPrediction(NamedTuple):
+    duration: int
+    confidence: float
+    p90_duration: Optional[int] = None  # None when no quantile model was involved
+
+def finalize_prediction(request: EnhancedRepairRequest, raw_duration: float,
+                        raw_quantiles: Optional[np.ndarray] = None) -> DurationPrediction:
+    """Turns a raw model output (and its P50/P90, if the model has them) into a DurationPrediction."""
+    duration = max(1, int(round(raw_duration)))
     
     # For the Initial Phase - because of not enough data for the Model
-    # QUICK FIX: Force simple repairs to realistic durations
-    simple_repairs = ['tyre', 'tire', 'oil change', 'general']
-    if request.repairType.lower() in simple_repairs:
-        return 1, 0.9
+    # Ensure realistic durations
+    if request.repairType.lower() in ['tyre', 'tire'] and duration > 2:
+        duration = 1
+    elif request.repairType.lower() in ['brake', 'oil change'] and duration > 3:
+        duration = 2
     
-    if model_handler.model is None or model_handler.preprocessor is None:
-        # Use fallback if model not available
-        fallback_duration = get_fallback_duration(request)
-        return fallback_duration, 0.7
+    if raw_quantiles is not None:
+        # Confidence = estimated chance the repair is done within `duration` days,
+        # interpolated between 0 days, the P50 and the P90
+        p50 = max(float(raw_quantiles[0]), 1e-3)
+        p90 = max(float(raw_quantiles[1]), p50)  # Quantile heads can cross
+        confidence = float(np.interp(duration, [0.0, p50, p90 + 1e-6], [0.0, 0.5, 0.9]))
+        return DurationPrediction(duration, confidence, max(duration, int(np.ceil(p90))))
     
-    try:
+    # Older models without quantiles: confidence estimation by rule
+    base_confidence = 0.8
+    # Higher confidence for shorter, common repairs
+    if duration <= 2:
+        base_confidence += 0.1
+    # Lower confidence for very long durations
+    if duration > 7:
+        base_confidence -= 0.2
+    
+    confidence = min(0.95, max(0.5, base_confidence))
+    
+    return DurationPrediction(duration, confidence)
+
+def predict_raw_durations(model, preprocessor, feature_encoder, requests: List[EnhancedRepairRequest],
+                          quantile_model=None) -> tuple:
+    """Runs feature encoding and model.predict synchronously (called on the inference pool).
+    
+    Returns (durations, quantiles): the point estimates, and an (n, 2) array of
+    P50/P90 from the same encoded rows, or None without a quantile model.
+    """
+    if len(requests) == 1 and feature_encoder is not None:
+        # Fast path: encode a single request without building a DataFrame
+        with stage_seconds.time(stage="features"):
+            row = create_prediction_feature_row(requests[0])
+        with stage_seconds.time(stage="transform"):
+            X_processed = feature_encoder.encode(row)
+    else:
         # Create features
-        input_df = create_prediction_features(request)
+        with stage_seconds.time(stage="features"):
+            input_df = create_prediction_features_batch(requests)
         
         # Preprocess
-        X_processed = model_handler.preprocessor.transform(input_df)
-        
-        # Predict
-        raw_duration = model_handler.model.predict(X_processed)[0]
-        duration = max(1, int(round(raw_duration)))
-        
-        # For the Initial Phase - because of not enough data for the Model
-        # Ensure realistic durations
-        if request.repairType.lower() in ['tyre', 'tire'] and duration > 2:
-            duration = 1
-        elif request.repairType.lower() in ['brake', 'oil change'] and duration > 3:
-            duration = 2
-        
-        # Confidence estimation
-        base_confidence = 0.8
-        # Higher confidence for shorter, common repairs
-        if duration <= 2:
-            base_confidence += 0.1
-        # Lower confidence for very long durations
-        if duration > 7:
-            base_confidence -= 0.2
-        
-        confidence = min(0.95, max(0.5, base_confidence))
+        with stage_seconds.time(stage="transform"):
+            X_processed = preprocessor.transform(input_df)
+    
+    # Predict
+    with stage_seconds.time(stage="predict"):
+        durations = model.predict(X_processed)
+    if quantile_model is None:
+        return durations, None
+    with stage_seconds.time(stage="predict_quantiles"):
+        return durations, quantile_model.predict(X_processed).reshape(len(requests), -1)
+
+def prediction_cache_key(request: EnhancedRepairRequest) -> tuple:
+    """Post-normalization feature values: requests with equal keys get equal predictions."""
+    row = create_prediction_feature_row(request)
+    return tuple(row[col] for col in PREDICTION_FEATURE_COLUMNS)
+
+async def get_enhanced_prediction(request: EnhancedRepairRequest) -> DurationPrediction:
+    """Get prediction with confidence estimation."""
+    return (await get_enhanced_predictions([request]))[0]
+
+async def get_enhanced_predictions(requests: List[EnhancedRepairRequest]) -> List[DurationPrediction]:
+    """Batched predictions: one transform/predict call for every request that needs the model."""
+    results: List[Optional[DurationPrediction]] = [None] * len(requests)
+    
+    # QUICK FIX: Force simple repairs to realistic durations
+    model_positions = []
+    for i, request in enumerate(requests):
+        if request.repairType.lower() in SIMPLE_REPAIRS:
+            results[i] = DurationPrediction(1, 0.9)
+        else:
+            model_positions.append(i)
+    
+    if not model_positions:
+        return results
+    
+    # Read the bundle once so the whole batch uses one consistent model version
+    bundle = model_handler.bundle
+    if bundle is None or bundle.model is None or bundle.preprocessor is None:
+        # Use fallback if model not available
+        fallback_predictions.inc(len(model_positions), reason="model_unavailable")
+        for i in model_positions:
+            results[i] = DurationPrediction(get_fallback_duration(requests[i]), 0.7)
+        return results
+    
+    # Serve repeated feature combinations from the cache; predict each distinct one once
+    pending: Dict[tuple, List[int]] = {}
+    for i in model_positions:
+        key = prediction_cache_key(requests[i])
+        cached = prediction_cache.get(bundle.version, key)
+        if cached is not None:
+            results[i] = cached
+        else:
+            pending.setdefault(key, []).append(i)
+    
+    if not pending:
+        return results
+    
+    try:
+        # Model inference is CPU-bound: keep it off the event loop
+        loop = asyncio.get_running_loop()
+        raw_durations, raw_quantiles = await loop.run_in_executor(
+            inference_executor,
+            predict_raw_durations,
+            bundle.model,
+            bundle.preprocessor,
+            bundle.feature_encoder,
+            [requests[positions[0]] for positions in pending.values()],
+            bundle.quantile_model
+        )
         
-        return duration, confidence
+        for n, (key, positions) in enumerate(pending.items()):
+            prediction = finalize_prediction(requests[positions[0]], raw_durations[n],
+                                             raw_quantiles[n] if raw_quantiles is not None else None)
+            prediction_cache.put(bundle.version, key, prediction)
+            for i in positions:
+                results[i] = prediction
         
     except Exception as e:
         print(f"Prediction error: {e}")
         # Fallback to simple rules
-        fallback_duration = get_fallback_duration(request)
-        return fallback_duration, 0.5
+        fallback_predictions.inc(sum(len(positions) for positions in pending.values()), reason="prediction_error")
+        for positions in pending.values():
+            for i in positions:
+                results[i] = DurationPrediction(get_fallback_duration(requests[i]), 0.5)
+    
+    return results
+
+
+# --- Scheduling Helpers ---
+
+async def refresh_job_snapshot():
+    """Makes sure the active-jobs snapshot is fresh; a stale one is used if the refresh fails."""
+    try:
+        with stage_seconds.time(stage="jobs_fetch"):
+            await job_snapshot.ensure_fresh()
+    except Exception as e:
+        if not job_snapshot.is_loaded:
+            # This specific error is about failing to get jobs
+            raise HTTPException(status_code=500, detail=f"Failed to fetch jobs: {e}")
+        print(f"WARNING: Job snapshot refresh failed, using stale snapshot: {e}")
+
+def parse_busy_schedule(all_jobs: List[Dict[str, Any]], config: WorkshopConfig) -> tuple:
+    """Array form of the active jobs: (BusySchedule, [(position, request)] for jobs without an endDate).
+
+    Dates are parsed in one vectorised call per column; jobs without a parsable
+    start are skipped. Runs on the inference pool.
+    """
+    jobs = [job for job in all_jobs if job.get('status') in ACTIVE_JOB_STATUSES]
+    starts = parse_dates([job.get('startDate') for job in jobs]).astype('datetime64[D]')
+    ends = parse_dates([job.get('endDate') or None for job in jobs]).astype('datetime64[D]')
+    
+    # Requirements are looked up once per repair type, then spread to the jobs by code
+    resource_names = list(config.resources)
+    codes, repair_types = pd.factorize(pd.Series([job.get('repairType') or 'general' for job in jobs], dtype=object))
+    type_demands = np.array([
+        [config.requirements_for(repair_type).get(name, 0) for name in resource_names]
+        for repair_type in repair_types
+    ], dtype=np.int32).reshape(len(repair_types), len(resource_names))
+    demands = type_demands[codes] if len(jobs) else np.zeros((0, len(resource_names)), dtype=np.int32)
+    
+    needs_estimate = []
+    default_model_year = datetime.now().year - 5
+    for i in np.flatnonzero(np.isnat(ends) & ~np.isnat(starts)):
+        job = jobs[i]
+        try:
+            needs_estimate.append((i, EnhancedRepairRequest(
+                vehicleType=job.get('vehicleType', 'sedan'),
+                vehicleBrand=job.get('vehicleBrand', 'unknown'),
+                repairType=job.get('repairType', 'general'),
+                millage=job.get('millage', 50000),
+                lastService=job.get('lastServiceDate', datetime.now().strftime("%d-%m-%Y")),
+                vehicleModelYear=job.get('vehicleModelYear', default_model_year)
+            )))
+        except Exception as e:
+            print(f"Error estimating end date for job: {e}")
+    
+    return BusySchedule(starts, ends, demands, resource_names), needs_estimate
+
+async def build_busy_schedule(all_jobs: List[Dict[str, Any]], config: WorkshopConfig) -> BusySchedule:
+    """Active jobs as a BusySchedule; missing end dates are predicted in one batch."""
+    loop = asyncio.get_running_loop()
+    schedule, needs_estimate = await loop.run_in_executor(inference_executor, parse_busy_schedule, all_jobs, config)
+    
+    ends = schedule.ends
+    if needs_estimate:
+        with stage_seconds.time(stage="end_date_estimation"):
+            predictions = await get_enhanced_predictions([request for _, request in needs_estimate])
+        positions = np.array([i for i, _ in needs_estimate])
+        ends = ends.copy()
+        ends[positions] = schedule.starts[positions] + np.array([p.duration for p in predictions], dtype='timedelta64[D]')
+    
+    # Jobs whose dates could not be parsed or estimated take no capacity
+    keep = ~np.isnat(schedule.starts) & ~np.isnat(ends)
+    return BusySchedule(schedule.starts[keep], ends[keep], schedule.demands[keep], schedule.resource_names)
+
+class SchedulingBase(NamedTuple):
+    """Active jobs as a BusySchedule and as a capacity index from ``index.origin``."""
+    schedule: BusySchedule
+    index: CapacityIndex
+    version: str  # Identifies the snapshot, configuration, model and origin it was built from
+
+# Days covered by the shared index: the longest search window plus room for long repairs
+CAPACITY_BASE_DAYS = max(settings.SUGGEST_MAX_HORIZON_DAYS, settings.AVAILABILITY_MAX_DAYS) + 60
+
+class BusyScheduleCache:
+    """The scheduling base of one (job snapshot, configuration, model, origin) version, built once and shared.
+
+    Requests arriving while that version is being built await the same build.
+    A failed build is not kept, so the next request retries it.
+    """
+
+    def __init__(self):
+        self.key = None
+        self.value = None
+        self.builds = 0
+        self._pending: Optional[asyncio.Task] = None
+        self._pending_key = None
+
+    async def get(self, key, build):
+        if self.key == key:
+            return self.value
+        task = self._pending
+        if task is None or self._pending_key != key or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(build())
+            self._pending, self._pending_key = task, key
+            self.builds += 1
+        try:
+            # A cancelled request must not cancel the build others are waiting for
+            value = await asyncio.shield(task)
+        finally:
+            if task.done() and self._pending is task:
+                self._pending = None
+        self.key, self.value = key, value
+        return value
+
+busy_schedule_cache = BusyScheduleCache()
+
+async def build_scheduling_base(all_jobs: List[Dict[str, Any]], config: WorkshopConfig, origin: date,
+                                version: str = "") -> SchedulingBase:
+    """Busy schedule plus its capacity index over CAPACITY_BASE_DAYS from ``origin``."""
+    schedule = await build_busy_schedule(all_jobs, config)
+    loop = asyncio.get_running_loop()
+    with stage_seconds.time(stage="capacity_index"):
+        index = await loop.run_in_executor(
+            inference_executor, build_capacity_index, schedule, origin, CAPACITY_BASE_DAYS, config.resources
+        )
+    return SchedulingBase(schedule, index, version)
+
+async def current_scheduling_base(config: WorkshopConfig) -> SchedulingBase:
+    """The active jobs' SchedulingBase for the current snapshot, ``config`` and model, from tomorrow."""
+    bundle = model_handler.bundle
+    origin = datetime.now().date() + timedelta(days=1)
+    # Read the job dict and its version together; the snapshot swaps the dict as a whole
+    jobs, version = job_snapshot.jobs, job_snapshot.version
+    key = (version, config.version, bundle.version if bundle is not None else None, origin)
+    return await busy_schedule_cache.get(
+        key, lambda: build_scheduling_base(list(jobs.values()), config, origin, ":".join(map(str, key)))
+    )
+
+def jobs_capacity_index(base: SchedulingBase, origin: date, horizon_days: int, config: WorkshopConfig) -> CapacityIndex:
+    """A private copy of the active jobs' usage over ``horizon_days`` from ``origin``."""
+    index = base.index.window(origin, horizon_days)
+    if index is None:
+        # Outside the shared window (past dates or far ahead): index the schedule directly
+        index = build_capacity_index(base.schedule, origin=origin, horizon_days=horizon_days, resources=config.resources)
+    return index
+
+async def active_reservations() -> tuple:
+    """(version, busy-schedule entries) of the reservations that still hold capacity."""
+    if not settings.RESERVATIONS_ENABLED:
+        return 0, []
+    version, reservations = await reservation_store.list_active()
+    # A confirmed hold stops counting once its appointment shows up in the job snapshot
+    return version, [r.as_busy_entry() for r in reservations if r.appointment_id not in job_snapshot.jobs]
+
+def reservation_response(reservation: Reservation) -> "ReservationResponse":
+    return ReservationResponse(
+        reservationId=reservation.id,
+        status=reservation.status,
+        startDate=reservation.start,
+        endDate=reservation.end,
+        expiresAt=datetime.fromtimestamp(reservation.expires_at, timezone.utc).isoformat(),
+        appointmentId=reservation.appointment_id
+    )
 
 
 # --- API Management Endpoints ---
@@ -308,27 +713,44 @@ async def get_enhanced_prediction(request: EnhancedRepairRequest) -> tuple:
 @app.post("/api/admin/resources")
 async def update_workshop_resources(update: ResourceUpdateRequest):
     """Update workshop resource counts dynamically."""
-    if update.resource_type not in settings.WORKSHOP_RESOURCES:
+    if update.resource_type not in workshop_config.current().resources:
         raise HTTPException(status_code=400, detail=f"Invalid resource type: {update.resource_type}")
     
-    settings.WORKSHOP_RESOURCES[update.resource_type] = update.new_count
-    return {"message": f"Resource {update.resource_type} updated to {update.new_count}"}
+    config = workshop_config.update(resources={update.resource_type: update.new_count})
+    return {"message": f"Resource {update.resource_type} updated to {update.new_count}", "version": config.version}
 
 @app.post("/api/admin/repair-requirements")
 async def update_repair_requirements(update: RepairRequirementUpdateRequest):
     """Update repair type requirements dynamically."""
-    settings.REPAIR_REQUIRIMENTS[update.repair_type] = update.requirements
-    return {"message": f"Requirements for {update.repair_type} updated"}
+    config = workshop_config.update(requirements={update.repair_type.lower(): update.requirements})
+    return {"message": f"Requirements for {update.repair_type} updated", "version": config.version}
 
 @app.get("/api/admin/configuration", response_model=ConfigurationResponse)
 async def get_current_configuration():
     """Get current system configuration."""
+    config = workshop_config.current()
     return ConfigurationResponse(
-        workshop_resources=settings.WORKSHOP_RESOURCES,
-        repair_requirements=settings.REPAIR_REQUIREMENTS,
-        model_features=settings.MODEL_FEATURES
+        workshop_resources=config.resources_dict(),
+        repair_requirements=config.requirements_dict(),
+        model_features=settings.MODEL_FEATURES,
+        version=config.version,
+        updated_at=config.updated_at
     )
 
+@app.get("/api/admin/configuration/history", response_model=List[ConfigurationResponse])
+async def get_configuration_history(limit: int = Query(20, ge=1, le=500)):
+    """Previous configuration versions, newest first."""
+    return [
+        ConfigurationResponse(
+            workshop_resources=config.resources_dict(),
+            repair_requirements=config.requirements_dict(),
+            model_features=settings.MODEL_FEATURES,
+            version=config.version,
+            updated_at=config.updated_at
+        )
+        for config in workshop_config.history(limit)
+    ]
+
 
 # ---
 # --- MODIFIED Startup/Shutdown Events
@@ -337,7 +759,9 @@ async def get_current_configuration():
 @app.on_event("startup")
 async def startup_event():
     """Initialize application."""
-    global kafka_producer
+
+    # 0. Shared outbound HTTP client
+    http_client = await start_http_client()
 
     # 1. Load model
     if not model_handler.load_model():
@@ -350,35 +774,26 @@ async def startup_event():
     scheduler.start()
     print(f"Scheduler started. Retraining every {settings.MODEL_RETRAIN_HOURS} hours.")
     
-    # 3. Start Kafka Producer (with retries)
-    retries = 5
-    while retries > 0:
-        try:
-            print(f"Attempting to connect Kafka producer to {settings.KAFKA_BOOTSTRAP_SERVERS}...")
-            kafka_producer = AIOKafkaProducer(
-                bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS
-            )
-            await kafka_producer.start()
-            print("Kafka producer started successfully.")
-            break  # Success! Exit the loop.
-        except Exception as e:
-            print(f"ERROR: Kafka producer connection failed: {e}")
-            retries -= 1
-            if retries > 0:
-                print(f"Retrying in 5 seconds... ({retries} attempts left)")
-                await asyncio.sleep(5) # Wait 5 seconds
-            else:
-                print("FATAL: Kafka producer could not connect. Audit events will not be sent.")
-                kafka_producer = None # Ensure it's None so send_prediction_event will skip
+    # 3. Start the audit emitter; it connects to Kafka (and reconnects) in the background
+    await audit_emitter.start()
+
+    # 4. Start the active jobs snapshot
+    await job_snapshot.start(http_client)
+
+    # 5. Load the workshop configuration and watch for updates from other workers
+    workshop_config.start()
                 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Clean up application."""
-    global kafka_producer
-    if kafka_producer:
-        await kafka_producer.stop()
-        print("Kafka producer stopped.")
+    await job_snapshot.stop()
+    await audit_emitter.stop()
+    await reservation_store.close()
+    await workshop_config.stop()
+    await close_http_client()
+    inference_executor.shutdown(wait=False, cancel_futures=True)
+    training_executor.shutdown(wait=False, cancel_futures=True)
 
 # ---
 # --- END OF MODIFIED Startup/Shutdown
@@ -387,6 +802,24 @@ async def shutdown_event():
 
 # --- API Endpoints ---
 
+@app.middleware("http")
+async def record_request_time(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template, not the raw path, so reservation ids don't create new series
+        route = request.scope.get("route")
+        request_seconds.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            route=route.path if route is not None else "unmatched",
+            status=status
+        )
+
 @app.get("/")
 async def root():
     return {
@@ -396,174 +829,320 @@ async def root():
         "features": "comprehensive ML model with dynamic configuration"
     }
 
+@app.get("/metrics")
+async def get_metrics():
+    """Stage timings, request latencies and fallback counts in the Prometheus text format."""
+    return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
 @app.get("/health")
 async def health_check():
-    model_status = "loaded" if model_handler.model is not None else "not loaded"
+    model_status = "loaded" if model_handler.bundle is not None else "not loaded"
     return {
         "status": "healthy",
         "model_status": model_status,
+        "retrain_in_progress": retrain_in_progress,
+        "prediction_cache": prediction_cache.stats(),
         "configuration_loaded": True,
+        "job_snapshot": job_snapshot.stats(),
+        "http_pool": pool_stats(),
+        "audit": audit_emitter.stats(),
+        "workshop_config_version": workshop_config.current().version,
         "timestamp": datetime.now().isoformat()
     }
 
 @app.post("/predict/duration", response_model=DurationResponse)
 async def predict_enhanced_duration(request: EnhancedRepairRequest):
     """Enhanced duration prediction with comprehensive features."""
-    duration, confidence = await get_enhanced_prediction(request)
+    prediction = await get_enhanced_prediction(request)
     
     return DurationResponse(
-        predictedDuration=duration,
-        confidence=round(confidence, 2),
+        predictedDuration=prediction.duration,
+        confidence=round(prediction.confidence, 2),
+        p90Duration=prediction.p90_duration,
         features_used=settings.MODEL_FEATURES
     )
 
+@app.post("/predict/duration/batch", response_model=List[DurationResponse])
+async def predict_enhanced_duration_batch(requests: List[EnhancedRepairRequest]):
+    """Duration predictions for many vehicles with a single model call."""
+    if len(requests) > settings.PREDICT_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=422, detail=f"At most {settings.PREDICT_BATCH_MAX_ITEMS} vehicles per batch")
+    predictions = await get_enhanced_predictions(requests)
+    
+    return [
+        DurationResponse(
+            predictedDuration=prediction.duration,
+            confidence=round(prediction.confidence, 2),
+            p90Duration=prediction.p90_duration,
+            features_used=settings.MODEL_FEATURES
+        )
+        for prediction in predictions
+    ]
+
 @app.post("/schedule/suggest-start", response_model=ScheduleResponse)
-async def suggest_enhanced_start_date(request: EnhancedRepairRequest):
-    """Enhanced scheduling with comprehensive prediction."""
+async def suggest_enhanced_start_date(
+    request: EnhancedRepairRequest,
+    top_k: int = Query(1, ge=1, le=settings.SUGGEST_MAX_TOP_K),
+    horizon_days: int = Query(settings.SUGGEST_HORIZON_DAYS, ge=1, le=settings.SUGGEST_MAX_HORIZON_DAYS),
+    reserve: bool = Query(settings.RESERVATION_HOLD_BY_DEFAULT),
+    use_p90: bool = Query(settings.SUGGEST_USE_P90)
+):
+    """Enhanced scheduling with comprehensive prediction.
+    
+    Returns the earliest feasible start within ``horizon_days`` and, with
+    ``top_k`` > 1, the next ``top_k - 1`` feasible starts as alternatives.
+    With ``reserve`` (default RESERVATION_HOLD_BY_DEFAULT) the suggested slot
+    is held for RESERVATION_HOLD_MINUTES so concurrent requests are not offered
+    it too; the caller then confirms or releases the returned reservation.
+    With ``use_p90`` the slot is sized for the P90 duration (when the model
+    has one), so fewer overrunning repairs have to be rescheduled.
+    """
     
     # Create a traceId. In a real system, you'd get this from the request header
     trace_id = str(uuid.uuid4())
     
     # --- THIS LOGIC IS UPDATED ---
-    await send_audit_event(
-        StandardAuditEvent(
-            eventName="PREDICTION_REQUESTED",
-            status="INFO",
-            traceId=trace_id,
-            payload=request.dict()
-        )
-    )
+    send_audit_event("PREDICTION_REQUESTED", "INFO", trace_id, payload=request)
 
     try:
         if not settings.NODE_API_ALL_JOBS or "your_node_api" in settings.NODE_API_ALL_JOBS:
             raise HTTPException(status_code=500, detail="API not configured")
         
         # Get enhanced prediction
-        needed_duration, confidence = await get_enhanced_prediction(request)
+        prediction = await get_enhanced_prediction(request)
+        needed_duration = prediction.duration
+        if use_p90 and prediction.p90_duration is not None:
+            needed_duration = prediction.p90_duration
         
-        # Normalize repair type for requirements lookup
-        repair_type = request.repairType.lower()
-        new_job_reqs = settings.REPAIR_REQUIREMENTS.get(
-            repair_type, 
-            settings.REPAIR_REQUIREMENTS["__default__"]
-        )
+        # One configuration snapshot for the whole request
+        config = workshop_config.current()
+        new_job_reqs = config.requirements_for(request.repairType)
 
-        # Fetch current jobs
-        try:
-            async with httpx.AsyncClient() as client:
-                all_jobs_resp = await client.get(settings.NODE_API_ALL_JOBS)
-                all_jobs_resp.raise_for_status()
-                all_jobs = all_jobs_resp.json()
-        except Exception as e:
-            # This specific error is about failing to get jobs
-            raise HTTPException(status_code=500, detail=f"Failed to fetch jobs: {e}")
-
-        # Build busy schedule
-        busy_schedule = []
-        for job in all_jobs:
-            if job.get('status') in ['Ongoing', 'Scheduled']:
-                start_date = pd.to_datetime(job['startDate'])
-                end_date = pd.to_datetime(job['endDate']) if job.get('endDate') else None
-                
-                if end_date is None:
-                    # ... (your logic for estimating end date)
-                    try:
-                        default_model_year = datetime.now().year - 5 
-                        ongoing_request = EnhancedRepairRequest(
-                            vehicleType=job.get('vehicleType', 'sedan'),
-                            vehicleBrand=job.get('vehicleBrand', 'unknown'),
-                            repairType=job.get('repairType', 'general'),
-                            millage=job.get('millage', 50000),
-                            lastService=job.get('lastServiceDate', datetime.now().strftime("%d-%m-%Y")),
-                            vehicleModelYear=job.get('vehicleModelYear', default_model_year)
-                        )
-                        ongoing_duration, _ = await get_enhanced_prediction(ongoing_request)
-                        end_date = start_date + timedelta(days=ongoing_duration)
-                    except Exception as e:
-                        print(f"Error estimating end date for job: {e}")
-                        continue
-                
-                job_repair_type = job.get('repairType', 'general').lower()
-                job_reqs = settings.REPAIR_REQUIRIMENTS.get(
-                    job_repair_type, 
-                    settings.REPAIR_REQUIREMENTS["__default__"]
-                )
-                
-                busy_schedule.append({
-                    "start": start_date,
-                    "end": end_date,
-                    "requirements": job_reqs
-                })
+        # Read current jobs from the in-memory snapshot
+        await refresh_job_snapshot()
+        base = await current_scheduling_base(config)
 
         # Find available slot - start from tomorrow
         check_date = pd.to_datetime('today').normalize() + timedelta(days=1)
-        max_check_days = 30  # Don't look more than 1 month ahead
-        
-        for day_offset in range(max_check_days):
-            current_check_date = check_date + timedelta(days=day_offset)
-            potential_end_date = current_check_date + timedelta(days=needed_duration - 1)
-            is_slot_available = True
-            
-            # Check each day in the potential booking period
-            for day in pd.date_range(start=current_check_date, end=potential_end_date):
-                resources_used_today = {resource: 0 for resource in settings.WORKSHOP_RESOURCES}
-                
-                # ... (your logic for calculating resource usage)
-                for job in busy_schedule:
-                    if job["start"].date() <= day.date() <= job["end"].date():
-                        for resource, amount in job["requirements"].items():
-                            if resource in resources_used_today:
-                                resources_used_today[resource] += amount
-                
-                # Check if we can add the new job
-                for resource, needed_amount in new_job_reqs.items():
-                    if resource not in settings.WORKSHOP_RESOURCES:
-                        continue
-                    available = settings.WORKSHOP_RESOURCES[resource]
-                    used = resources_used_today[resource]
-                    if (used + needed_amount) > available:
-                        is_slot_available = False
-                        break
-                
-                if not is_slot_available:
-                    break
-            
-            if is_slot_available:
-                
-                response = ScheduleResponse(
-                    suggestedStartDate=current_check_date.strftime('%Y-%m-%d'),
-                    predictedDuration=needed_duration,
-                    confidence=round(confidence, 2)
-                )
+        max_check_days = horizon_days
+
+        # Per-day resource usage is shared per snapshot version; slide the booking window over it.
+        # The prefix-sum search costs the same for a 180-day horizon as for 30 days.
+        jobs_index = jobs_capacity_index(base, check_date.date(), max_check_days + needed_duration - 1, config)
 
-                # --- THIS LOGIC IS UPDATED ---
-                await send_audit_event(
-                    StandardAuditEvent(
-                        eventName="PREDICTION_CALCULATED",
-                        status="SUCCESS",
-                        traceId=trace_id,
-                        payload=response.dict()
-                    )
+        # Held slots count as used. A hold only succeeds if no other hold landed since
+        # we read them; otherwise search again against the new holds.
+        reservation = None
+        for _ in range(max(1, settings.RESERVATION_MAX_RETRIES)):
+            reservations_version, held = await active_reservations()
+            capacity_index = jobs_index.copy()
+            capacity_index.add_jobs(held)
+            with stage_seconds.time(stage="slot_search"):
+                start_offsets = capacity_index.find_start_offsets(
+                    new_job_reqs, needed_duration, max_check_days, limit=top_k
                 )
-                return response
+            if len(start_offsets) == 0 or not (settings.RESERVATIONS_ENABLED and reserve):
+                break
+            reservation = Reservation.for_slot(
+                capacity_index.date_at(start_offsets[0]), needed_duration, new_job_reqs,
+                ttl_seconds=settings.RESERVATION_HOLD_MINUTES * 60
+            )
+            if await reservation_store.hold(reservation, reservations_version):
+                break
+            reservation = None
+        else:
+            raise HTTPException(status_code=409, detail="Slot was taken by a concurrent booking, please retry")
+
+        if len(start_offsets) > 0:
+            start_dates = [capacity_index.date_at(offset).strftime('%Y-%m-%d') for offset in start_offsets]
+
+            response = ScheduleResponse(
+                suggestedStartDate=start_dates[0],
+                predictedDuration=prediction.duration,
+                confidence=round(prediction.confidence, 2),
+                p90Duration=prediction.p90_duration,
+                bookedDuration=needed_duration,
+                alternativeStartDates=start_dates[1:],
+                reservationId=reservation.id if reservation else None,
+                reservedUntil=reservation_response(reservation).expiresAt if reservation else None
+            )
+
+            # --- THIS LOGIC IS UPDATED ---
+            send_audit_event("PREDICTION_CALCULATED", "SUCCESS", trace_id, payload=response)
+            return response
         
         # If the loop finishes without returning, no slot was found
-        raise HTTPException(status_code=404, detail="No available slots found in the next 30 days")
+        raise HTTPException(status_code=404, detail=f"No available slots found in the next {max_check_days} days")
 
     except Exception as e:
         # --- THIS LOGIC IS UPDATED ---
-        await send_audit_event(
-            StandardAuditEvent(
-                eventName="PREDICTION_FAILED",
-                status="FAILURE",
-                traceId=trace_id,
-                payload=request.dict(),
-                error={"message": str(e)}
-            )
-        )
+        send_audit_event("PREDICTION_FAILED", "FAILURE", trace_id, payload=request, error={"message": str(e)})
         # Re-raise the exception so the user gets the error
         raise e
 
+@app.post("/schedule/batch", response_model=BatchScheduleResponse)
+async def schedule_batch_jobs(
+    requests: List[BatchScheduleItem],
+    horizon_days: int = Query(settings.SUGGEST_HORIZON_DAYS, ge=1, le=settings.SUGGEST_MAX_HORIZON_DAYS),
+    reserve: bool = Query(settings.RESERVATION_HOLD_BY_DEFAULT)
+):
+    """Start dates for many repairs at once (e.g. a fleet), packed jointly into the free capacity.
+    
+    Uses list scheduling over the per-day capacity array under several priority
+    rules (bottleneck resource first, longest/shortest first, earliest deadline)
+    and keeps the best assignment. With ``reserve`` every assigned slot is held
+    like a suggest-start suggestion.
+    """
+    if not settings.NODE_API_ALL_JOBS or "your_node_api" in settings.NODE_API_ALL_JOBS:
+        raise HTTPException(status_code=500, detail="API not configured")
+    if len(requests) > settings.BATCH_SCHEDULE_MAX_JOBS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.BATCH_SCHEDULE_MAX_JOBS} jobs per batch")
+    if not requests:
+        return BatchScheduleResponse(assignments=[], scheduled=0, unscheduled=0, lastEndDate=None, heuristic="none")
+    
+    config = workshop_config.current()
+    predictions = await get_enhanced_predictions(requests)
+    jobs = [(config.requirements_for(r.repairType), p.duration) for r, p in zip(requests, predictions)]
+    
+    await refresh_job_snapshot()
+    base = await current_scheduling_base(config)
+    origin = (pd.to_datetime('today').normalize() + timedelta(days=1)).date()
+    deadlines = [(r.deadline - origin).days if r.deadline else None for r in requests]
+    jobs_index = jobs_capacity_index(base, origin, horizon_days + max(duration for _, duration in jobs) - 1, config)
+    
+    # Same optimistic protocol as suggest-start: all holds land, or none and we recompute
+    reservations = {}
+    for _ in range(max(1, settings.RESERVATION_MAX_RETRIES)):
+        reservations_version, held = await active_reservations()
+        capacity_index = jobs_index.copy()
+        capacity_index.add_jobs(held)
+        with stage_seconds.time(stage="batch_search"):
+            offsets, heuristic = schedule_batch(capacity_index, jobs, horizon_days, deadlines)
+        if not (settings.RESERVATIONS_ENABLED and reserve):
+            break
+        for i in np.flatnonzero(offsets >= 0):
+            reservation = Reservation.for_slot(
+                capacity_index.date_at(offsets[i]), jobs[i][1], jobs[i][0],
+                ttl_seconds=settings.RESERVATION_HOLD_MINUTES * 60
+            )
+            if not await reservation_store.hold(reservation, reservations_version + len(reservations)):
+                break
+            reservations[int(i)] = reservation
+        else:
+            break  # Every hold landed
+        # Lost a race part-way: undo our holds and recompute against the new ones
+        for reservation in reservations.values():
+            await reservation_store.release(reservation.id)
+        reservations = {}
+    else:
+        raise HTTPException(status_code=409, detail="Slots were taken by a concurrent booking, please retry")
+    
+    assignments = []
+    for i, (offset, (duration, confidence, _)) in enumerate(zip(offsets, predictions)):
+        placed = offset >= 0
+        assignments.append(BatchAssignment(
+            index=i,
+            suggestedStartDate=capacity_index.date_at(offset).isoformat() if placed else None,
+            predictedDuration=duration,
+            confidence=round(confidence, 2),
+            meetsDeadline=bool(placed and offset + duration - 1 <= deadlines[i]) if deadlines[i] is not None else None,
+            reservationId=reservations[i].id if i in reservations else None
+        ))
+    
+    placed = offsets >= 0
+    durations = np.array([duration for _, duration in jobs])
+    response = BatchScheduleResponse(
+        assignments=assignments,
+        scheduled=int(placed.sum()),
+        unscheduled=int((~placed).sum()),
+        lastEndDate=capacity_index.date_at((offsets + durations - 1)[placed].max()).isoformat() if placed.any() else None,
+        heuristic=heuristic
+    )
+    send_audit_event("BATCH_SCHEDULE_CALCULATED", "SUCCESS", str(uuid.uuid4()), payload={
+        "jobs": len(requests), "scheduled": response.scheduled, "heuristic": heuristic
+    })
+    return response
+
+@app.get("/schedule/availability", response_model=AvailabilityResponse)
+async def get_availability(
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to")
+):
+    """Remaining capacity for every day in [from, to], and the repair types whose typical duration can start there."""
+    if not settings.NODE_API_ALL_JOBS or "your_node_api" in settings.NODE_API_ALL_JOBS:
+        raise HTTPException(status_code=500, detail="API not configured")
+    
+    # Defaults to the next 30 days, starting tomorrow
+    from_date = from_date or (datetime.now().date() + timedelta(days=1))
+    to_date = to_date or (from_date + timedelta(days=29))
+    n_days = (to_date - from_date).days + 1
+    if n_days <= 0:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    if n_days > settings.AVAILABILITY_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Window is limited to {settings.AVAILABILITY_MAX_DAYS} days")
+    
+    await refresh_job_snapshot()
+    config = workshop_config.current()
+    base = await current_scheduling_base(config)
+    repair_types = {name: reqs for name, reqs in config.requirements.items() if name != DEFAULT_REQUIREMENTS_KEY}
+    durations = {name: base_duration_for(name) for name in repair_types}
+    # A type is feasible on a day if its typical repair can start there and run to completion
+    horizon = n_days + max(durations.values(), default=1) - 1
+    jobs_index = availability_cache.get(base.version, (from_date, to_date))
+    if jobs_index is None:
+        jobs_index = jobs_capacity_index(base, from_date, horizon, config)
+        availability_cache.put(base.version, (from_date, to_date), jobs_index)
+    
+    _, held = await active_reservations()
+    capacity_index = jobs_index.copy()
+    capacity_index.add_jobs(held)
+    with stage_seconds.time(stage="availability_search"):
+        remaining = capacity_index.remaining()[:n_days].tolist()
+        feasible = np.zeros((n_days, len(repair_types)), dtype=bool)
+        for j, (name, reqs) in enumerate(repair_types.items()):
+            feasible[capacity_index.find_start_offsets(reqs, durations[name], n_days, limit=None), j] = True
+    type_names = list(repair_types)
+    
+    response = AvailabilityResponse(
+        startDate=from_date.isoformat(),
+        endDate=to_date.isoformat(),
+        days=[
+            AvailabilityDay(
+                date=capacity_index.date_at(i).isoformat(),
+                remaining=dict(zip(capacity_index.resource_names, remaining[i])),
+                feasibleRepairTypes=[name for name, ok in zip(type_names, feasible[i]) if ok]
+            )
+            for i in range(n_days)
+        ]
+    )
+    return response
+
+@app.get("/schedule/reservations", response_model=List[ReservationResponse])
+async def list_reservations():
+    """Slots currently held or confirmed."""
+    _, reservations = await reservation_store.list_active()
+    return [reservation_response(r) for r in sorted(reservations, key=lambda r: r.start)]
+
+@app.post("/schedule/reservations/{reservation_id}/confirm", response_model=ReservationResponse)
+async def confirm_reservation(reservation_id: str, body: Optional[ReservationConfirmRequest] = None):
+    """Keeps a held slot until the booked appointment appears in the Node API's job list."""
+    reservation = await reservation_store.confirm(
+        reservation_id,
+        ttl_seconds=settings.RESERVATION_CONFIRMED_HOURS * 3600,
+        appointment_id=body.appointmentId if body else None
+    )
+    if reservation is None:
+        raise HTTPException(status_code=404, detail="Reservation not found or expired")
+    job_snapshot.request_refresh()
+    return reservation_response(reservation)
+
+@app.post("/schedule/reservations/{reservation_id}/release")
+async def release_reservation(reservation_id: str):
+    """Frees a held slot the customer did not take."""
+    if not await reservation_store.release(reservation_id):
+        raise HTTPException(status_code=404, detail="Reservation not found or expired")
+    return {"message": f"Reservation {reservation_id} released"}
+
 @app.post("/training/trigger")
 async def trigger_training(background_tasks: BackgroundTasks):
     """Manual training trigger."""
@@ -573,14 +1152,20 @@ async def trigger_training(background_tasks: BackgroundTasks):
 @app.get("/model/info")
 async def get_model_info():
     """Get information about the current model."""
-    if model_handler.model is None:
+    bundle = model_handler.bundle
+    if bundle is None:
         raise HTTPException(status_code=404, detail="No model loaded")
     
     return {
-        "model_type": type(model_handler.model).__name__,
-        "features_used": model_handler.feature_names if model_handler.feature_names else [],
-        "preprocessor_available": model_handler.preprocessor is not None,
-        "training_date": "Unknown" 
+        "model_type": getattr(bundle.model, "source_type", "") or type(bundle.model).__name__,
+        "memory_mapped": isinstance(bundle.model, FlatForest),
+        "version": bundle.version,
+        "features_used": bundle.feature_names if bundle.feature_names else [],
+        "preprocessor_available": bundle.preprocessor is not None,
+        "quantile_model_available": bundle.quantile_model is not None,
+        "training_date": bundle.training_date,
+        "training_report": bundle.training_report,
+        "available_versions": model_handler.registry.list_versions()
     }
 
 @app.post("/debug/prediction")
@@ -597,10 +1182,11 @@ async def debug_prediction(request: EnhancedRepairRequest):
     
     # Get model prediction
     model_duration = None
-    if model_handler.model is not None and model_handler.preprocessor is not None:
+    bundle = model_handler.bundle
+    if bundle is not None:
         try:
-            X_processed = model_handler.preprocessor.transform(input_df)
-            raw_prediction = model_handler.model.predict(X_processed)[0]
+            X_processed = bundle.preprocessor.transform(input_df)
+            raw_prediction = bundle.model.predict(X_processed)[0]
             model_duration = max(1, int(round(raw_prediction)))
             print(f"Raw model prediction: {raw_prediction:.2f} days")
             print(f"Rounded model prediction: {model_duration} days")
@@ -612,33 +1198,42 @@ async def debug_prediction(request: EnhancedRepairRequest):
     print(f"Fallback duration: {fallback} days")
     
     # Get final prediction
-    final_duration, confidence = await get_enhanced_prediction(request)
-    print(f"Final prediction: {final_duration} days (confidence: {confidence})")
+    final_duration, confidence, p90_duration = await get_enhanced_prediction(request)
+    print(f"Final prediction: {final_duration} days (confidence: {confidence}, P90: {p90_duration})")
     
     return {
         "input_features": input_df.iloc[0].to_dict(),
         "model_prediction": model_duration,
         "fallback_duration": fallback,
         "final_prediction": final_duration,
-        "confidence": confidence
+        "confidence": confidence,
+        "p90_duration": p90_duration
     }
 
-def scheduled_retrain():
+async def scheduled_retrain():
     """Scheduled retraining function."""
+    global retrain_in_progress
+    if retrain_in_progress:
+        print("Retraining already in progress. Skipping.")
+        return
+    
+    retrain_in_progress = True
     print("Starting scheduled retraining...")
     try:
-        # We need to run the async function in a new event loop for a scheduled job
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        success = loop.run_until_complete(train_enhanced_model())
+        loop = asyncio.get_running_loop()
+        # Fetch, train and save in the worker process; the server keeps serving
+        success = await loop.run_in_executor(training_executor, run_training_job)
         
         if success:
-            model_handler.load_model()  # Reload the new model
+            # Hot-swap the new artifact once the worker has written it
+            await loop.run_in_executor(inference_executor, model_handler.load_model)
             print("Scheduled retraining completed successfully.")
         else:
             print("Scheduled retraining failed.")
     except Exception as e:
         print(f"Scheduled retraining error: {e}")
+    finally:
+        retrain_in_progress = False
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,136 @@
+# model_registry.py
+
+import os
+import shutil
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, List, Optional
+
+import joblib
+
+ARTIFACT_NAME = "model.joblib"
+SERVING_ARTIFACT_NAME = "serving.joblib"  # Flat arrays only, loadable with mmap_mode='r'
+CURRENT_POINTER = "current"
+
+
+@dataclass(frozen=True)
+class ModelBundle:
+    """Everything needed to serve predictions from one trained model.
+
+    Immutable: the server swaps the whole bundle with a single reference
+    assignment, so a request never sees a new model with an old preprocessor.
+    """
+    model: Any
+    preprocessor: Any
+    feature_names: List[str] = field(default_factory=list)
+    feature_encoder: Any = None
+    quantile_model: Any = None  # Predicts the training QUANTILES in one call; None for older artifacts
+    version: str = "unknown"
+    training_date: str = "Unknown"
+    training_report: Optional[dict] = None
+
+
+def new_version() -> str:
+    """Sortable version name based on the current time."""
+    return datetime.now().strftime("v%Y%m%dT%H%M%S%f")
+
+
+def _write_atomic(path: str, write):
+    """Writes via ``write(tmp_path)`` then renames over ``path`` so readers never see a partial file."""
+    tmp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.{os.getpid()}.tmp")
+    try:
+        write(tmp_path)
+        with open(tmp_path, 'rb') as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class ModelRegistry:
+    """Directory of versioned model artifacts with a ``current`` pointer.
+
+    Layout::
+
+        <root>/<version>/model.joblib
+        <root>/<version>/serving.joblib   (optional, memory-mappable)
+        <root>/current            -> text file holding the active version
+    """
+
+    def __init__(self, root: str, keep_versions: int = 5):
+        self.root = root
+        self.keep_versions = max(1, keep_versions)
+
+    def artifact_path(self, version: str) -> str:
+        return os.path.join(self.root, version, ARTIFACT_NAME)
+
+    def list_versions(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            name for name in os.listdir(self.root)
+            if os.path.isfile(self.artifact_path(name))
+        )
+
+    def current_version(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.root, CURRENT_POINTER)) as f:
+                version = f.read().strip()
+        except FileNotFoundError:
+            return None
+        return version or None
+
+    def serving_path(self, version: str) -> str:
+        return os.path.join(self.root, version, SERVING_ARTIFACT_NAME)
+
+    def save(self, artifact: dict, serving_artifact: Optional[dict] = None) -> str:
+        """Writes a new version and points ``current`` at it. Returns the version.
+
+        Both files are written uncompressed so their NumPy arrays can be memory-mapped.
+        """
+        version = artifact.get('version') or new_version()
+        os.makedirs(os.path.join(self.root, version), exist_ok=True)
+
+        if serving_artifact is not None:
+            serving_artifact = dict(serving_artifact, version=version)
+            _write_atomic(self.serving_path(version),
+                          lambda tmp: joblib.dump(serving_artifact, tmp, compress=0))
+        _write_atomic(self.artifact_path(version), lambda tmp: joblib.dump(artifact, tmp, compress=0))
+        self.set_current(version)
+        self._prune()
+        return version
+
+    def set_current(self, version: str):
+        """Activates an existing version (also used for rollbacks)."""
+        if not os.path.isfile(self.artifact_path(version)):
+            raise FileNotFoundError(f"No model artifact for version {version}")
+
+        def write_pointer(tmp_path):
+            with open(tmp_path, 'w') as f:
+                f.write(version)
+
+        _write_atomic(os.path.join(self.root, CURRENT_POINTER), write_pointer)
+
+    def load_current(self, mmap: bool = False) -> Optional[dict]:
+        """Loads the artifact the ``current`` pointer refers to, or None if there is none.
+
+        With ``mmap=True`` the serving artifact is preferred and its arrays are
+        memory-mapped read-only, so workers share them through the page cache.
+        """
+        version = self.current_version()
+        if version is None:
+            return None
+        if mmap and os.path.isfile(self.serving_path(version)):
+            artifact = joblib.load(self.serving_path(version), mmap_mode='r')
+        else:
+            artifact = joblib.load(self.artifact_path(version))
+        artifact.setdefault('version', version)
+        return artifact
+
+    def _prune(self):
+        current = self.current_version()
+        versions = self.list_versions()
+        for version in versions[:-self.keep_versions]:
+            if version != current:
+                shutil.rmtree(os.path.join(self.root, version), ignore_errors=True)
@@ -0,0 +1,185 @@
+# reservations.py
+
+import asyncio
+import json
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+HELD = "held"
+CONFIRMED = "confirmed"
+
+
+@dataclass
+class Reservation:
+    """A tentative hold on workshop resources for the days [start, end] (inclusive)."""
+    start: str  # ISO dates
+    end: str
+    requirements: Dict[str, int]
+    expires_at: float  # Wall-clock seconds, so several workers can share a store
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    status: str = HELD
+    appointment_id: Optional[str] = None  # Set on confirm; the hold ends once that job is in the snapshot
+
+    @classmethod
+    def for_slot(cls, start: date, duration: int, requirements: Dict[str, int], ttl_seconds: float) -> "Reservation":
+        return cls(
+            start=start.isoformat(),
+            end=(start + timedelta(days=max(1, duration) - 1)).isoformat(),
+            requirements=dict(requirements),
+            expires_at=time.time() + ttl_seconds
+        )
+
+    def is_expired(self, now: Optional[float] = None) -> bool:
+        return self.expires_at <= (time.time() if now is None else now)
+
+    def as_busy_entry(self) -> dict:
+        """The reservation in the busy-schedule shape used by build_capacity_index."""
+        return {
+            "start": date.fromisoformat(self.start),
+            "end": date.fromisoformat(self.end),
+            "requirements": self.requirements
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, raw) -> "Reservation":
+        return cls(**json.loads(raw))
+
+
+class InMemoryReservationStore:
+    """Reservation table for a single worker process.
+
+    ``version`` is bumped by every new hold. A scheduler reads the active holds
+    with their version, computes a slot, and ``hold`` only succeeds if nothing
+    was reserved in between (optimistic concurrency); otherwise it recomputes.
+    """
+
+    def __init__(self):
+        self._reservations: Dict[str, Reservation] = {}
+        self._version = 0
+        self._lock = asyncio.Lock()
+
+    async def list_active(self) -> Tuple[int, List[Reservation]]:
+        now = time.time()
+        for reservation_id in [r.id for r in self._reservations.values() if r.is_expired(now)]:
+            del self._reservations[reservation_id]
+        return self._version, list(self._reservations.values())
+
+    async def hold(self, reservation: Reservation, expected_version: int) -> bool:
+        async with self._lock:
+            if self._version != expected_version:
+                return False
+            self._reservations[reservation.id] = reservation
+            self._version += 1
+            return True
+
+    async def confirm(self, reservation_id: str, ttl_seconds: float,
+                      appointment_id: Optional[str] = None) -> Optional[Reservation]:
+        async with self._lock:
+            reservation = self._reservations.get(reservation_id)
+            if reservation is None or reservation.is_expired():
+                return None
+            reservation.status = CONFIRMED
+            reservation.appointment_id = appointment_id
+            reservation.expires_at = time.time() + ttl_seconds
+            return reservation
+
+    async def release(self, reservation_id: str) -> bool:
+        async with self._lock:
+            return self._reservations.pop(reservation_id, None) is not None
+
+    async def close(self):
+        pass
+
+
+class RedisReservationStore:
+    """The same table in Redis, shared by every worker and replica.
+
+    Reservations live in one hash; holds use WATCH on a version key so two
+    workers cannot both reserve against the same view, and confirms WATCH the
+    hash so they cannot resurrect a released hold. Needs the optional
+    ``redis`` package.
+    """
+
+    CONFIRM_ATTEMPTS = 5
+
+    def __init__(self, url: str, key: str = "prediction:reservations"):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+        self.key = key
+        self.version_key = f"{key}:version"
+
+    async def list_active(self) -> Tuple[int, List[Reservation]]:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.get(self.version_key)
+            pipe.hgetall(self.key)
+            version, raw = await pipe.execute()
+
+        now = time.time()
+        reservations = [Reservation.from_json(value) for value in raw.values()]
+        expired = [r.id for r in reservations if r.is_expired(now)]
+        if expired:
+            await self._redis.hdel(self.key, *expired)
+        return int(version or 0), [r for r in reservations if not r.is_expired(now)]
+
+    async def hold(self, reservation: Reservation, expected_version: int) -> bool:
+        from redis.exceptions import WatchError
+
+        async with self._redis.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(self.version_key)
+                if int(await pipe.get(self.version_key) or 0) != expected_version:
+                    return False
+                pipe.multi()
+                pipe.hset(self.key, reservation.id, reservation.to_json())
+                pipe.incr(self.version_key)
+                await pipe.execute()
+                return True
+            except WatchError:
+                return False
+
+    async def confirm(self, reservation_id: str, ttl_seconds: float,
+                      appointment_id: Optional[str] = None) -> Optional[Reservation]:
+        from redis.exceptions import WatchError
+
+        # WATCH the table so a release or expiry sweep in between is not overwritten;
+        # if anything else changed it, read the hold again
+        for _ in range(self.CONFIRM_ATTEMPTS):
+            async with self._redis.pipeline(transaction=True) as pipe:
+                try:
+                    await pipe.watch(self.key)
+                    raw = await pipe.hget(self.key, reservation_id)
+                    if raw is None:
+                        return None
+                    reservation = Reservation.from_json(raw)
+                    if reservation.is_expired():
+                        return None
+                    reservation.status = CONFIRMED
+                    reservation.appointment_id = appointment_id
+                    reservation.expires_at = time.time() + ttl_seconds
+                    pipe.multi()
+                    pipe.hset(self.key, reservation_id, reservation.to_json())
+                    await pipe.execute()
+                    return reservation
+                except WatchError:
+                    continue
+        return None
+
+    async def release(self, reservation_id: str) -> bool:
+        return bool(await self._redis.hdel(self.key, reservation_id))
+
+    async def close(self):
+        await self._redis.aclose()
+
+
+def create_reservation_store(redis_url: str = ""):
+    """Redis-backed store when a URL is configured, otherwise the in-process table."""
+    if redis_url:
+        return RedisReservationStore(redis_url)
+    return InMemoryReservationStore()
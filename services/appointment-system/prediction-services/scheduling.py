@@ -0,0 +1,217 @@
+# scheduling.py
+
+import numpy as np
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple, Union
+
+
+@dataclass(frozen=True)
+class BusySchedule:
+    """Active jobs as arrays: inclusive [start, end] days and per-resource demand.
+
+    Column ``j`` of ``demands`` is the resource ``resource_names[j]``. Built once
+    per job-snapshot version and shared by every scheduling request.
+    """
+    starts: np.ndarray   # datetime64[D]
+    ends: np.ndarray     # datetime64[D]
+    demands: np.ndarray  # int32, (jobs, resources)
+    resource_names: List[str]
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+
+class CapacityIndex:
+    """Per-day, per-resource workshop usage over a fixed horizon.
+
+    Row ``i`` of ``usage`` is the day ``origin + i``, column ``j`` is the
+    resource ``resource_names[j]``. The active jobs' index is built once per
+    snapshot version; requests take a window of it and add their holds, so
+    slot searches are array operations instead of rescanning every job.
+    """
+
+    def __init__(self, origin: date, horizon_days: int, resources: Dict[str, int]):
+        self.origin = origin
+        self.horizon_days = max(0, int(horizon_days))
+        self.resource_names: List[str] = list(resources.keys())
+        self.resource_positions = {name: i for i, name in enumerate(self.resource_names)}
+        self.capacity = np.array([resources[name] for name in self.resource_names], dtype=np.int32)
+        self.usage = np.zeros((self.horizon_days, len(self.resource_names)), dtype=np.int32)
+
+    def copy(self) -> "CapacityIndex":
+        """An independent index with the same usage, for adding tentative demand."""
+        clone = CapacityIndex(self.origin, self.horizon_days, dict(zip(self.resource_names, self.capacity.tolist())))
+        clone.usage = self.usage.copy()
+        return clone
+
+    def window(self, origin: date, horizon_days: int) -> Optional["CapacityIndex"]:
+        """An independent index over ``horizon_days`` from ``origin``, or None if this one does not cover them."""
+        offset = (origin - self.origin).days
+        if offset < 0 or offset + horizon_days > self.horizon_days:
+            return None
+        clone = CapacityIndex(origin, horizon_days, dict(zip(self.resource_names, self.capacity.tolist())))
+        clone.usage = self.usage[offset:offset + clone.horizon_days].copy()
+        return clone
+
+    def requirement_vector(self, requirements: Dict[str, int]) -> np.ndarray:
+        """Maps a requirements dict onto the resource axis (unknown resources are ignored)."""
+        vector = np.zeros(len(self.resource_names), dtype=np.int32)
+        for resource, amount in requirements.items():
+            position = self.resource_positions.get(resource)
+            if position is not None:
+                vector[position] += amount
+        return vector
+
+    def add_jobs(self, busy_schedule: List[Dict]):
+        """Adds jobs ({"start", "end", "requirements"}) to the usage array in one pass."""
+        if not busy_schedule or self.horizon_days == 0:
+            return
+
+        start_offsets = np.empty(len(busy_schedule), dtype=np.int64)
+        end_offsets = np.empty(len(busy_schedule), dtype=np.int64)
+        demands = np.zeros((len(busy_schedule), len(self.resource_names)), dtype=np.int32)
+
+        for i, job in enumerate(busy_schedule):
+            start_offsets[i] = (_as_date(job["start"]) - self.origin).days
+            end_offsets[i] = (_as_date(job["end"]) - self.origin).days
+            demands[i] = self.requirement_vector(job["requirements"])
+
+        self.add_demand(start_offsets, end_offsets, demands)
+
+    def add_schedule(self, schedule: BusySchedule):
+        """Adds every job of a BusySchedule with array arithmetic only."""
+        if len(schedule) == 0 or self.horizon_days == 0:
+            return
+        origin = np.datetime64(self.origin, 'D')
+        demands = np.zeros((len(schedule), len(self.resource_names)), dtype=np.int32)
+        for j, name in enumerate(schedule.resource_names):
+            position = self.resource_positions.get(name)
+            if position is not None:
+                demands[:, position] += schedule.demands[:, j]
+        self.add_demand((schedule.starts - origin).astype(np.int64), (schedule.ends - origin).astype(np.int64), demands)
+
+    def add_demand(self, start_offsets: np.ndarray, end_offsets: np.ndarray, demands: np.ndarray):
+        """Adds inclusive [start, end] day ranges of demand using a difference array."""
+        first = np.clip(start_offsets, 0, None)
+        last = np.clip(end_offsets, None, self.horizon_days - 1)
+        in_window = first <= last
+        if not in_window.any():
+            return
+
+        delta = np.zeros((self.horizon_days + 1, len(self.resource_names)), dtype=np.int32)
+        np.add.at(delta, first[in_window], demands[in_window])
+        np.add.at(delta, last[in_window] + 1, -demands[in_window])
+        self.usage += np.cumsum(delta[:-1], axis=0, dtype=np.int32)
+
+    def feasible_days(self, requirements: Dict[str, int]) -> np.ndarray:
+        """Boolean per day: can one more job with these requirements fit on that day?"""
+        columns = [self.resource_positions[r] for r in requirements if r in self.resource_positions]
+        if not columns:
+            return np.ones(self.horizon_days, dtype=bool)
+
+        needed = self.requirement_vector(requirements)[columns]
+        fits = self.usage[:, columns] + needed <= self.capacity[columns]
+        return fits.all(axis=1)
+
+    def remaining(self) -> np.ndarray:
+        """Free units per day and resource (negative when a day is overbooked)."""
+        return self.capacity - self.usage
+
+    def find_start_offsets(self, requirements: Dict[str, int], duration: int,
+                           max_start_days: int, limit: Optional[int] = 1) -> np.ndarray:
+        """Returns the earliest day offsets where ``duration`` consecutive days are all feasible.
+
+        A sliding-window check over the prefix sum of infeasible days, so the
+        cost does not depend on the duration or on the number of jobs.
+        """
+        duration = max(1, int(duration))
+        last_start = min(max_start_days, self.horizon_days - duration + 1)
+        if last_start <= 0:
+            return np.empty(0, dtype=np.int64)
+
+        blocked = np.concatenate(([0], np.cumsum(~self.feasible_days(requirements))))
+        window_blocked = blocked[duration:duration + last_start] - blocked[:last_start]
+        offsets = np.flatnonzero(window_blocked == 0)
+        return offsets if limit is None else offsets[:limit]
+
+    def reserve(self, offset: int, duration: int, requirements: Dict[str, int]):
+        """Adds one job's demand for ``duration`` days starting at ``offset``."""
+        first = max(0, int(offset))
+        last = min(self.horizon_days, int(offset) + max(1, int(duration)))
+        if first < last:
+            self.usage[first:last] += self.requirement_vector(requirements)
+
+    def date_at(self, offset: int) -> date:
+        return self.origin + timedelta(days=int(offset))
+
+
+def _as_date(value) -> date:
+    """Calendar date of a datetime-like value (pd.Timestamp, datetime or date)."""
+    return value.date() if hasattr(value, "date") else value
+
+
+def list_schedule(index: CapacityIndex, jobs: List[Tuple[Dict[str, int], int]], order,
+                  max_start_days: int) -> np.ndarray:
+    """Places ``jobs`` ((requirements, duration)) one by one in ``order`` at their earliest feasible day.
+
+    Mutates ``index``. Returns the start offset of every job, -1 where none fits.
+    """
+    offsets = np.full(len(jobs), -1, dtype=np.int64)
+    for i in order:
+        requirements, duration = jobs[i]
+        found = index.find_start_offsets(requirements, duration, max_start_days)
+        if len(found):
+            offsets[i] = found[0]
+            index.reserve(found[0], duration, requirements)
+    return offsets
+
+
+def schedule_batch(index: CapacityIndex, jobs: List[Tuple[Dict[str, int], int]], max_start_days: int,
+                   deadlines: Optional[List[Optional[int]]] = None) -> Tuple[np.ndarray, str]:
+    """Jointly assigns start offsets to ``jobs`` ((requirements, duration)) on top of ``index``.
+
+    Runs list scheduling under several priority rules and keeps the assignment
+    with the fewest unscheduled jobs, then the fewest missed deadlines (last
+    allowed day offsets), then the smallest total start offset. ``index`` is
+    not modified. Returns (offsets with -1 for unscheduled jobs, rule name).
+    """
+    n = len(jobs)
+    if n == 0:
+        return np.empty(0, dtype=np.int64), "none"
+
+    durations = np.array([max(1, int(duration)) for _, duration in jobs])
+    capacity = np.maximum(index.capacity, 1)
+    # Share of the tightest resource each job needs; jobs on a bottleneck go first
+    scarcity = np.array([(index.requirement_vector(reqs) / capacity).max(initial=0) for reqs, _ in jobs])
+    due = np.array([d if d is not None else np.iinfo(np.int64).max for d in (deadlines or [None] * n)])
+
+    orders = {
+        "bottleneck_first": np.lexsort((-durations, -scarcity)),
+        "longest_first": np.lexsort((-scarcity, -durations)),
+        "shortest_first": np.lexsort((-scarcity, durations)),
+        "input_order": np.arange(n),
+    }
+    if deadlines is not None and any(d is not None for d in deadlines):
+        orders["earliest_deadline"] = np.lexsort((-scarcity, due))
+
+    best, best_rule, best_score = None, None, None
+    for rule, order in orders.items():
+        offsets = list_schedule(index.copy(), jobs, order, max_start_days)
+        placed = offsets >= 0
+        late = int((placed & (offsets + durations - 1 > due)).sum())
+        score = (int((~placed).sum()), late, int(offsets[placed].sum()))
+        if best_score is None or score < best_score:
+            best, best_rule, best_score = offsets, rule, score
+    return best, best_rule
+
+
+def build_capacity_index(busy_schedule: Union[BusySchedule, List[Dict]], origin: date, horizon_days: int,
+                         resources: Dict[str, int]) -> CapacityIndex:
+    """Precomputes the per-day resource usage of ``busy_schedule`` from ``origin``."""
+    index = CapacityIndex(origin, horizon_days, resources)
+    if isinstance(busy_schedule, BusySchedule):
+        index.add_schedule(busy_schedule)
+    else:
+        index.add_jobs(busy_schedule)
+    return index
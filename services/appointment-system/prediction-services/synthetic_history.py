@@ -0,0 +1,194 @@
+# synthetic_history.py
+"""
+Seeded generator of finished-job history in the Node API's shape.
+
+Rows carry the columns create_enhanced_features needs (vehicleType,
+vehicleBrand, repairType, millage, lastServiceDate, startDate, endDate,
+vehicleModelYear, vehicleRegistrationYear) plus an ``_id`` and ``status``.
+Durations follow the same drivers the model learns (repair type, millage,
+vehicle age, premium brands, season) with log-normal noise.
+
+Rows are produced in vectorized chunks, so millions of rows stream to disk in
+bounded memory:
+
+    python synthetic_history.py --rows 5000000 --format parquet --output history.parquet
+    python synthetic_history.py --rows 100000 --format json --output history.json
+
+The same ``seed`` and ``chunk_size`` always give the same rows.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date
+from typing import Iterator, List
+
+import numpy as np
+import pandas as pd
+
+# repairType -> (base days, relative frequency)
+REPAIR_PROFILES = {
+    "tyre": (1, 0.16),
+    "oil change": (1, 0.14),
+    "brake": (2, 0.14),
+    "full-service": (2, 0.12),
+    "general": (2, 0.08),
+    "exhaust": (2, 0.05),
+    "ac": (2, 0.05),
+    "electrical": (3, 0.08),
+    "suspension": (3, 0.06),
+    "transmission": (4, 0.05),
+    "engine": (5, 0.07),
+}
+VEHICLE_TYPES = {"Sedan": 0.38, "SUV": 0.28, "Hatchback": 0.14, "Truck": 0.10, "Van": 0.10}
+# brand -> (premium, relative frequency)
+VEHICLE_BRANDS = {
+    "Toyota": (False, 0.22), "Honda": (False, 0.14), "Nissan": (False, 0.12), "Suzuki": (False, 0.10),
+    "Mitsubishi": (False, 0.07), "Ford": (False, 0.07), "Hyundai": (False, 0.06),
+    "BMW": (True, 0.07), "Mercedes": (True, 0.06), "Audi": (True, 0.05), "Lexus": (True, 0.02),
+    "Volvo": (True, 0.02),
+}
+COMPLEX_REPAIRS = ("engine", "transmission", "electrical")
+COLUMNS = ["_id", "status", "vehicleType", "vehicleBrand", "repairType", "millage", "lastServiceDate",
+           "startDate", "endDate", "vehicleModelYear", "vehicleRegistrationYear"]
+
+
+def _choice(rng: np.random.Generator, weights: List[float], n: int) -> np.ndarray:
+    """Indices drawn with the given relative frequencies."""
+    p = np.asarray(weights, dtype=float)
+    return rng.choice(len(p), size=n, p=p / p.sum())
+
+
+def _iso_dates(days: np.ndarray) -> np.ndarray:
+    return np.datetime_as_string(days.astype("datetime64[D]"), unit="D").astype(object)
+
+
+def generate_chunk(n: int, rng: np.random.Generator, first_id: int = 0,
+                   start: date = date(2021, 1, 1), end: date = date(2025, 12, 31)) -> pd.DataFrame:
+    """``n`` finished jobs starting between ``start`` and ``end``, as a DataFrame in COLUMNS order."""
+    repair_idx = _choice(rng, [freq for _, freq in REPAIR_PROFILES.values()], n)
+    brand_idx = _choice(rng, [freq for _, freq in VEHICLE_BRANDS.values()], n)
+    type_idx = _choice(rng, list(VEHICLE_TYPES.values()), n)
+
+    start_day = np.datetime64(start, "D") + rng.integers(0, (end - start).days + 1, size=n)
+    start_year = start_day.astype("datetime64[Y]").astype(int) + 1970
+    model_year = start_year - np.minimum(rng.geometric(0.12, size=n) - 1, 30)
+    registration_year = np.minimum(model_year + rng.integers(0, 2, size=n), start_year)
+    # Older vehicles have driven further
+    millage = np.clip(
+        (start_year - model_year + 0.5) * rng.normal(15000, 5000, size=n), 500, 400000
+    ).astype(np.int64)
+    last_service = start_day - rng.integers(30, 730, size=n)
+
+    base_days = np.array([days for days, _ in REPAIR_PROFILES.values()], dtype=float)[repair_idx]
+    premium = np.array([is_premium for is_premium, _ in VEHICLE_BRANDS.values()])[brand_idx]
+    complex_repair = np.isin(repair_idx, [list(REPAIR_PROFILES).index(r) for r in COMPLEX_REPAIRS])
+    month = start_day.astype("datetime64[M]").astype(int) % 12 + 1
+    duration = (
+        base_days
+        + 0.5 * (millage > 100000) + 0.5 * (millage > 150000)
+        + 0.05 * (start_year - model_year)
+        + 1.0 * (premium & complex_repair)
+        + 0.3 * np.isin(month, (12, 1, 2))
+    ) * rng.lognormal(0, 0.25, size=n)
+    duration = np.clip(np.rint(duration), 1, 30).astype(np.int64)
+
+    # Some records come from the API with gaps, as real ones do
+    model_year_out = pd.array(model_year, dtype="Int64")
+    model_year_out[rng.random(n) < 0.03] = pd.NA
+
+    return pd.DataFrame({
+        "_id": [f"synthetic-{i}" for i in range(first_id, first_id + n)],
+        "status": "Finished",
+        "vehicleType": pd.Categorical.from_codes(type_idx, list(VEHICLE_TYPES)).astype(object),
+        "vehicleBrand": pd.Categorical.from_codes(brand_idx, list(VEHICLE_BRANDS)).astype(object),
+        "repairType": pd.Categorical.from_codes(repair_idx, list(REPAIR_PROFILES)).astype(object),
+        "millage": millage,
+        "lastServiceDate": _iso_dates(last_service),
+        "startDate": _iso_dates(start_day),
+        "endDate": _iso_dates(start_day + duration),
+        "vehicleModelYear": model_year_out,
+        "vehicleRegistrationYear": registration_year,
+    }, columns=COLUMNS)
+
+
+def iter_history(rows: int, seed: int = 42, chunk_size: int = 100_000, **date_range) -> Iterator[pd.DataFrame]:
+    """Yields ``rows`` jobs in DataFrames of up to ``chunk_size`` rows."""
+    chunk_seeds = np.random.SeedSequence(seed).spawn(max(1, -(-rows // chunk_size)))
+    for i, chunk_seed in enumerate(chunk_seeds):
+        n = min(chunk_size, rows - i * chunk_size)
+        if n <= 0:
+            break
+        yield generate_chunk(n, np.random.default_rng(chunk_seed), first_id=i * chunk_size, **date_range)
+
+
+def generate_history(rows: int, seed: int = 42, **kwargs) -> List[dict]:
+    """The history as a list of job dicts, as fetch_training_data returns it (for modest sizes)."""
+    records = []
+    for chunk in iter_history(rows, seed, **kwargs):
+        chunk = chunk.astype(object).where(chunk.notna(), None)
+        records.extend(chunk.to_dict("records"))
+    return records
+
+
+# --- Writers ---
+
+def write_json(path: str, rows: int, seed: int = 42, chunk_size: int = 100_000, lines: bool = False) -> int:
+    """Streams the history as one JSON array (the Node API's response shape) or as JSON lines."""
+    written = 0
+    with open(path, "w", encoding="utf-8") as f:
+        if not lines:
+            f.write("[")
+        for chunk in iter_history(rows, seed, chunk_size):
+            body = chunk.to_json(orient="records", lines=True)
+            if lines:
+                f.write(body)
+            else:
+                f.write(("," if written else "") + body.rstrip("\n").replace("\n", ","))
+            written += len(chunk)
+        if not lines:
+            f.write("]")
+    return written
+
+
+def write_parquet(path: str, rows: int, seed: int = 42, chunk_size: int = 100_000) -> int:
+    """Streams the history into one Parquet file, one row group per chunk (needs pyarrow)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    written = 0
+    try:
+        for chunk in iter_history(rows, seed, chunk_size):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema, compression="snappy")
+            writer.write_table(table)
+            written += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--format", choices=["json", "jsonl", "parquet"], default="parquet")
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.format == "parquet":
+        written = write_parquet(args.output, args.rows, args.seed, args.chunk_size)
+    else:
+        written = write_json(args.output, args.rows, args.seed, args.chunk_size, lines=args.format == "jsonl")
+    elapsed = time.perf_counter() - start
+    size_mb = os.path.getsize(args.output) / 1024 / 1024
+    print(f"Wrote {written} jobs to {args.output} ({size_mb:.1f} MB) in {elapsed:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
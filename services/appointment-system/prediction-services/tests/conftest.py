@@ -0,0 +1,86 @@
+# tests/conftest.py
+import asyncio
+import random
+from datetime import date, timedelta
+
+import httpx
+import pytest
+
+from config import settings
+from job_snapshot import JobSnapshot
+from reservations import InMemoryReservationStore
+from training import EnhancedVehicleRepairModel
+from workshop_config import WorkshopConfigStore
+
+REPAIR_DAYS = {"engine": 5, "brake": 2, "electrical": 3, "full-service": 2, "transmission": 4, "tyre": 1}
+
+
+def make_finished_jobs(n, seed=7):
+    """Small, deterministic finished-job history in the Node API's shape."""
+    rng = random.Random(seed)
+    jobs = []
+    for _ in range(n):
+        repair_type = rng.choice(list(REPAIR_DAYS))
+        start = date(2024, 1, 1) + timedelta(days=rng.randint(0, 600))
+        duration = max(1, REPAIR_DAYS[repair_type] + rng.randint(-1, 2))
+        jobs.append({
+            "vehicleType": rng.choice(["Sedan", "SUV", "Truck"]),
+            "vehicleBrand": rng.choice(["Toyota", "BMW", "Honda", "Audi"]),
+            "repairType": repair_type,
+            "millage": rng.randint(5000, 250000),
+            "lastServiceDate": (start - timedelta(days=rng.randint(30, 700))).isoformat(),
+            "startDate": start.isoformat(),
+            "endDate": (start + timedelta(days=duration)).isoformat(),
+            "vehicleModelYear": rng.randint(2000, 2024),
+            "vehicleRegistrationYear": rng.randint(2000, 2024),
+        })
+    return jobs
+
+
+@pytest.fixture(scope="session")
+def trained_model():
+    """An EnhancedVehicleRepairModel fitted on synthetic history."""
+    trainer = EnhancedVehicleRepairModel()
+    df = trainer.create_enhanced_features(make_finished_jobs(300))
+    assert trainer.train_model(df)
+    return trainer
+
+
+@pytest.fixture
+def loaded_main(trained_model, monkeypatch):
+    """The main module with the synthetic model installed in its model handler."""
+    import main
+
+    monkeypatch.setattr(main.model_handler, "bundle", trained_model.to_bundle("test"))
+    return main
+
+
+def call_app(main, method, path, **kwargs):
+    """Sends one request to the FastAPI app in-process."""
+    async def request():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.request(method, path, **kwargs)
+    return asyncio.run(request())
+
+
+@pytest.fixture
+def node_jobs(loaded_main, monkeypatch, tmp_path):
+    """Points the app at a mocked Node API; returns the (mutable) job list it serves."""
+    jobs = []
+
+    def handler(request):
+        return httpx.Response(200, json=jobs)
+
+    url = "http://node-api/api/appointments/active"
+    snapshot = JobSnapshot(url)
+    snapshot._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(settings, "NODE_API_ALL_JOBS", url)
+    monkeypatch.setattr(loaded_main, "job_snapshot", snapshot)
+    monkeypatch.setattr(loaded_main, "reservation_store", InMemoryReservationStore())
+    monkeypatch.setattr(loaded_main, "workshop_config", WorkshopConfigStore(
+        str(tmp_path / "workshop_config.sqlite3"), settings.WORKSHOP_RESOURCES, settings.REPAIR_REQUIREMENTS
+    ))
+    monkeypatch.setattr(loaded_main, "busy_schedule_cache", loaded_main.BusyScheduleCache())
+    loaded_main.availability_cache.clear()
+    return jobs
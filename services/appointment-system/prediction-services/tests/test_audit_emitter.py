@@ -0,0 +1,182 @@
+# tests/test_audit_emitter.py
+import asyncio
+import json
+import os
+from datetime import date, datetime
+
+import audit_emitter
+from audit_emitter import AuditEmitter, encode_audit_event
+from main import StandardAuditEvent
+from tests.test_predictions import make_request
+
+
+class FakeBroker:
+    """In-process stand-in for Kafka: records what producers send and can be taken down."""
+
+    def __init__(self):
+        self.up = True
+        self.messages = []
+        self.connects = 0
+
+    def producer(self):
+        return FakeProducer(self)
+
+
+class FakeProducer:
+    def __init__(self, broker):
+        self.broker = broker
+
+    async def start(self):
+        if not self.broker.up:
+            raise ConnectionError("broker unavailable")
+        self.broker.connects += 1
+
+    async def stop(self):
+        pass
+
+    async def send(self, topic, key=None, value=None):
+        if not self.broker.up:
+            raise ConnectionError("broker unavailable")
+        self.broker.messages.append((topic, key, value))
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(None)
+        return future
+
+
+def make_emitter(broker, tmp_path, **kwargs):
+    options = dict(batch_size=50, linger_ms=5, spool_path=str(tmp_path / "spool.jsonl"), reconnect_seconds=0.01)
+    options.update(kwargs)
+    return AuditEmitter("audit", broker.producer, **options)
+
+
+async def wait_for(condition, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not reached"
+        await asyncio.sleep(0.005)
+
+
+def values(broker):
+    return [json.loads(value)["n"] for _, _, value in broker.messages]
+
+
+def event(n):
+    return b"prediction-service", json.dumps({"n": n}).encode()
+
+
+def test_events_are_sent_in_batches(tmp_path):
+    broker = FakeBroker()
+
+    async def scenario():
+        emitter = make_emitter(broker, tmp_path)
+        await emitter.start()
+        for n in range(120):
+            assert emitter.emit(*event(n))
+        await wait_for(lambda: emitter.sent == 120)
+        await emitter.stop()
+        return emitter
+
+    emitter = asyncio.run(scenario())
+    assert values(broker) == list(range(120))
+    assert emitter.batches <= 4
+    assert {topic for topic, _, _ in broker.messages} == {"audit"}
+
+
+def test_broker_outage_spools_then_replays_in_order(tmp_path):
+    broker = FakeBroker()
+    broker.up = False
+
+    async def scenario():
+        emitter = make_emitter(broker, tmp_path)
+        await emitter.start()
+        for n in range(30):
+            emitter.emit(*event(n))
+        await wait_for(lambda: emitter.spooled == 30)
+        assert os.path.getsize(emitter.spool_path) > 0
+
+        broker.up = True
+        for n in range(30, 40):
+            emitter.emit(*event(n))
+        await wait_for(lambda: emitter.sent == 40)
+        await emitter.stop()
+        return emitter
+
+    emitter = asyncio.run(scenario())
+    assert values(broker) == list(range(40))
+    assert emitter.replayed == 30
+    assert emitter.stats()["spool_bytes"] == 0
+
+
+def test_spool_is_size_capped(tmp_path):
+    broker = FakeBroker()
+    emitter = make_emitter(broker, tmp_path, spool_max_bytes=200)
+    emitter._spool([event(n) for n in range(20)])
+
+    assert os.path.getsize(emitter.spool_path) <= 200
+    assert emitter.spooled + emitter.dropped == 20
+    assert emitter.dropped > 0
+
+
+def test_full_queue_spills_to_disk_instead_of_blocking(tmp_path):
+    broker = FakeBroker()
+    broker.up = False
+
+    async def scenario():
+        emitter = make_emitter(broker, tmp_path, queue_size=5, reconnect_seconds=60)
+        await emitter.start()
+        await asyncio.sleep(0.01)  # Let the drainer fail its first connect and start sleeping
+        accepted = [emitter.emit(*event(n)) for n in range(8)]
+        await emitter.stop()
+        return emitter, accepted
+
+    emitter, accepted = asyncio.run(scenario())
+    assert accepted == [True] * 5 + [False] * 3
+    # Overflow first, then the queued events when stop() found Kafka still down
+    assert emitter.spooled == 8
+    assert len(AuditEmitter._read_spool(emitter.spool_path)) == 8
+
+
+def test_stop_flushes_queued_events(tmp_path):
+    broker = FakeBroker()
+
+    async def scenario():
+        emitter = make_emitter(broker, tmp_path, linger_ms=1000)
+        await emitter.start()
+        await wait_for(lambda: emitter.connected)
+        for n in range(10):
+            emitter.emit(*event(n))
+        await emitter.stop()
+
+    asyncio.run(scenario())
+    assert sorted(values(broker)) == list(range(10))
+
+
+# -----------------------------
+# Encoding
+# -----------------------------
+def test_encoded_event_matches_standard_schema(monkeypatch):
+    request = make_request()
+    for encoder in (audit_emitter.orjson, None):
+        monkeypatch.setattr(audit_emitter, "orjson", encoder)
+        raw = encode_audit_event("prediction-service", "PREDICTION_REQUESTED", "INFO", "trace-1", payload=request)
+
+        event = StandardAuditEvent.parse_raw(raw)
+        assert event.serviceName == "prediction-service"
+        assert event.eventName == "PREDICTION_REQUESTED"
+        assert event.traceId == "trace-1"
+        assert event.payload == request.dict()
+        assert event.error is None
+        assert list(json.loads(raw)) == list(StandardAuditEvent.__fields__)
+
+
+def test_both_encoders_handle_dates_and_nested_models(monkeypatch):
+    payload = {"day": date(2025, 3, 1), "at": datetime(2025, 3, 1, 8, 30), "request": make_request()}
+    encoded = []
+    for encoder in (audit_emitter.orjson, None):
+        monkeypatch.setattr(audit_emitter, "orjson", encoder)
+        encoded.append(json.loads(audit_emitter.dumps(payload)))
+
+    assert encoded[0] == encoded[1]
+    assert encoded[1]["day"] == "2025-03-01"
+    assert encoded[1]["at"] == "2025-03-01T08:30:00"
+    assert encoded[1]["request"] == make_request().dict()
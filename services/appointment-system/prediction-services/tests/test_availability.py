@@ -0,0 +1,91 @@
+# tests/test_availability.py
+import asyncio
+from datetime import date, timedelta
+
+from config import settings
+from reservations import Reservation
+from tests.conftest import call_app
+
+FROM = date.today() + timedelta(days=1)
+
+
+def get(main, path, **params):
+    return call_app(main, "GET", path, params=params)
+
+
+def engine_job(job_id, start, end):
+    return {"_id": job_id, "status": "Ongoing", "repairType": "engine",
+            "startDate": start.isoformat(), "endDate": end.isoformat()}
+
+
+def test_availability_reports_remaining_capacity_and_feasible_types(loaded_main, node_jobs):
+    jobs = node_jobs
+    # Both engine bays are taken on the second and third day of the window
+    jobs.extend(engine_job(f"e{i}", FROM + timedelta(days=1), FROM + timedelta(days=2)) for i in range(2))
+
+    response = get(loaded_main, "/schedule/availability", **{"from": FROM.isoformat(),
+                                                               "to": (FROM + timedelta(days=4)).isoformat()})
+    assert response.status_code == 200
+    days = response.json()["days"]
+    assert [day["date"] for day in days] == [(FROM + timedelta(days=i)).isoformat() for i in range(5)]
+    assert [day["remaining"]["engine_bay"] for day in days] == [2, 0, 0, 2, 2]
+    assert days[0]["remaining"] == settings.WORKSHOP_RESOURCES
+    # An engine repair takes five days, so it cannot start before the blocked days either
+    assert ["engine" in day["feasibleRepairTypes"] for day in days] == [False, False, False, True, True]
+    assert all("tyre" in day["feasibleRepairTypes"] for day in days)
+    assert all("__default__" not in day["feasibleRepairTypes"] for day in days)
+
+
+def test_availability_is_cached_until_the_job_snapshot_changes(loaded_main, node_jobs, monkeypatch):
+    jobs = node_jobs
+    calls = []
+    original = loaded_main.build_busy_schedule
+
+    async def counting_build(all_jobs, config):
+        calls.append(len(all_jobs))
+        return await original(all_jobs, config)
+
+    monkeypatch.setattr(loaded_main, "build_busy_schedule", counting_build)
+    params = {"from": FROM.isoformat(), "to": (FROM + timedelta(days=9)).isoformat()}
+
+    first = get(loaded_main, "/schedule/availability", **params).json()
+    assert get(loaded_main, "/schedule/availability", **params).json() == first
+    assert len(calls) == 1
+
+    jobs.append(engine_job("new", FROM, FROM))
+    asyncio.run(loaded_main.job_snapshot.refresh())
+    changed = get(loaded_main, "/schedule/availability", **params).json()
+    assert len(calls) == 2
+    assert changed["days"][0]["remaining"]["engine_bay"] == first["days"][0]["remaining"]["engine_bay"] - 1
+
+
+def test_holds_apply_on_top_of_the_cached_calendar(loaded_main, node_jobs, monkeypatch):
+    calls = []
+    original = loaded_main.build_busy_schedule
+
+    async def counting_build(all_jobs, config):
+        calls.append(len(all_jobs))
+        return await original(all_jobs, config)
+
+    monkeypatch.setattr(loaded_main, "build_busy_schedule", counting_build)
+    params = {"from": FROM.isoformat(), "to": (FROM + timedelta(days=9)).isoformat()}
+    first = get(loaded_main, "/schedule/availability", **params).json()
+
+    store = loaded_main.reservation_store
+    version, _ = asyncio.run(store.list_active())
+    hold = Reservation.for_slot(FROM, 2, {"engine_bay": 1}, ttl_seconds=600)
+    assert asyncio.run(store.hold(hold, version))
+
+    held = get(loaded_main, "/schedule/availability", **params).json()
+    assert len(calls) == 1
+    assert [day["remaining"]["engine_bay"] for day in held["days"][:3]] == [1, 1, 2]
+    assert held["days"][5] == first["days"][5]
+
+
+def test_availability_rejects_bad_windows(loaded_main, node_jobs):
+    backwards = get(loaded_main, "/schedule/availability", **{"from": "2030-01-10", "to": "2030-01-01"})
+    assert backwards.status_code == 400
+
+    too_long = FROM + timedelta(days=settings.AVAILABILITY_MAX_DAYS)
+    response = get(loaded_main, "/schedule/availability", **{"from": FROM.isoformat(), "to": too_long.isoformat()})
+    assert response.status_code == 400
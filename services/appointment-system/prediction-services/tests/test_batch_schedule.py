@@ -0,0 +1,63 @@
+# tests/test_batch_schedule.py
+from datetime import date, timedelta
+
+from config import settings
+from tests.conftest import call_app
+from tests.test_predictions import make_request
+
+TOMORROW = date.today() + timedelta(days=1)
+
+
+def batch(main, items, **params):
+    return call_app(main, "POST", "/schedule/batch", json=items, params=params)
+
+
+def test_fleet_is_packed_without_overbooking(loaded_main, node_jobs):
+    fleet = [make_request(repairType=repair).dict() for repair in ["engine"] * 5 + ["tyre"] * 4 + ["brake"] * 3]
+
+    response = batch(loaded_main, fleet, reserve="true")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["scheduled"] == 12 and body["unscheduled"] == 0
+    assert [a["index"] for a in body["assignments"]] == list(range(12))
+    assert all(a["reservationId"] for a in body["assignments"])
+
+    # Only two engine bays: never more than two engine jobs on the same day
+    days = call_app(loaded_main, "GET", "/schedule/availability").json()["days"]
+    assert all(min(day["remaining"].values()) >= 0 for day in days)
+    assert days[0]["remaining"]["engine_bay"] == 0
+
+
+def test_deadlines_are_reported(loaded_main, node_jobs):
+    items = [
+        dict(make_request(repairType="tyre").dict(), deadline=(TOMORROW + timedelta(days=60)).isoformat()),
+        dict(make_request(repairType="engine").dict(), deadline=TOMORROW.isoformat()),
+    ]
+    assignments = batch(loaded_main, items).json()["assignments"]
+    assert assignments[0]["meetsDeadline"] is True
+    assert assignments[1]["meetsDeadline"] is False  # Can't finish a multi-day repair by tomorrow
+    assert all(a["reservationId"] is None for a in assignments)
+
+
+def test_batch_size_is_limited(loaded_main, node_jobs, monkeypatch):
+    monkeypatch.setattr(settings, "BATCH_SCHEDULE_MAX_JOBS", 2)
+    assert batch(loaded_main, [make_request().dict()] * 3).status_code == 400
+
+
+def test_partial_holds_are_released_after_a_lost_race(loaded_main, node_jobs, monkeypatch):
+    store = loaded_main.reservation_store
+    real_hold = store.hold
+    calls = {"n": 0}
+
+    async def flaky_hold(reservation, expected_version):
+        calls["n"] += 1
+        if calls["n"] == 2:
+            return False  # A concurrent booking lands between our first and second hold
+        return await real_hold(reservation, expected_version)
+
+    monkeypatch.setattr(store, "hold", flaky_hold)
+    response = batch(loaded_main, [make_request(repairType="engine").dict()] * 3, reserve="true")
+    assert response.status_code == 200
+
+    held = call_app(loaded_main, "GET", "/schedule/reservations").json()
+    assert sorted(r["reservationId"] for r in held) == sorted(a["reservationId"] for a in response.json()["assignments"])
@@ -0,0 +1,53 @@
+# tests/test_category_codes.py
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import OneHotEncoder
+
+from category_codes import CategoryCodeEncoder, CategoryVocabulary, frame_memory_report, recode
+from synthetic_history import generate_history
+from training import EnhancedVehicleRepairModel
+
+
+def test_recode_lowercases_per_category_and_keeps_codes_stable():
+    vocabulary = CategoryVocabulary()
+    first = recode(pd.Series(["BMW", "audi", None, "bmw"]), vocabulary, "vehicleBrand", fill="unknown")
+    assert list(first) == ["bmw", "audi", "unknown", "bmw"]
+
+    second = recode(pd.Series(["Tesla", "Audi"]), vocabulary, "vehicleBrand", fill="unknown")
+    assert list(second) == ["tesla", "audi"]
+    assert list(second.categories[:3]) == list(first.categories)  # New brands are appended
+
+    restored = CategoryVocabulary.from_dict(vocabulary.to_dict())
+    assert restored.dtype("vehicleBrand") == second.dtype
+
+
+def test_encoder_matches_one_hot_encoder():
+    train = pd.DataFrame({"brand": pd.Categorical(["bmw", "audi", "audi", "ford"]),
+                          "season": pd.Categorical(["winter", "fall", "fall", "summer"])})
+    encoder = CategoryCodeEncoder().fit(train)
+    reference = OneHotEncoder(handle_unknown="ignore", sparse_output=False).fit(train.astype(object))
+
+    np.testing.assert_array_equal(encoder.transform(train), reference.transform(train.astype(object)))
+    assert list(encoder.get_feature_names_out()) == list(reference.get_feature_names_out())
+
+    # Prediction input arrives as plain strings, possibly unseen
+    strings = pd.DataFrame({"brand": ["ford", "tesla"], "season": ["fall", "fall"]})
+    np.testing.assert_array_equal(encoder.transform(strings), reference.transform(strings))
+
+
+def test_engineered_frame_is_compact():
+    trainer = EnhancedVehicleRepairModel()
+    df = trainer.create_enhanced_features(generate_history(2000, seed=5))
+
+    for col in ("vehicleType", "vehicleBrand", "repairType", "season"):
+        assert isinstance(df[col].dtype, pd.CategoricalDtype), col
+    assert df["month"].dtype == np.int8 and df["days_since_last_service"].dtype == np.int16
+    assert set(trainer.vocabulary.categories) == {"vehicleType", "vehicleBrand", "repairType"}
+
+    report = frame_memory_report(df)
+    assert report["memory_mb"] * 4 < report["uncompacted_memory_mb"]
+
+    assert trainer.train_model(df)
+    assert trainer.training_report["features"]["rows"] == len(df)
+    assert trainer.training_report["features"]["preprocess_seconds"] > 0
+
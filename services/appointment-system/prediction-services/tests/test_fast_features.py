@@ -0,0 +1,58 @@
+# tests/test_fast_features.py
+import asyncio
+import dataclasses
+
+import numpy as np
+import pytest
+
+from fast_features import compile_feature_encoder
+from tests.test_predictions import REQUESTS, make_request
+
+PARITY_REQUESTS = REQUESTS + [
+    make_request(vehicleBrand="Tesla", vehicleType="Van", repairType="hybrid"),  # Unseen categories
+    make_request(millage=30000),   # Bin edges are [low, high)
+    make_request(millage=0),
+    make_request(millage=-5),      # Outside every bin
+]
+
+
+def test_encoder_is_compiled_at_training_time(trained_model):
+    assert trained_model.feature_encoder is not None
+    assert trained_model.feature_encoder.n_outputs == len(trained_model.feature_names)
+
+
+# -----------------------------
+# Parity with the sklearn pipeline
+# -----------------------------
+@pytest.mark.parametrize("request_index", range(len(PARITY_REQUESTS)))
+def test_encoder_matches_column_transformer(loaded_main, trained_model, request_index):
+    request = PARITY_REQUESTS[request_index]
+    encoder = trained_model.feature_encoder
+
+    expected = trained_model.preprocessor.transform(loaded_main.create_prediction_features(request))
+    encoded = encoder.encode(loaded_main.create_prediction_feature_row(request))
+
+    assert encoded.dtype == np.float32
+    np.testing.assert_allclose(encoded, expected.astype(np.float32), rtol=1e-6, atol=1e-6)
+    assert trained_model.model.predict(encoded)[0] == pytest.approx(
+        trained_model.model.predict(expected)[0], abs=1e-6
+    )
+
+
+def test_feature_row_matches_dataframe_features(loaded_main):
+    for request in PARITY_REQUESTS[:-1]:
+        row = loaded_main.create_prediction_feature_row(request)
+        frame = loaded_main.create_prediction_features(request).iloc[0].to_dict()
+        assert row == frame
+
+
+def test_fast_path_prediction_matches_batched_path(loaded_main, monkeypatch):
+    fast = [asyncio.run(loaded_main.get_enhanced_prediction(r)) for r in PARITY_REQUESTS]
+    monkeypatch.setattr(loaded_main.model_handler, "bundle",
+                        dataclasses.replace(loaded_main.model_handler.bundle, feature_encoder=None))
+    slow = [asyncio.run(loaded_main.get_enhanced_prediction(r)) for r in PARITY_REQUESTS]
+    assert fast == slow
+
+
+def test_unsupported_preprocessor_is_not_compiled():
+    assert compile_feature_encoder(None) is None
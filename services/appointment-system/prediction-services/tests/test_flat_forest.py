@@ -0,0 +1,71 @@
+# tests/test_flat_forest.py
+import asyncio
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from xgboost import XGBRegressor
+
+import main
+from config import settings
+from flat_forest import FlatForest, flatten_model
+from tests.conftest import make_finished_jobs
+from training import EnhancedVehicleRepairModel
+
+
+@pytest.fixture(scope="module")
+def training_matrix():
+    trainer = EnhancedVehicleRepairModel()
+    df = trainer.create_enhanced_features(make_finished_jobs(300, seed=11))
+    X = df.drop("actual_duration_days", axis=1)
+    return trainer.create_preprocessor(X).fit_transform(X), df["actual_duration_days"]
+
+
+# -----------------------------
+# Parity with the source models
+# -----------------------------
+def test_random_forest_parity(training_matrix):
+    X, y = training_matrix
+    model = RandomForestRegressor(n_estimators=20, max_depth=8, random_state=0).fit(X, y)
+    np.testing.assert_allclose(flatten_model(model).predict(X), model.predict(X), atol=1e-9)
+
+
+def test_xgboost_parity(training_matrix):
+    X, y = training_matrix
+    model = XGBRegressor(n_estimators=30, max_depth=6, random_state=0).fit(X, y)
+    np.testing.assert_allclose(flatten_model(model).predict(X), model.predict(X), atol=1e-4)
+
+
+def test_unsupported_model_is_not_flattened():
+    assert flatten_model(object()) is None
+
+
+# -----------------------------
+# Memory-mapped serving
+# -----------------------------
+def test_mmap_load_serves_shared_arrays(trained_model, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "MODEL_REGISTRY_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "MODEL_MMAP", True)
+    monkeypatch.setattr(main.model_handler, "bundle", None)
+
+    trained_model.save_model()
+    assert main.model_handler.load_model()
+
+    bundle = main.model_handler.bundle
+    assert isinstance(bundle.model, FlatForest)
+    assert isinstance(bundle.model.threshold, np.memmap)
+    assert not bundle.model.threshold.flags.writeable
+
+    X = np.zeros((3, len(bundle.feature_names)), dtype=np.float32)
+    np.testing.assert_allclose(bundle.model.predict(X), trained_model.model.predict(X), atol=1e-4)
+    assert asyncio.run(main.get_model_info())["memory_mapped"] is True
+
+
+def test_mmap_disabled_loads_full_model(trained_model, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "MODEL_REGISTRY_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "MODEL_MMAP", False)
+    monkeypatch.setattr(main.model_handler, "bundle", None)
+
+    trained_model.save_model()
+    assert main.model_handler.load_model()
+    assert type(main.model_handler.bundle.model) is type(trained_model.model)
@@ -0,0 +1,46 @@
+# tests/test_http_client.py
+import asyncio
+
+import http_client
+
+
+def test_shared_client_is_reused_on_its_loop_only():
+    async def on_app_loop():
+        client = await http_client.start_http_client()
+        try:
+            assert http_client.get_http_client() is client
+            async with http_client.outbound_client() as borrowed:
+                assert borrowed is client
+            stats = http_client.pool_stats()
+            assert stats["started"] is True and stats["pool_introspection"] is True
+        finally:
+            await http_client.close_http_client()
+
+    asyncio.run(on_app_loop())
+    assert http_client.get_http_client() is None
+    assert http_client.pool_stats()["started"] is False
+
+
+def test_outbound_client_falls_back_to_a_temporary_client():
+    async def elsewhere():
+        async with http_client.outbound_client() as client:
+            assert client is not None
+            assert not client.is_closed
+        return client
+
+    client = asyncio.run(elsewhere())
+    assert client.is_closed
+
+
+def test_pool_stats_fall_back_without_pool_internals(monkeypatch):
+    class OpaqueTransport:
+        pass
+
+    class OpaqueClient:
+        _transport = OpaqueTransport()
+
+    monkeypatch.setattr(http_client, "_client", OpaqueClient())
+    stats = http_client.pool_stats()
+    assert stats["started"] is True
+    assert stats["pool_introspection"] is False
+    assert stats["connections"] == 0
@@ -0,0 +1,113 @@
+# tests/test_job_ingest.py
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+import httpx
+import numpy as np
+import pytest
+
+import training
+from config import settings
+from job_ingest import ID_COLUMN, frame_from_jobs, iter_json_array
+from synthetic_history import generate_history
+from training import EnhancedVehicleRepairModel
+
+
+async def pieces(text, size):
+    for start in range(0, len(text), size):
+        yield text[start:start + size]
+
+
+async def collect(aiter):
+    return [item async for item in aiter]
+
+
+def test_json_array_is_parsed_across_chunk_boundaries():
+    jobs = generate_history(40, seed=2)
+    text = json.dumps(jobs, indent=1)
+    for size in (1, 7, 64, len(text)):
+        assert asyncio.run(collect(iter_json_array(pieces(text, size)))) == jobs
+
+    assert asyncio.run(collect(iter_json_array(pieces("[]", 1)))) == []
+    with pytest.raises(ValueError):
+        asyncio.run(collect(iter_json_array(pieces(text[:-20], 16))))
+    with pytest.raises(ValueError):
+        asyncio.run(collect(iter_json_array(pieces('{"jobs": []}', 4))))
+
+
+def test_frame_has_typed_columns():
+    jobs = generate_history(30, seed=4)
+    jobs[0]["millage"] = None
+    jobs[1]["startDate"] = "2024-05-01T10:30:00.000Z"
+    df = frame_from_jobs(jobs, chunk_size=8)
+
+    assert len(df) == 30 and df[ID_COLUMN].tolist() == [job["_id"] for job in jobs]
+    assert all(df[col].dtype == "category" for col in ("vehicleType", "vehicleBrand", "repairType"))
+    assert df["repairType"].tolist() == [job["repairType"] for job in jobs]
+    assert df["millage"].dtype == np.float32 and np.isnan(df["millage"][0])
+    assert str(df["startDate"].dtype) == "datetime64[ns]"
+    assert str(df["startDate"][1]) == "2024-05-01 10:30:00"
+    assert df["vehicleModelYear"].dtype == np.float32
+
+    complete = frame_from_jobs(generate_history(10, seed=4))
+    assert complete["millage"].dtype == np.int32
+
+
+def test_engineered_features_match_the_list_path():
+    jobs = generate_history(500, seed=6)
+    trainer = EnhancedVehicleRepairModel()
+    from_list = trainer.create_enhanced_features(jobs)
+    from_frame = trainer.create_enhanced_features(frame_from_jobs(jobs, chunk_size=64).drop(columns=[ID_COLUMN]))
+
+    assert list(from_frame.columns) == list(from_list.columns)
+    for col in from_list.columns:
+        assert (from_frame[col].astype(str).values == from_list[col].astype(str).values).all(), col
+
+
+@pytest.fixture
+def finished_api(monkeypatch):
+    """Serves generated history as NDJSON, a JSON array, or in pages; records the requests."""
+    jobs = generate_history(250, seed=8)
+    requests = []
+    mode = {"ndjson": False}
+
+    def handler(request):
+        requests.append(request)
+        page = request.url.params.get("page")
+        served = jobs
+        if page is not None:
+            limit = int(request.url.params["limit"])
+            served = jobs[(int(page) - 1) * limit:int(page) * limit]
+        if mode["ndjson"]:
+            body = "".join(json.dumps(job) + "\n" for job in served)
+            return httpx.Response(200, text=body, headers={"Content-Type": "application/x-ndjson"})
+        return httpx.Response(200, json=served)
+
+    @asynccontextmanager
+    async def mock_client():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            yield client
+
+    monkeypatch.setattr(training, "outbound_client", mock_client)
+    monkeypatch.setattr(settings, "NODE_API_FINISHED_JOBS", "http://node-api/api/appointments?status=FINISHED")
+    monkeypatch.setattr(settings, "TRAINING_FETCH_CHUNK_SIZE", 32)
+    return jobs, requests, mode
+
+
+def test_fetch_streams_json_and_ndjson(finished_api):
+    jobs, requests, mode = finished_api
+    for ndjson in (False, True):
+        mode["ndjson"] = ndjson
+        df = asyncio.run(EnhancedVehicleRepairModel().fetch_training_data())
+        assert df[ID_COLUMN].tolist() == [job["_id"] for job in jobs]
+    assert "application/x-ndjson" in requests[0].headers["Accept"]
+
+
+def test_fetch_pages_until_a_short_page(finished_api, monkeypatch):
+    jobs, requests, _ = finished_api
+    monkeypatch.setattr(settings, "NODE_API_FINISHED_PAGE_SIZE", 100)
+
+    df = asyncio.run(EnhancedVehicleRepairModel().fetch_training_data())
+    assert len(df) == len(jobs)
+    assert [request.url.params["page"] for request in requests] == ["1", "2", "3"]
@@ -0,0 +1,99 @@
+# tests/test_job_snapshot.py
+import asyncio
+
+import httpx
+
+from job_snapshot import JobSnapshot
+
+URL = "http://node-api/api/appointments/active"
+
+
+def make_snapshot(handler, **kwargs):
+    snapshot = JobSnapshot(URL, **kwargs)
+    snapshot._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return snapshot
+
+
+# -----------------------------
+# Full and conditional fetches
+# -----------------------------
+def test_full_fetch_keeps_only_active_jobs_and_revalidates_with_etag():
+    seen_headers = []
+
+    def handler(request):
+        seen_headers.append(dict(request.headers))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, headers={"ETag": '"v1"'}, json=[
+            {"_id": "a", "status": "Ongoing"},
+            {"_id": "b", "status": "Scheduled"},
+            {"_id": "c", "status": "Finished"},
+        ])
+
+    snapshot = make_snapshot(handler)
+    asyncio.run(snapshot.refresh())
+    assert sorted(job["_id"] for job in snapshot.get_jobs()) == ["a", "b"]
+    version = snapshot.version
+
+    asyncio.run(snapshot.refresh())
+    assert seen_headers[1]["if-none-match"] == '"v1"'
+    assert snapshot.not_modified_count == 1
+    assert snapshot.version == version
+    assert len(snapshot.get_jobs()) == 2
+
+
+def test_unchanged_full_responses_keep_the_version():
+    jobs = [{"_id": "a", "status": "Ongoing", "startDate": "2030-01-01"}]
+
+    def handler(request):
+        return httpx.Response(200, json=jobs)  # No ETag, like the Node API
+
+    snapshot = make_snapshot(handler)
+    asyncio.run(snapshot.refresh())
+    version = snapshot.version
+    asyncio.run(snapshot.refresh())
+    assert snapshot.version == version
+
+    jobs[0] = dict(jobs[0], startDate="2030-01-02")
+    asyncio.run(snapshot.refresh())
+    assert snapshot.version == version + 1
+    assert snapshot.get_jobs()[0]["startDate"] == "2030-01-02"
+
+
+# -----------------------------
+# Delta fetches
+# -----------------------------
+def test_delta_fetch_merges_changes_by_id():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if "updatedSince" not in request.url.params:
+            return httpx.Response(200, json=[
+                {"_id": "a", "status": "Ongoing"},
+                {"_id": "b", "status": "Scheduled"},
+            ])
+        return httpx.Response(200, json=[
+            {"_id": "a", "status": "Finished"},
+            {"_id": "d", "status": "Scheduled"},
+        ])
+
+    snapshot = make_snapshot(handler, since_param="updatedSince", full_sync_every=5)
+    asyncio.run(snapshot.refresh())
+    asyncio.run(snapshot.refresh())
+
+    assert "updatedSince" in requests[1].url.params
+    assert sorted(job["_id"] for job in snapshot.get_jobs()) == ["b", "d"]
+
+
+def test_ensure_fresh_only_fetches_when_stale():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200, json=[])
+
+    snapshot = make_snapshot(handler, max_age_seconds=300)
+    asyncio.run(snapshot.ensure_fresh())
+    asyncio.run(snapshot.ensure_fresh())
+    assert len(calls) == 1
@@ -0,0 +1,61 @@
+# tests/test_metrics.py
+import asyncio
+
+import pytest
+
+from metrics import MetricsRegistry
+from tests.conftest import call_app
+from tests.test_predictions import make_request
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("stage_seconds", "Stage time", ["stage"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, stage="predict")
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == ["# HELP stage_seconds Stage time", "# TYPE stage_seconds histogram"]
+    assert 'stage_seconds_bucket{stage="predict",le="0.1"} 1' in lines
+    assert 'stage_seconds_bucket{stage="predict",le="1"} 3' in lines
+    assert 'stage_seconds_bucket{stage="predict",le="+Inf"} 4' in lines
+    assert 'stage_seconds_sum{stage="predict"} 4.05' in lines
+    assert 'stage_seconds_count{stage="predict"} 4' in lines
+
+
+def test_time_records_failing_blocks_and_labels_are_checked():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("stage_seconds", "Stage time", ["stage"])
+    with pytest.raises(RuntimeError):
+        with histogram.time(stage="jobs_fetch"):
+            raise RuntimeError("upstream down")
+    assert histogram.count(stage="jobs_fetch") == 1
+
+    counter = registry.counter("fallback_total", "Fallbacks", ["reason"])
+    with pytest.raises(ValueError):
+        counter.inc(stage="predict")
+    counter.inc(2, reason='say "hi"')
+    assert 'fallback_total{reason="say \\"hi\\""} 2' in registry.render()
+
+
+def test_metrics_endpoint_reports_stages_and_fallbacks(loaded_main, monkeypatch):
+    counter = loaded_main.fallback_predictions
+    before = counter.value(reason="model_unavailable")
+    predict_count = loaded_main.stage_seconds.count(stage="predict")
+
+    asyncio.run(loaded_main.get_enhanced_predictions([make_request(millage=123457)]))
+    assert loaded_main.stage_seconds.count(stage="predict") == predict_count + 1
+
+    monkeypatch.setattr(loaded_main.model_handler, "bundle", None)
+    asyncio.run(loaded_main.get_enhanced_predictions([make_request(), make_request(repairType="brake")]))
+    assert counter.value(reason="model_unavailable") == before + 2
+
+    response = call_app(loaded_main, "GET", "/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'prediction_stage_seconds_count{stage="predict"}' in body
+    assert 'prediction_fallback_total{reason="model_unavailable"}' in body
+    # The previous call through the middleware was recorded under its route template
+    assert 'http_request_duration_seconds_count{method="GET",route="/metrics",status="200"}' in \
+        call_app(loaded_main, "GET", "/metrics").text
@@ -0,0 +1,74 @@
+# tests/test_model_registry.py
+import asyncio
+import dataclasses
+import os
+
+import joblib
+import pytest
+
+import main
+from config import settings
+from model_registry import ModelBundle, ModelRegistry
+
+
+def test_save_writes_versions_and_moves_current(tmp_path):
+    registry = ModelRegistry(str(tmp_path), keep_versions=2)
+    assert registry.load_current() is None
+
+    registry.save({"model": "a", "version": "v1"})
+    registry.save({"model": "b", "version": "v2"})
+    assert registry.current_version() == "v2"
+    assert registry.load_current()["model"] == "b"
+
+    registry.set_current("v1")  # Rollback
+    assert registry.load_current()["model"] == "a"
+
+    registry.save({"model": "c", "version": "v3"})
+    assert registry.list_versions() == ["v2", "v3"]
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_set_current_rejects_unknown_version(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ModelRegistry(str(tmp_path)).set_current("missing")
+
+
+def test_bundle_is_immutable():
+    bundle = ModelBundle(model=None, preprocessor=None)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        bundle.model = object()
+
+
+# -----------------------------
+# Server reload
+# -----------------------------
+def test_load_model_swaps_whole_bundle_and_reports_version(trained_model, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "MODEL_REGISTRY_DIR", str(tmp_path))
+    monkeypatch.setattr(main.model_handler, "bundle", None)
+
+    version = trained_model.save_model()
+    old_bundle = main.model_handler.bundle
+    assert main.model_handler.load_model()
+    assert main.model_handler.bundle is not old_bundle
+
+    info = asyncio.run(main.get_model_info())
+    assert info["version"] == version
+    assert info["training_date"] == trained_model.training_date
+    assert info["available_versions"] == [version]
+
+
+def test_load_model_falls_back_to_legacy_file(trained_model, tmp_path, monkeypatch):
+    legacy_file = tmp_path / "legacy.joblib"
+    joblib.dump({
+        "model": trained_model.model,
+        "preprocessor": trained_model.preprocessor,
+        "feature_names": trained_model.feature_names,
+        "training_date": "2025-01-01T00:00:00",
+    }, legacy_file)
+    monkeypatch.setattr(settings, "MODEL_REGISTRY_DIR", str(tmp_path / "empty"))
+    monkeypatch.setattr(settings, "MODEL_FILE", str(legacy_file))
+    monkeypatch.setattr(main.model_handler, "bundle", None)
+
+    assert main.model_handler.load_model()
+    assert main.model_handler.bundle.version == "legacy"
+    assert main.model_handler.bundle.training_date == "2025-01-01T00:00:00"
@@ -0,0 +1,78 @@
+# tests/test_prediction_cache.py
+import asyncio
+import dataclasses
+
+import pytest
+
+from prediction_cache import PredictionCache
+from tests.test_predictions import REQUESTS, make_request
+
+
+def test_lru_eviction_and_counters():
+    cache = PredictionCache(maxsize=2, ttl_seconds=60)
+    cache.put("v1", "a", 1)
+    cache.put("v1", "b", 2)
+    assert cache.get("v1", "a") == 1   # "a" is now most recently used
+    cache.put("v1", "c", 3)            # Evicts "b"
+
+    assert cache.get("v1", "b") is None
+    assert cache.stats() | {"hit_rate": None} == {
+        "enabled": True, "size": 2, "maxsize": 2, "model_version": "v1",
+        "hits": 1, "misses": 1, "evictions": 1, "hit_rate": None,
+    }
+
+
+def test_entries_expire_after_ttl():
+    cache = PredictionCache(maxsize=10, ttl_seconds=-1)
+    cache.put("v1", "a", 1)
+    assert cache.get("v1", "a") is None
+
+
+def test_new_model_version_invalidates_entries():
+    cache = PredictionCache()
+    cache.put("v1", "a", 1)
+    assert cache.get("v2", "a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_zero_size_disables_cache():
+    cache = PredictionCache(maxsize=0)
+    cache.put("v1", "a", 1)
+    assert cache.get("v1", "a") is None
+    assert cache.stats()["misses"] == 0
+
+
+# -----------------------------
+# In front of get_enhanced_predictions
+# -----------------------------
+@pytest.fixture
+def cached_main(loaded_main, monkeypatch):
+    monkeypatch.setattr(loaded_main, "prediction_cache", PredictionCache(maxsize=100))
+    return loaded_main
+
+
+def test_repeated_requests_hit_the_cache(cached_main):
+    first = asyncio.run(cached_main.get_enhanced_predictions(REQUESTS))
+    second = asyncio.run(cached_main.get_enhanced_predictions(REQUESTS))
+    assert first == second
+
+    model_requests = sum(1 for r in REQUESTS if r.repairType.lower() not in cached_main.SIMPLE_REPAIRS)
+    stats = cached_main.prediction_cache.stats()
+    assert stats["misses"] == model_requests
+    assert stats["hits"] == model_requests
+
+
+def test_normalized_duplicates_share_one_entry(cached_main):
+    variants = [make_request(), make_request(vehicleBrand="bmw", vehicleType="suv", repairType="ENGINE")]
+    first, second = asyncio.run(cached_main.get_enhanced_predictions(variants))
+    assert first == second
+    assert cached_main.prediction_cache.stats()["size"] == 1
+
+
+def test_model_reload_invalidates_cache(cached_main, monkeypatch):
+    asyncio.run(cached_main.get_enhanced_predictions([make_request()]))
+    monkeypatch.setattr(cached_main.model_handler, "bundle",
+                        dataclasses.replace(cached_main.model_handler.bundle, version="next"))
+    asyncio.run(cached_main.get_enhanced_predictions([make_request()]))
+    assert cached_main.prediction_cache.stats()["misses"] == 2
+    assert cached_main.prediction_cache.stats()["model_version"] == "next"
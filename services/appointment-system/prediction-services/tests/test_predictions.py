@@ -0,0 +1,67 @@
+# tests/test_predictions.py
+import asyncio
+
+from config import settings
+from main import EnhancedRepairRequest
+from tests.conftest import call_app
+
+
+def make_request(**overrides):
+    fields = {
+        "vehicleType": "SUV",
+        "vehicleBrand": "BMW",
+        "repairType": "engine",
+        "millage": 120000,
+        "lastService": "01-03-2025",
+        "vehicleModelYear": 2015,
+    }
+    fields.update(overrides)
+    return EnhancedRepairRequest(**fields)
+
+
+REQUESTS = [
+    make_request(),
+    make_request(repairType="tyre"),
+    make_request(vehicleBrand="Toyota", repairType="brake", millage=15000, vehicleModelYear=2023),
+    make_request(vehicleType="Truck", repairType="transmission", millage=250000, vehicleModelYear=1990),
+    make_request(repairType="Electrical", millage=60000, lastService="01-01-2099"),
+]
+
+
+# -----------------------------
+# Batched feature building
+# -----------------------------
+def test_batch_features_match_single_request_features(loaded_main):
+    batch = loaded_main.create_prediction_features_batch(REQUESTS)
+    for i, request in enumerate(REQUESTS):
+        single = loaded_main.create_prediction_features(request)
+        assert single.iloc[0].to_dict() == batch.iloc[i].to_dict()
+
+    assert batch.loc[3, "vehicle_age"] == 30
+    assert batch.loc[4, "days_since_last_service"] == 0
+    assert batch.loc[2, "millage_category"] == "very_low"
+
+
+# -----------------------------
+# Batched predictions
+# -----------------------------
+def test_batch_predictions_match_one_at_a_time(loaded_main):
+    batched = asyncio.run(loaded_main.get_enhanced_predictions(REQUESTS))
+    single = [asyncio.run(loaded_main.get_enhanced_prediction(r)) for r in REQUESTS]
+    assert batched == single
+    assert batched[1] == (1, 0.9, None)  # Simple repairs never reach the model
+
+
+def test_batch_endpoint_limits_the_request_size(loaded_main, monkeypatch):
+    monkeypatch.setattr(settings, "PREDICT_BATCH_MAX_ITEMS", 3)
+    bodies = [request.dict() for request in REQUESTS]
+
+    accepted = call_app(loaded_main, "POST", "/predict/duration/batch", json=bodies[:3])
+    assert accepted.status_code == 200 and len(accepted.json()) == 3
+    assert call_app(loaded_main, "POST", "/predict/duration/batch", json=bodies).status_code == 422
+
+
+def test_batch_falls_back_without_model(loaded_main, monkeypatch):
+    monkeypatch.setattr(loaded_main.model_handler, "bundle", None)
+    predictions = asyncio.run(loaded_main.get_enhanced_predictions(REQUESTS))
+    assert predictions[0] == (loaded_main.get_fallback_duration(REQUESTS[0]), 0.7, None)
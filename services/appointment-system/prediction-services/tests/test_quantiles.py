@@ -0,0 +1,50 @@
+# tests/test_quantiles.py
+import numpy as np
+import pytest
+
+from tests.test_predictions import REQUESTS, make_request
+from training import QUANTILES
+
+
+def test_quantile_model_is_trained_with_the_point_model(trained_model):
+    report = trained_model.training_report["quantiles"]
+    assert report["levels"] == list(QUANTILES)
+    p50_coverage, p90_coverage = report["coverage"]
+    assert 0.3 < p50_coverage < 0.7 and p90_coverage > 0.75
+
+    bundle = trained_model.to_bundle("test")
+    assert bundle.quantile_model is not None
+
+
+def test_quantiles_come_from_the_same_encoded_rows(loaded_main):
+    bundle = loaded_main.model_handler.bundle
+    durations, quantiles = loaded_main.predict_raw_durations(
+        bundle.model, bundle.preprocessor, bundle.feature_encoder, REQUESTS, bundle.quantile_model
+    )
+    assert durations.shape == (len(REQUESTS),) and quantiles.shape == (len(REQUESTS), 2)
+
+    _, single = loaded_main.predict_raw_durations(
+        bundle.model, bundle.preprocessor, bundle.feature_encoder, REQUESTS[:1], bundle.quantile_model
+    )
+    np.testing.assert_allclose(single[0], quantiles[0], rtol=1e-5)
+
+    _, none = loaded_main.predict_raw_durations(bundle.model, bundle.preprocessor, None, REQUESTS)
+    assert none is None
+
+
+def test_confidence_is_the_chance_of_finishing_in_time(loaded_main):
+    request = make_request()
+    finalize = loaded_main.finalize_prediction
+
+    assert finalize(request, 4.0, np.array([4.0, 8.0])).confidence == pytest.approx(0.5)
+    assert finalize(request, 6.0, np.array([4.0, 8.0])).confidence == pytest.approx(0.7)
+    assert finalize(request, 9.0, np.array([4.0, 8.0])).confidence == pytest.approx(0.9)
+    assert finalize(request, 4.0, np.array([4.0, 7.2])).p90_duration == 8
+
+    # Crossed quantiles and a P90 below the point estimate still give a usable booking length
+    crossed = finalize(request, 5.0, np.array([6.0, 3.0]))
+    assert 0 < crossed.confidence < 0.5 and crossed.p90_duration == 6
+    assert finalize(request, 5.0, np.array([1.0, 2.0])).p90_duration == 5
+
+    # Models without quantiles keep the rule-based confidence
+    assert finalize(request, 2.0) == (2, 0.9, None)
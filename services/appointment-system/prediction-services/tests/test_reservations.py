@@ -0,0 +1,233 @@
+# tests/test_reservations.py
+import asyncio
+import time
+from datetime import date, timedelta
+
+import httpx
+import pytest
+
+from config import settings
+from reservations import CONFIRMED, HELD, InMemoryReservationStore, Reservation
+from tests.conftest import call_app
+from tests.test_predictions import make_request
+
+TOMORROW = date.today() + timedelta(days=1)
+ENGINE = settings.REPAIR_REQUIREMENTS["engine"]
+
+
+def suggest(main, **params):
+    return call_app(main, "POST", "/schedule/suggest-start", json=make_request().dict(), params=params)
+
+
+# -----------------------------
+# Store
+# -----------------------------
+def test_hold_fails_when_another_hold_landed_first():
+    store = InMemoryReservationStore()
+
+    async def scenario():
+        version, _ = await store.list_active()
+        assert await store.hold(Reservation.for_slot(TOMORROW, 2, ENGINE, 60), version)
+        # A second scheduler that read the same version must recompute
+        assert not await store.hold(Reservation.for_slot(TOMORROW, 2, ENGINE, 60), version)
+        new_version, active = await store.list_active()
+        return new_version, active
+
+    version, active = asyncio.run(scenario())
+    assert version == 1
+    assert [(r.start, r.end) for r in active] == [(TOMORROW.isoformat(), (TOMORROW + timedelta(days=1)).isoformat())]
+
+
+def fake_redis_stores(n):
+    """``n`` RedisReservationStores (one per worker) sharing one in-process fakeredis server."""
+    fakeredis = pytest.importorskip("fakeredis")
+    from reservations import RedisReservationStore
+
+    server = fakeredis.FakeServer()
+    stores = []
+    for _ in range(n):
+        store = RedisReservationStore("redis://fake")
+        store._redis = fakeredis.FakeAsyncRedis(server=server)
+        stores.append(store)
+    return stores
+
+
+def test_redis_hold_loses_when_another_worker_holds_first():
+    store, rival = fake_redis_stores(2)
+
+    async def scenario():
+        version, _ = await store.list_active()
+        assert await rival.hold(Reservation.for_slot(TOMORROW, 2, ENGINE, 60), version)
+        assert not await store.hold(Reservation.for_slot(TOMORROW, 2, ENGINE, 60), version)
+        return await store.list_active()
+
+    version, active = asyncio.run(scenario())
+    assert version == 1 and len(active) == 1
+
+
+def test_redis_hold_loses_a_race_inside_the_watch():
+    store, rival = fake_redis_stores(2)
+    original_pipeline = store._redis.pipeline
+
+    def racing_pipeline(*args, **kwargs):
+        # The rival's hold lands after the version check but before EXEC
+        pipe = original_pipeline(*args, **kwargs)
+        original_get = pipe.get
+
+        async def get_then_race(key):
+            value = await original_get(key)
+            assert await rival.hold(Reservation.for_slot(TOMORROW, 1, ENGINE, 60), int(value or 0))
+            return value
+
+        pipe.get = get_then_race
+        return pipe
+
+    async def scenario():
+        version, _ = await store.list_active()
+        store._redis.pipeline = racing_pipeline
+        held = await store.hold(Reservation.for_slot(TOMORROW, 2, ENGINE, 60), version)
+        store._redis.pipeline = original_pipeline
+        return held, await store.list_active()
+
+    held, (version, active) = asyncio.run(scenario())
+    assert not held
+    assert version == 1
+    assert [(r.start, r.end) for r in active] == [(TOMORROW.isoformat(), TOMORROW.isoformat())]
+
+
+def test_redis_confirm_does_not_resurrect_a_released_hold():
+    store, rival = fake_redis_stores(2)
+    reservation = Reservation.for_slot(TOMORROW, 2, ENGINE, 60)
+    original_pipeline = store._redis.pipeline
+
+    def racing_pipeline(*args, **kwargs):
+        # The customer's release lands after the confirm has read the hold but before EXEC
+        pipe = original_pipeline(*args, **kwargs)
+        original_hget = pipe.hget
+
+        async def hget_then_release(key, field):
+            value = await original_hget(key, field)
+            await rival.release(field)
+            return value
+
+        pipe.hget = hget_then_release
+        return pipe
+
+    async def scenario():
+        assert await store.hold(reservation, 0)
+        store._redis.pipeline = racing_pipeline
+        confirmed = await store.confirm(reservation.id, ttl_seconds=600, appointment_id="appt-1")
+        store._redis.pipeline = original_pipeline
+        return confirmed, await store.list_active()
+
+    confirmed, (_, active) = asyncio.run(scenario())
+    assert confirmed is None
+    assert active == []
+
+
+def test_redis_confirm_retries_when_another_hold_lands():
+    store, rival = fake_redis_stores(2)
+    reservation = Reservation.for_slot(TOMORROW, 2, ENGINE, 60)
+
+    async def scenario():
+        assert await store.hold(reservation, 0)
+        original_pipeline = store._redis.pipeline
+        raced = []
+
+        def racing_pipeline(*args, **kwargs):
+            pipe = original_pipeline(*args, **kwargs)
+            original_hget = pipe.hget
+
+            async def hget_then_hold(key, field):
+                value = await original_hget(key, field)
+                if not raced:
+                    raced.append(True)
+                    version, _ = await rival.list_active()
+                    assert await rival.hold(Reservation.for_slot(TOMORROW, 1, ENGINE, 60), version)
+                return value
+
+            pipe.hget = hget_then_hold
+            return pipe
+
+        store._redis.pipeline = racing_pipeline
+        confirmed = await store.confirm(reservation.id, ttl_seconds=600, appointment_id="appt-1")
+        store._redis.pipeline = original_pipeline
+        return confirmed, await store.list_active()
+
+    confirmed, (_, active) = asyncio.run(scenario())
+    assert confirmed is not None and confirmed.status == CONFIRMED
+    assert sorted(r.status for r in active) == [CONFIRMED, HELD]
+
+
+def test_expired_holds_are_dropped_and_cannot_be_confirmed():
+    store = InMemoryReservationStore()
+    reservation = Reservation.for_slot(TOMORROW, 1, ENGINE, 60)
+    reservation.expires_at = time.time() - 1
+
+    async def scenario():
+        await store.hold(reservation, 0)
+        assert await store.confirm(reservation.id, ttl_seconds=60) is None
+        return await store.list_active()
+
+    _, active = asyncio.run(scenario())
+    assert active == []
+
+
+# -----------------------------
+# Endpoints
+# -----------------------------
+def test_suggested_slots_are_held_until_released(loaded_main, node_jobs):
+    # Two engine bays: the first two suggestions share a day, the third must move
+    first, second, third = (suggest(loaded_main, reserve="true").json() for _ in range(3))
+    assert first["suggestedStartDate"] == second["suggestedStartDate"] == TOMORROW.isoformat()
+    assert third["suggestedStartDate"] > first["suggestedStartDate"]
+    assert all(body["reservationId"] for body in (first, second, third))
+
+    released = call_app(loaded_main, "POST", f"/schedule/reservations/{first['reservationId']}/release")
+    assert released.status_code == 200
+    assert suggest(loaded_main, reserve="true").json()["suggestedStartDate"] == TOMORROW.isoformat()
+
+    # Quotes that do not reserve (the default) leave the table alone
+    assert suggest(loaded_main).json()["reservationId"] is None
+    assert suggest(loaded_main, reserve="false").json()["reservationId"] is None
+    assert len(call_app(loaded_main, "GET", "/schedule/reservations").json()) == 3
+
+
+def test_concurrent_suggestions_never_overbook(loaded_main, node_jobs):
+    async def scenario():
+        transport = httpx.ASGITransport(app=loaded_main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            responses = await asyncio.gather(*(
+                client.post("/schedule/suggest-start", json=make_request().dict(), params={"reserve": "true"})
+                for _ in range(8)
+            ))
+            availability = await client.get("/schedule/availability")
+        return responses, availability
+
+    responses, availability = asyncio.run(scenario())
+    assert all(r.status_code == 200 for r in responses)
+    assert len({r.json()["reservationId"] for r in responses}) == 8
+    assert all(day["remaining"]["engine_bay"] >= 0 for day in availability.json()["days"])
+
+
+def test_confirmed_hold_stops_counting_once_the_appointment_is_listed(loaded_main, node_jobs):
+    body = suggest(loaded_main, reserve="true").json()
+    confirmed = call_app(loaded_main, "POST", f"/schedule/reservations/{body['reservationId']}/confirm",
+                         json={"appointmentId": "appt-1"})
+    assert confirmed.status_code == 200
+    assert confirmed.json()["status"] == CONFIRMED
+
+    start = date.fromisoformat(body["suggestedStartDate"])
+    end = start + timedelta(days=body["predictedDuration"] - 1)
+    node_jobs.append({"_id": "appt-1", "status": "Scheduled", "repairType": "engine",
+                      "startDate": start.isoformat(), "endDate": end.isoformat()})
+    asyncio.run(loaded_main.job_snapshot.refresh())
+
+    # Counted once (as the job), not twice
+    days = call_app(loaded_main, "GET", "/schedule/availability").json()["days"]
+    assert days[0]["remaining"]["engine_bay"] == settings.WORKSHOP_RESOURCES["engine_bay"] - 1
+
+
+def test_unknown_reservation_is_404(loaded_main, node_jobs):
+    assert call_app(loaded_main, "POST", "/schedule/reservations/nope/confirm").status_code == 404
+    assert call_app(loaded_main, "POST", "/schedule/reservations/nope/release").status_code == 404
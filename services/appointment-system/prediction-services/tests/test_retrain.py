@@ -0,0 +1,41 @@
+# tests/test_retrain.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import main
+from config import settings
+
+
+def test_retrain_hot_swaps_model_written_by_worker(trained_model, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "MODEL_REGISTRY_DIR", str(tmp_path / "registry"))
+    monkeypatch.setattr(main, "training_executor", ThreadPoolExecutor(max_workers=1))
+    monkeypatch.setattr(main.model_handler, "bundle", None)
+
+    def fake_training_job():
+        trained_model.save_model()
+        return True
+
+    monkeypatch.setattr(main, "run_training_job", fake_training_job)
+    asyncio.run(main.scheduled_retrain())
+
+    assert main.model_handler.bundle.model is not None
+    assert main.model_handler.bundle.feature_encoder is not None
+    assert main.retrain_in_progress is False
+
+
+def test_concurrent_retrain_is_skipped(monkeypatch):
+    def unexpected_training_job():
+        raise AssertionError("a second retrain should not start")
+
+    monkeypatch.setattr(main, "retrain_in_progress", True)
+    monkeypatch.setattr(main, "run_training_job", unexpected_training_job)
+    asyncio.run(main.scheduled_retrain())
+    assert main.retrain_in_progress is True
+
+
+def test_training_worker_runs_in_a_spawned_process():
+    # Without a configured Node API the worker returns False, but it must be importable and picklable
+    async def run():
+        return await asyncio.get_running_loop().run_in_executor(main.training_executor, main.run_training_job)
+
+    assert asyncio.run(run()) is False
@@ -0,0 +1,172 @@
+# tests/test_scheduling.py
+import random
+from datetime import date, timedelta
+
+import pytest
+
+import numpy as np
+
+from scheduling import BusySchedule, CapacityIndex, build_capacity_index, list_schedule, schedule_batch
+
+RESOURCES = {"engine_bay": 2, "general_bay": 4, "tire_lift": 2, "general_tech": 5}
+ENGINE = {"engine_bay": 1, "engine_specialist": 1}
+GENERAL = {"general_bay": 1, "general_tech": 1}
+ORIGIN = date(2025, 1, 1)
+
+
+def brute_force_first_offset(busy_schedule, requirements, duration, max_days):
+    """The original triple-nested loop, kept as the reference implementation."""
+    for day_offset in range(max_days):
+        ok = True
+        for d in range(duration):
+            day = ORIGIN + timedelta(days=day_offset + d)
+            used = {r: 0 for r in RESOURCES}
+            for job in busy_schedule:
+                if job["start"] <= day <= job["end"]:
+                    for resource, amount in job["requirements"].items():
+                        if resource in used:
+                            used[resource] += amount
+            for resource, amount in requirements.items():
+                if resource in RESOURCES and used[resource] + amount > RESOURCES[resource]:
+                    ok = False
+            if not ok:
+                break
+        if ok:
+            return day_offset
+    return None
+
+
+# -----------------------------
+# Usage index
+# -----------------------------
+def test_usage_counts_inclusive_days_and_ignores_unknown_resources():
+    busy = [{"start": ORIGIN + timedelta(days=1), "end": ORIGIN + timedelta(days=3), "requirements": ENGINE}]
+    index = build_capacity_index(busy, ORIGIN, 5, RESOURCES)
+
+    engine = index.usage[:, index.resource_positions["engine_bay"]]
+    assert engine.tolist() == [0, 1, 1, 1, 0]
+    assert "engine_specialist" not in index.resource_positions
+
+
+def test_jobs_outside_horizon_are_clipped():
+    busy = [
+        {"start": ORIGIN - timedelta(days=10), "end": ORIGIN, "requirements": GENERAL},
+        {"start": ORIGIN + timedelta(days=4), "end": ORIGIN + timedelta(days=40), "requirements": GENERAL},
+        {"start": ORIGIN - timedelta(days=5), "end": ORIGIN - timedelta(days=1), "requirements": GENERAL},
+    ]
+    index = build_capacity_index(busy, ORIGIN, 6, RESOURCES)
+
+    bay = index.usage[:, index.resource_positions["general_bay"]]
+    assert bay.tolist() == [1, 0, 0, 0, 1, 1]
+
+
+def test_busy_schedule_arrays_index_like_the_job_list():
+    busy = [{"start": ORIGIN + timedelta(days=i % 7), "end": ORIGIN + timedelta(days=i % 7 + i % 3),
+             "requirements": ENGINE if i % 2 else GENERAL} for i in range(20)]
+    names = list(RESOURCES) + ["engine_specialist"]
+    schedule = BusySchedule(
+        starts=np.array([job["start"] for job in busy], dtype="datetime64[D]"),
+        ends=np.array([job["end"] for job in busy], dtype="datetime64[D]"),
+        demands=np.array([[job["requirements"].get(name, 0) for name in names] for job in busy], dtype=np.int32),
+        resource_names=names
+    )
+    expected = build_capacity_index(busy, ORIGIN, 12, RESOURCES)
+
+    np.testing.assert_array_equal(build_capacity_index(schedule, ORIGIN, 12, RESOURCES).usage, expected.usage)
+
+
+def test_window_is_an_independent_slice():
+    busy = [{"start": ORIGIN + timedelta(days=2), "end": ORIGIN + timedelta(days=4), "requirements": ENGINE}]
+    base = build_capacity_index(busy, ORIGIN, 10, RESOURCES)
+
+    window = base.window(ORIGIN + timedelta(days=3), 4)
+    assert window.origin == ORIGIN + timedelta(days=3)
+    assert window.usage[:, window.resource_positions["engine_bay"]].tolist() == [1, 1, 0, 0]
+
+    window.reserve(0, 4, ENGINE)
+    assert base.usage[:, base.resource_positions["engine_bay"]].sum() == 3
+    assert base.window(ORIGIN - timedelta(days=1), 4) is None
+    assert base.window(ORIGIN + timedelta(days=7), 4) is None
+
+
+# -----------------------------
+# Slot search
+# -----------------------------
+def test_full_days_push_the_start_back():
+    busy = [{"start": ORIGIN, "end": ORIGIN + timedelta(days=2), "requirements": {"engine_bay": 2}}]
+    index = build_capacity_index(busy, ORIGIN, 10, RESOURCES)
+
+    assert index.find_start_offsets(ENGINE, 2, 5).tolist() == [3]
+    assert index.find_start_offsets(GENERAL, 2, 5).tolist() == [0]
+
+
+def test_no_slot_returns_empty():
+    index = CapacityIndex(ORIGIN, 3, RESOURCES)
+    assert index.find_start_offsets(GENERAL, 5, 30).size == 0
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_brute_force(seed):
+    rng = random.Random(seed)
+    busy = []
+    for _ in range(40):
+        start = ORIGIN + timedelta(days=rng.randint(-5, 30))
+        busy.append({
+            "start": start,
+            "end": start + timedelta(days=rng.randint(0, 6)),
+            "requirements": rng.choice([ENGINE, GENERAL, {"tire_lift": 1, "general_tech": 1}]),
+        })
+
+    for requirements in (ENGINE, GENERAL):
+        for duration in (1, 3, 6):
+            index = build_capacity_index(busy, ORIGIN, 30 + duration - 1, RESOURCES)
+            offsets = index.find_start_offsets(requirements, duration, 30)
+            expected = brute_force_first_offset(busy, requirements, duration, 30)
+            assert (offsets[0] if offsets.size else None) == expected
+
+
+# -----------------------------
+# Availability
+# -----------------------------
+# -----------------------------
+# Batch scheduling
+# -----------------------------
+def random_batch(n, seed):
+    rng = random.Random(seed)
+    return [(rng.choice([ENGINE, GENERAL, {"tire_lift": 1, "general_tech": 1}]), rng.randint(1, 6)) for _ in range(n)]
+
+
+def test_batch_assignment_respects_capacity_and_beats_input_order():
+    busy = [{"start": ORIGIN, "end": ORIGIN + timedelta(days=4), "requirements": ENGINE}]
+    index = build_capacity_index(busy, ORIGIN, 400, RESOURCES)
+    jobs = random_batch(300, seed=9)
+
+    offsets, rule = schedule_batch(index, jobs, 300)
+    assert (offsets >= 0).all()
+    assert index.usage.sum() == 5  # The caller's index is left untouched
+
+    packed = index.copy()
+    for (reqs, duration), offset in zip(jobs, offsets):
+        packed.reserve(offset, duration, reqs)
+    assert (packed.usage <= packed.capacity).all()
+
+    greedy = list_schedule(index.copy(), jobs, range(len(jobs)), 300)
+    assert offsets.sum() <= greedy.sum()
+    assert rule in {"bottleneck_first", "longest_first", "shortest_first", "input_order"}
+
+
+def test_batch_prefers_meeting_deadlines():
+    index = CapacityIndex(ORIGIN, 30, {"engine_bay": 1})
+    bay = {"engine_bay": 1}
+    # The short job must finish by day 1, which only works if it goes first
+    jobs = [(bay, 5), (bay, 1)]
+
+    offsets, rule = schedule_batch(index, jobs, 30, deadlines=[None, 1])
+    assert offsets.tolist() == [1, 0]
+    assert rule in {"earliest_deadline", "shortest_first"}
+
+
+def test_jobs_that_do_not_fit_are_left_unscheduled():
+    index = CapacityIndex(ORIGIN, 10, {"engine_bay": 1})
+    offsets, _ = schedule_batch(index, [({"engine_bay": 1}, 6), ({"engine_bay": 1}, 6)], 5)
+    assert sorted(offsets.tolist()) == [-1, 0]
@@ -0,0 +1,104 @@
+# tests/test_suggest_start.py
+import asyncio
+from datetime import date, timedelta
+
+import numpy as np
+
+from config import settings
+from tests.conftest import call_app
+from tests.test_predictions import make_request
+
+TOMORROW = date.today() + timedelta(days=1)
+
+
+def suggest(main, **params):
+    return call_app(main, "POST", "/schedule/suggest-start", json=make_request().dict(), params=params)
+
+
+def block_engine_bays(jobs, days):
+    """Occupies every engine bay from tomorrow for ``days`` days."""
+    end = TOMORROW + timedelta(days=days - 1)
+    jobs.extend({"_id": f"block-{i}", "status": "Ongoing", "repairType": "engine",
+                 "startDate": TOMORROW.isoformat(), "endDate": end.isoformat()}
+                for i in range(settings.WORKSHOP_RESOURCES["engine_bay"]))
+
+
+def test_top_k_returns_earliest_feasible_starts(loaded_main, node_jobs):
+    block_engine_bays(node_jobs, 10)
+
+    response = suggest(loaded_main, top_k=3)
+    assert response.status_code == 200
+    body = response.json()
+    starts = [body["suggestedStartDate"]] + body["alternativeStartDates"]
+    expected = [(TOMORROW + timedelta(days=10 + i)).isoformat() for i in range(3)]
+    assert starts == expected
+
+    # Default stays a single suggestion
+    assert suggest(loaded_main).json()["alternativeStartDates"] == []
+
+
+def test_horizon_extends_past_thirty_days(loaded_main, node_jobs):
+    block_engine_bays(node_jobs, 45)
+
+    assert suggest(loaded_main).status_code == 404
+    response = suggest(loaded_main, horizon_days=180)
+    assert response.status_code == 200
+    assert response.json()["suggestedStartDate"] == (TOMORROW + timedelta(days=45)).isoformat()
+
+
+def test_limits_are_validated(loaded_main, node_jobs):
+    assert suggest(loaded_main, top_k=settings.SUGGEST_MAX_TOP_K + 1).status_code == 422
+    assert suggest(loaded_main, horizon_days=settings.SUGGEST_MAX_HORIZON_DAYS + 1).status_code == 422
+
+
+def test_p90_sizes_the_booked_slot(loaded_main, node_jobs):
+    point = suggest(loaded_main, reserve="false").json()
+    assert point["p90Duration"] >= point["predictedDuration"]
+    assert point["bookedDuration"] == point["predictedDuration"]
+
+    cautious = suggest(loaded_main, use_p90="true", reserve="true").json()
+    assert cautious["predictedDuration"] == point["predictedDuration"]
+    assert cautious["bookedDuration"] == point["p90Duration"]
+
+    held = call_app(loaded_main, "GET", "/schedule/reservations").json()[0]
+    assert (date.fromisoformat(held["endDate"]) - date.fromisoformat(held["startDate"])).days + 1 \
+        == cautious["bookedDuration"]
+
+
+def test_busy_schedule_parses_dates_and_estimates_missing_ends(loaded_main, node_jobs):
+    config = loaded_main.workshop_config.current()
+    jobs = [
+        {"_id": "a", "status": "Ongoing", "repairType": "engine",
+         "startDate": f"{TOMORROW.isoformat()}T09:30:00.000Z", "endDate": f"{TOMORROW.isoformat()}T17:00:00.000Z"},
+        {"_id": "b", "status": "Scheduled", "repairType": "brake", "startDate": TOMORROW.isoformat()},
+        {"_id": "c", "status": "Ongoing", "repairType": "engine", "startDate": "not a date"},
+        {"_id": "d", "status": "Completed", "repairType": "engine", "startDate": TOMORROW.isoformat()},
+    ]
+    schedule = asyncio.run(loaded_main.build_busy_schedule(jobs, config))
+
+    assert len(schedule) == 2
+    assert list(schedule.starts) == [np.datetime64(TOMORROW, "D")] * 2
+    assert schedule.ends[0] == np.datetime64(TOMORROW, "D")
+    assert schedule.ends[1] > schedule.starts[1]  # Predicted from the brake job's duration
+    engine = schedule.resource_names.index("engine_bay")
+    assert schedule.demands[0, engine] == settings.REPAIR_REQUIREMENTS["engine"]["engine_bay"]
+
+
+def test_busy_schedule_is_shared_until_the_snapshot_changes(loaded_main, node_jobs, monkeypatch):
+    block_engine_bays(node_jobs, 3)
+    calls = []
+    original = loaded_main.build_busy_schedule
+
+    async def counting_build(all_jobs, config):
+        calls.append(len(all_jobs))
+        return await original(all_jobs, config)
+
+    monkeypatch.setattr(loaded_main, "build_busy_schedule", counting_build)
+    first = suggest(loaded_main).json()["suggestedStartDate"]
+    assert suggest(loaded_main).json()["suggestedStartDate"] == first
+    assert len(calls) == 1
+
+    node_jobs.clear()
+    asyncio.run(loaded_main.job_snapshot.refresh())
+    assert suggest(loaded_main).status_code == 200
+    assert calls == [settings.WORKSHOP_RESOURCES["engine_bay"], 0]
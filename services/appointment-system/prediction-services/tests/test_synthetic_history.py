@@ -0,0 +1,49 @@
+# tests/test_synthetic_history.py
+import json
+
+import pandas as pd
+
+from synthetic_history import COLUMNS, generate_history, iter_history, write_json, write_parquet
+from training import EnhancedVehicleRepairModel
+
+
+def test_history_is_seeded_and_chunked():
+    assert generate_history(500, seed=3, chunk_size=200) == generate_history(500, seed=3, chunk_size=200)
+    assert generate_history(50, seed=3) != generate_history(50, seed=4)
+
+    chunks = list(iter_history(1050, chunk_size=500))
+    assert [len(chunk) for chunk in chunks] == [500, 500, 50]
+    ids = pd.concat(chunks)["_id"]
+    assert ids.is_unique
+
+
+def test_rows_have_the_training_columns_and_sane_dates():
+    df = pd.DataFrame(generate_history(2000, seed=1))
+    assert list(df.columns) == COLUMNS
+
+    start, end = pd.to_datetime(df["startDate"]), pd.to_datetime(df["endDate"])
+    assert ((end - start).dt.days.between(1, 30)).all()
+    assert (pd.to_datetime(df["lastServiceDate"]) < start).all()
+    assert df["vehicleModelYear"].isna().any() and df["vehicleRegistrationYear"].notna().all()
+
+    # Longer repairs really take longer, so a model has something to learn
+    mean_days = (end - start).dt.days.groupby(df["repairType"]).mean()
+    assert mean_days["engine"] > mean_days["brake"] > mean_days["tyre"]
+
+    features = EnhancedVehicleRepairModel().create_enhanced_features(generate_history(300))
+    assert len(features) == 300
+
+
+def test_writers_stream_json_and_parquet(tmp_path):
+    assert write_json(str(tmp_path / "history.json"), 250, chunk_size=100) == 250
+    with open(tmp_path / "history.json") as f:
+        records = json.load(f)
+    assert records[0]["_id"] == "synthetic-0" and len(records) == 250
+
+    write_json(str(tmp_path / "history.jsonl"), 250, chunk_size=100, lines=True)
+    with open(tmp_path / "history.jsonl") as f:
+        assert [json.loads(line) for line in f] == records
+
+    write_parquet(str(tmp_path / "history.parquet"), 250, chunk_size=100)
+    frame = pd.read_parquet(tmp_path / "history.parquet")
+    assert frame["_id"].tolist() == [record["_id"] for record in records]
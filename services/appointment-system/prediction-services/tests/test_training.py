@@ -0,0 +1,155 @@
+# tests/test_training.py
+import asyncio
+
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from xgboost import XGBRegressor
+
+import training
+from config import settings
+from flat_forest import flatten_model
+from tests.conftest import make_finished_jobs
+from training import EnhancedVehicleRepairModel
+
+
+@pytest.fixture(scope="module")
+def training_frame():
+    return EnhancedVehicleRepairModel().create_enhanced_features(make_finished_jobs(200, seed=3))
+
+
+# -----------------------------
+# Model selection
+# -----------------------------
+def test_training_report_records_every_candidate(trained_model):
+    report = trained_model.training_report
+    assert set(report["candidates"]) == {"xgboost", "random_forest"}
+    for candidate in report["candidates"].values():
+        assert len(candidate["fold_mse"]) == report["n_folds"] == 5
+        assert candidate["fit_seconds"] > 0
+    assert report["selected_model"] == min(report["candidates"], key=lambda n: report["candidates"][n]["cv_mse"])
+    assert report["total_seconds"] >= report["selection_seconds"]
+
+
+def test_single_row_is_not_trained(training_frame):
+    trainer = EnhancedVehicleRepairModel()
+    assert trainer.train_model(training_frame.head(1)) is False
+    assert trainer.model is None
+
+
+def test_xgboost_early_stopping_bounds_refit_rounds(training_frame, monkeypatch):
+    monkeypatch.setattr(settings, "XGB_EARLY_STOPPING_ROUNDS", 5)
+    trainer = EnhancedVehicleRepairModel()
+    assert trainer.train_model(training_frame)
+
+    best_iterations = trainer.training_report["candidates"]["xgboost"]["best_iterations"]
+    assert len(best_iterations) == 5
+    assert all(i < settings.XGB_MAX_ESTIMATORS for i in best_iterations)
+    if trainer.training_report["selected_model"] == "xgboost":
+        assert trainer.model.n_estimators <= max(best_iterations) + 1
+
+
+def test_parallel_and_sequential_selection_agree(training_frame, monkeypatch):
+    scores = {}
+    for n_jobs in (1, 2):
+        monkeypatch.setattr(settings, "TRAINING_N_JOBS", n_jobs)
+        trainer = EnhancedVehicleRepairModel()
+        assert trainer.train_model(training_frame)
+        scores[n_jobs] = {name: c["cv_mse"] for name, c in trainer.training_report["candidates"].items()}
+    assert scores[1] == pytest.approx(scores[2])
+
+
+def test_report_is_saved_with_the_artifact(trained_model, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "MODEL_REGISTRY_DIR", str(tmp_path))
+    trained_model.save_model()
+
+    loader = EnhancedVehicleRepairModel()
+    assert loader.load_model()
+    assert loader.bundle.training_report["selected_model"] == trained_model.training_report["selected_model"]
+
+
+# -----------------------------
+# Incremental updates
+# -----------------------------
+def fit_candidate(frame, name):
+    trainer = EnhancedVehicleRepairModel()
+    assert trainer.train_model(frame)
+    # Pin the model type regardless of which candidate won selection
+    X = trainer.preprocessor.transform(frame.drop("actual_duration_days", axis=1))
+    trainer.model = (XGBRegressor(n_estimators=30, max_depth=4) if name == "xgboost"
+                     else RandomForestRegressor(n_estimators=20, max_depth=6, random_state=0))
+    trainer.model.fit(X, frame["actual_duration_days"])
+    return {
+        "model": trainer.model,
+        "preprocessor": trainer.preprocessor,
+        "feature_names": trainer.feature_names,
+        "training_report": trainer.training_report,
+        "version": "v-base"
+    }
+
+
+@pytest.fixture(scope="module")
+def new_frame():
+    return EnhancedVehicleRepairModel().create_enhanced_features(make_finished_jobs(60, seed=11))
+
+
+def test_xgboost_update_continues_boosting(training_frame, new_frame):
+    artifact = fit_candidate(training_frame, "xgboost")
+    trees_before = artifact["model"].get_booster().num_boosted_rounds()
+
+    trainer = EnhancedVehicleRepairModel()
+    assert trainer.incremental_update(artifact, new_frame)
+    assert trainer.model.get_booster().num_boosted_rounds() == trees_before + settings.XGB_INCREMENTAL_ROUNDS
+    assert trainer.preprocessor is artifact["preprocessor"]
+    assert trainer.training_report["mode"] == "incremental"
+    assert trainer.training_report["incremental_updates"] == 1
+    assert trainer.training_report["base_version"] == "v-base"
+
+    # The updated booster still exports to the memory-mapped serving format
+    X = trainer.preprocessor.transform(new_frame.drop("actual_duration_days", axis=1))
+    assert flatten_model(trainer.model).predict(X) == pytest.approx(trainer.model.predict(X), abs=1e-4)
+
+
+def test_random_forest_update_grows_trees(training_frame, new_frame):
+    artifact = fit_candidate(training_frame, "random_forest")
+
+    trainer = EnhancedVehicleRepairModel()
+    assert trainer.incremental_update(artifact, new_frame)
+    assert len(trainer.model.estimators_) == 20 + settings.RF_INCREMENTAL_TREES
+    assert trainer.model.warm_start is False
+
+
+def test_full_retrain_reasons(training_frame, new_frame, monkeypatch):
+    trainer = EnhancedVehicleRepairModel()
+    artifact = fit_candidate(training_frame, "xgboost")
+    assert trainer.full_retrain_reason(artifact, new_frame) is None
+    assert trainer.full_retrain_reason(None, new_frame) == "no current model"
+
+    drifted = new_frame.assign(actual_duration_days=new_frame["actual_duration_days"] * 4)
+    assert trainer.full_retrain_reason(artifact, drifted).startswith("drift")
+
+    unseen = new_frame.assign(vehicleType="tractor")
+    assert "unseen categories" in trainer.full_retrain_reason(artifact, unseen)
+
+    monkeypatch.setattr(settings, "FULL_RETRAIN_EVERY", 2)
+    scheduled = dict(artifact, training_report=dict(artifact["training_report"], incremental_updates=2))
+    assert "incremental updates" in trainer.full_retrain_reason(scheduled, new_frame)
+
+
+def test_retrain_job_updates_incrementally_between_full_retrains(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    batches = [make_finished_jobs(200, seed=3), make_finished_jobs(40, seed=12), make_finished_jobs(40, seed=13)]
+
+    async def fake_fetch(self, since=None):
+        return batches.pop(0) if batches else []
+
+    monkeypatch.setattr(EnhancedVehicleRepairModel, "fetch_training_data", fake_fetch)
+    monkeypatch.setattr(settings, "TRAINING_STORE_DIR", str(tmp_path / "store"))
+    monkeypatch.setattr(settings, "MODEL_REGISTRY_DIR", str(tmp_path / "registry"))
+    monkeypatch.setattr(settings, "INCREMENTAL_DRIFT_TOLERANCE", 100.0)
+    monkeypatch.setattr(settings, "FULL_RETRAIN_EVERY", 1)
+
+    modes = []
+    for _ in range(3):
+        assert asyncio.run(training.train_enhanced_model())
+        modes.append(EnhancedVehicleRepairModel().registry.load_current()["training_report"]["mode"])
+    assert modes == ["full", "incremental", "full"]
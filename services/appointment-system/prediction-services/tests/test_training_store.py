@@ -0,0 +1,155 @@
+# tests/test_training_store.py
+import asyncio
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import training
+import training_store
+from config import settings
+from synthetic_history import generate_history
+from tests.conftest import make_finished_jobs
+from training import EnhancedVehicleRepairModel
+from training_store import TrainingStore, sync_training_store
+
+
+def with_ids(jobs, start=0):
+    return [dict(job, _id=f"job-{start + i}") for i, job in enumerate(jobs)]
+
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    """Finished-jobs API double: returns whatever is queued and records the `since` it was asked for."""
+    calls = []
+    batches = []
+
+    async def fake_fetch(self, since=None):
+        calls.append(since)
+        return batches.pop(0) if batches else []
+
+    monkeypatch.setattr(EnhancedVehicleRepairModel, "fetch_training_data", fake_fetch)
+    return batches, calls
+
+
+def test_sync_appends_only_new_jobs_and_partitions_by_month(tmp_path, fake_api):
+    batches, calls = fake_api
+    store = TrainingStore(str(tmp_path))
+    trainer = EnhancedVehicleRepairModel()
+    history = with_ids(make_finished_jobs(60))
+
+    batches.append(history[:40])
+    batches.append(history[30:])  # Overlaps the first sync by ten jobs
+    first = asyncio.run(sync_training_store(store, trainer))
+    second = asyncio.run(sync_training_store(store, trainer))
+
+    assert calls[0] is None and calls[1] is not None
+    assert len(first) + len(second) == len(store.load())
+    assert len(second) <= 20
+    assert all("period=" in path for path in store.partition_files())
+    assert store.read_state()["rows"] == len(store.load())
+
+
+def test_failed_fetch_keeps_watermark(tmp_path, monkeypatch):
+    async def failing_fetch(self, since=None):
+        return None
+
+    monkeypatch.setattr(EnhancedVehicleRepairModel, "fetch_training_data", failing_fetch)
+    store = TrainingStore(str(tmp_path))
+    asyncio.run(sync_training_store(store, EnhancedVehicleRepairModel()))
+    assert store.last_synced_at() is None
+
+
+def test_jobs_without_ids_are_not_duplicated(tmp_path):
+    store = TrainingStore(str(tmp_path))
+    trainer = EnhancedVehicleRepairModel()
+    jobs = make_finished_jobs(20)
+    store.append(jobs, trainer.create_enhanced_features)
+    assert store.append(jobs, trainer.create_enhanced_features).empty
+
+
+def test_duplicate_check_reads_only_the_appended_months(tmp_path, monkeypatch):
+    store = TrainingStore(str(tmp_path))
+    trainer = EnhancedVehicleRepairModel()
+    jobs = with_ids(make_finished_jobs(60))
+    store.append(jobs[:50], trainer.create_enhanced_features)
+    assert "job_ids" not in store.read_state()
+
+    new_month = jobs[50]["startDate"][:7]
+    late = [job for job in jobs if job["startDate"].startswith(new_month)]
+    read = []
+    real_read_parquet = training_store.pd.read_parquet
+
+    def recording_read(path, *args, **kwargs):
+        read.append(path)
+        return real_read_parquet(path, *args, **kwargs)
+
+    monkeypatch.setattr(training_store.pd, "read_parquet", recording_read)
+    written = store.append(late, trainer.create_enhanced_features)
+    assert read and all(f"period={new_month}" in path for path in read)
+    assert len(written) == sum(job["_id"] not in {j["_id"] for j in jobs[:50]} for job in late)
+
+
+def test_vehicle_age_is_derived_when_loading(tmp_path, monkeypatch):
+    store = TrainingStore(str(tmp_path))
+    trainer = EnhancedVehicleRepairModel()
+    written = store.append(with_ids(make_finished_jobs(40)), trainer.create_enhanced_features)
+    assert training_store.MODEL_YEAR_COLUMN in pd.read_parquet(store.partition_files()[0]).columns
+
+    class TwoYearsLater(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.now(tz).replace(year=datetime.now(tz).year + 2)
+
+    monkeypatch.setattr(training_store, "datetime", TwoYearsLater)
+    aged = store.load()["vehicle_age"].sort_values().to_numpy()
+    expected = (written["vehicle_age"] + 2).clip(upper=training_store.MAX_VEHICLE_AGE).sort_values().to_numpy()
+    np.testing.assert_array_equal(aged, expected)
+
+
+def test_loaded_rows_match_full_engineering(tmp_path):
+    store = TrainingStore(str(tmp_path))
+    trainer = EnhancedVehicleRepairModel()
+    jobs = with_ids(make_finished_jobs(50))
+    store.append(jobs[:25], trainer.create_enhanced_features)
+    store.append(jobs[25:], trainer.create_enhanced_features)
+
+    stored = store.load()
+    full = trainer.create_enhanced_features(jobs)
+    assert sorted(stored.columns) == sorted(full.columns)
+    assert len(stored) == len(full)
+    assert stored["actual_duration_days"].sum() == full["actual_duration_days"].sum()
+
+
+def test_train_enhanced_model_uses_store(tmp_path, fake_api, monkeypatch):
+    batches, _ = fake_api
+    monkeypatch.setattr(settings, "TRAINING_STORE_DIR", str(tmp_path / "store"))
+    monkeypatch.setattr(settings, "MODEL_REGISTRY_DIR", str(tmp_path / "registry"))
+    batches.append(with_ids(make_finished_jobs(150)))
+
+    assert asyncio.run(training.train_enhanced_model())
+    # Nothing new on the next retrain: the stored history and current model are kept
+    monkeypatch.setattr(settings, "RETRAIN_MODE", "full")
+    assert asyncio.run(training.train_enhanced_model())
+    assert len(TrainingStore(settings.TRAINING_STORE_DIR).load()) > 0
+
+
+def test_store_keeps_one_vocabulary_across_syncs(tmp_path, fake_api):
+    batches, _ = fake_api
+    store = TrainingStore(str(tmp_path))
+    history = with_ids(generate_history(200, seed=9))
+    history[-1]["vehicleBrand"] = "Rivian"  # Only in the second sync
+
+    batches.append(history[:100])
+    batches.append(history[100:])
+    asyncio.run(sync_training_store(store, EnhancedVehicleRepairModel()))
+    first_brands = store.vocabulary().categories["vehicleBrand"]
+    asyncio.run(sync_training_store(store, EnhancedVehicleRepairModel()))
+
+    brands = store.vocabulary().categories["vehicleBrand"]
+    assert brands[:len(first_brands)] == first_brands and brands[-1] == "rivian"
+
+    df = store.load()
+    assert len(df) == 200
+    assert list(df["vehicleBrand"].cat.categories) == brands
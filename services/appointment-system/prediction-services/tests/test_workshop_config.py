@@ -0,0 +1,83 @@
+# tests/test_workshop_config.py
+from datetime import date, timedelta
+
+import pytest
+
+from config import settings
+from tests.conftest import call_app
+from workshop_config import WorkshopConfigStore
+
+FROM = date.today() + timedelta(days=1)
+
+
+def make_store(tmp_path):
+    return WorkshopConfigStore(str(tmp_path / "config.sqlite3"), settings.WORKSHOP_RESOURCES,
+                               settings.REPAIR_REQUIREMENTS)
+
+
+def test_first_open_seeds_version_one_from_settings(tmp_path):
+    config = make_store(tmp_path).current()
+
+    assert config.version == 1
+    assert config.resources_dict() == settings.WORKSHOP_RESOURCES
+    assert config.requirements_dict() == settings.REPAIR_REQUIREMENTS
+
+
+def test_updates_create_new_versions_and_leave_snapshots_untouched(tmp_path):
+    store = make_store(tmp_path)
+    before = store.current()
+
+    after = store.update(resources={"engine_bay": 5})
+    assert after.version == 2
+    assert after.resources["engine_bay"] == 5
+    assert before.resources["engine_bay"] == settings.WORKSHOP_RESOURCES["engine_bay"]
+    assert store.current() is after
+    with pytest.raises(TypeError):
+        after.resources["engine_bay"] = 1
+
+    store.update(requirements={"engine": {"engine_bay": 2}})
+    assert [config.version for config in store.history()] == [3, 2, 1]
+    assert store.current().requirements_for("Engine") == {"engine_bay": 2}
+    assert store.current().resources["engine_bay"] == 5
+
+
+def test_other_workers_pick_up_changes(tmp_path):
+    worker_a, worker_b = make_store(tmp_path), make_store(tmp_path)
+    assert worker_b.current().version == 1
+
+    worker_a.update(resources={"general_bay": 9})
+    assert worker_b.current().version == 1
+    assert worker_b.reload_if_changed()
+    assert worker_b.current().resources["general_bay"] == 9
+    assert not worker_b.reload_if_changed()
+
+    # Updates merge into the latest stored version, not the writer's cached copy
+    worker_b.update(resources={"engine_bay": 4})
+    worker_a.update(requirements={"tyre": {"general_bay": 2}})
+    latest = worker_a.current()
+    assert latest.version == 4
+    assert latest.resources["general_bay"] == 9 and latest.resources["engine_bay"] == 4
+
+
+def test_admin_update_is_versioned_and_changes_availability(loaded_main, node_jobs):
+    params = {"from": FROM.isoformat(), "to": FROM.isoformat()}
+    before = call_app(loaded_main, "GET", "/schedule/availability", params=params).json()
+
+    response = call_app(loaded_main, "POST", "/api/admin/resources",
+                        json={"resource_type": "engine_bay", "new_count": 7})
+    assert response.status_code == 200
+    assert response.json()["version"] == 2
+
+    after = call_app(loaded_main, "GET", "/schedule/availability", params=params).json()
+    assert before["days"][0]["remaining"]["engine_bay"] == settings.WORKSHOP_RESOURCES["engine_bay"]
+    assert after["days"][0]["remaining"]["engine_bay"] == 7
+    # The defaults in settings are only the seed; they are not mutated
+    assert settings.WORKSHOP_RESOURCES["engine_bay"] != 7
+
+    configuration = call_app(loaded_main, "GET", "/api/admin/configuration").json()
+    assert configuration["version"] == 2
+    history = call_app(loaded_main, "GET", "/api/admin/configuration/history").json()
+    assert [entry["version"] for entry in history] == [2, 1]
+
+    unknown = call_app(loaded_main, "POST", "/api/admin/resources", json={"resource_type": "lift", "new_count": 1})
+    assert unknown.status_code == 400
@@ -2,46 +2,133 @@
 
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from sklearn.model_selection import train_test_split, KFold
+from sklearn.base import clone
+from sklearn.preprocessing import StandardScaler
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.ensemble import RandomForestRegressor
 from xgboost import XGBRegressor
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 import joblib
-import httpx
+from joblib import Parallel, delayed
 import asyncio
+import time
 from datetime import datetime, timedelta
+from typing import Optional
 import warnings
 warnings.filterwarnings('ignore')
 
 from config import settings
+from http_client import outbound_client
+from fast_features import compile_feature_encoder
+from model_registry import ModelBundle, ModelRegistry, new_version
+from flat_forest import flatten_model
+from training_store import TrainingStore, parquet_available, sync_training_store
+from job_ingest import JobFrameBuilder, iter_response_jobs
+from category_codes import CategoryCodeEncoder, CategoryVocabulary, category_mask, frame_memory_report, recode
+
+# Duration quantiles fitted next to the point model; the columns of quantile_model.predict
+QUANTILES = (0.5, 0.9)
+
+SEASONS = pd.CategoricalDtype(['winter', 'spring', 'summer', 'fall'])
+# Season code per month (index 0 unused)
+MONTH_SEASON_CODES = np.array([0, 0, 0, 1, 1, 1, 2, 2, 2, 3, 3, 3, 0], dtype=np.int8)
+
+def _evaluate_fold(name, estimator, X, y, train_idx, val_idx, early_stopping_rounds: int) -> dict:
+    """Fits a fresh copy of ``estimator`` on one CV fold and scores it (runs in a worker)."""
+    start = time.perf_counter()
+    result = {'name': name, 'mse': None, 'best_iteration': None, 'seconds': 0.0, 'error': None}
+    try:
+        model = clone(estimator)
+        if isinstance(model, XGBRegressor) and early_stopping_rounds:
+            # Stop adding trees once the validation fold stops improving
+            model.set_params(early_stopping_rounds=early_stopping_rounds)
+            model.fit(X[train_idx], y[train_idx], eval_set=[(X[val_idx], y[val_idx])], verbose=False)
+            result['best_iteration'] = int(model.best_iteration)
+        else:
+            model.fit(X[train_idx], y[train_idx])
+        result['mse'] = float(mean_squared_error(y[val_idx], model.predict(X[val_idx])))
+    except Exception as e:
+        result['error'] = str(e)
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+def _quantile_regressor(n_estimators: int) -> XGBRegressor:
+    """One booster for every level in QUANTILES; ``predict`` returns a column per level."""
+    return XGBRegressor(
+        objective='reg:quantileerror',
+        quantile_alpha=np.array(QUANTILES),
+        n_estimators=n_estimators,
+        learning_rate=0.1,
+        max_depth=6,
+        random_state=42,
+        n_jobs=settings.TRAINING_N_JOBS
+    )
 
 class EnhancedVehicleRepairModel:
     def __init__(self):
         self.model = None
+        self.quantile_model = None  # P50/P90 durations, see QUANTILES
         self.preprocessor = None
         self.feature_names = None
-        
-    async def fetch_training_data(self):
-        """Fetches comprehensive training data from the API."""
+        self.feature_encoder = None  # NumPy fast path for single predictions
+        self.training_date = None
+        self.training_report = None  # Per-candidate CV scores and timings of the last train_model
+        self.vocabulary = CategoryVocabulary()  # Category codes of the engineered text columns
+        self.engineer_seconds = None
+        # What the server predicts with; replaced as a whole on reload
+        self.bundle: ModelBundle = None
+    
+    @property
+    def registry(self) -> ModelRegistry:
+        return ModelRegistry(settings.MODEL_REGISTRY_DIR, settings.MODEL_REGISTRY_KEEP)
+        
+    async def fetch_training_data(self, since: Optional[datetime] = None) -> Optional[pd.DataFrame]:
+        """Fetches comprehensive training data from the API.
+        
+        With ``since`` (and NODE_API_FINISHED_SINCE_PARAM configured) only jobs
+        finished after that time are requested. The response is streamed (a JSON
+        array, or NDJSON if the API sends it) and packed into typed columns as it
+        arrives; see job_ingest.py. Returns None if the fetch failed.
+        """
         print("Fetching enhanced training data from API...")
         
         if not settings.NODE_API_FINISHED_JOBS or "your_node_api" in settings.NODE_API_FINISHED_JOBS:
             print("ERROR: API URL not configured properly.")
-            return []
+            return None
+        
+        params = {}
+        if since is not None and settings.NODE_API_FINISHED_SINCE_PARAM:
+            params[settings.NODE_API_FINISHED_SINCE_PARAM] = since.isoformat()
+        headers = {'Accept': 'application/x-ndjson, application/json'}
+        page_size = settings.NODE_API_FINISHED_PAGE_SIZE
+        builder = JobFrameBuilder(settings.TRAINING_FETCH_CHUNK_SIZE)
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(settings.NODE_API_FINISHED_JOBS)
-                response.raise_for_status()
-                data = response.json()
-                print(f"Successfully fetched {len(data)} completed jobs.")
-                return data
+            async with outbound_client() as client:
+                page = 1
+                while True:
+                    if page_size > 0:
+                        params[settings.NODE_API_FINISHED_PAGE_PARAM] = page
+                        params[settings.NODE_API_FINISHED_LIMIT_PARAM] = page_size
+                    received = 0
+                    async with client.stream('GET', settings.NODE_API_FINISHED_JOBS,
+                                             params=params, headers=headers) as response:
+                        response.raise_for_status()
+                        async for job in iter_response_jobs(response):
+                            builder.add(job)
+                            received += 1
+                    # A short page is the last one
+                    if page_size <= 0 or received < page_size:
+                        break
+                    page += 1
+            df = builder.to_frame()
+            print(f"Successfully fetched {len(df)} completed jobs.")
+            return df
         except Exception as e:
             print(f"Error fetching training data: {e}")
-            return []
+            return None
     
     def debug_training_data(self, df: pd.DataFrame):
         """Debug function to analyze training data distribution."""
@@ -70,12 +157,13 @@ class EnhancedVehicleRepairModel:
                         print(f"  {repair_type}: {len(subset)} samples, "
                               f"mean: {subset['actual_duration_days'].mean():.2f} days")
     
-    def create_enhanced_features(self, data: list) -> pd.DataFrame:
-        """Creates comprehensive features from raw data."""
-        if not data:
+    def create_enhanced_features(self, data) -> pd.DataFrame:
+        """Creates comprehensive features from raw data (a list of job dicts, or a fetched frame)."""
+        if data is None or len(data) == 0:
             return pd.DataFrame()
             
-        df = pd.DataFrame(data)
+        # Column assignments below replace columns, so a shallow copy keeps the caller's frame intact
+        df = data.copy(deep=False) if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
         
         
         # Required columns
@@ -116,7 +204,9 @@ class EnhancedVehicleRepairModel:
             print(f"Removed {initial_count - len(df)} rows with unrealistic durations")
         
         # Feature Engineering
+        engineer_start = time.perf_counter()
         df = self._engineer_features(df)
+        self.engineer_seconds = time.perf_counter() - engineer_start
         
         # Debug info
         self.debug_training_data(df)
@@ -133,16 +223,11 @@ class EnhancedVehicleRepairModel:
         # Days since last service with fallback
         df['days_since_last_service'] = (df['startDate'] - df['lastServiceDate']).dt.days
         df['days_since_last_service'] = df['days_since_last_service'].fillna(180)  # 6 months if unknown
-        df['days_since_last_service'] = df['days_since_last_service'].clip(lower=0, upper=365*3)
+        df['days_since_last_service'] = df['days_since_last_service'].clip(lower=0, upper=365*3).astype(np.int16)
         
         # Seasonal features
-        df['month'] = df['startDate'].dt.month
-        df['season'] = df['month'].map({
-            12: 'winter', 1: 'winter', 2: 'winter',
-            3: 'spring', 4: 'spring', 5: 'spring',
-            6: 'summer', 7: 'summer', 8: 'summer',
-            9: 'fall', 10: 'fall', 11: 'fall'
-        })
+        df['month'] = df['startDate'].dt.month.astype(np.int8)
+        df['season'] = pd.Categorical.from_codes(MONTH_SEASON_CODES[df['month'].to_numpy()], dtype=SEASONS)
         
         # 2. Vehicle age estimation (using REAL data)
         current_year = datetime.now().year
@@ -158,28 +243,32 @@ class EnhancedVehicleRepairModel:
         df['vehicle_age'] = current_year - df['year_to_use']
         
         # Fill any remaining missing values (e.g., avg 5 years old) and clip to reasonable range
-        df['vehicle_age'] = df['vehicle_age'].fillna(5).clip(lower=0, upper=30)
+        df['vehicle_age'] = df['vehicle_age'].fillna(5).clip(lower=0, upper=30).astype(np.float32)
         
         # 3. Millage-based features
         df['millage'] = pd.to_numeric(df['millage'], errors='coerce').fillna(50000)
-        df['millage'] = df['millage'].clip(lower=0, upper=300000)
-        df['high_millage'] = (df['millage'] > settings.HIGH_MILLAGE_THRESHOLD).astype(int)
+        df['millage'] = df['millage'].clip(lower=0, upper=300000).astype(np.float32)
+        df['high_millage'] = (df['millage'] > settings.HIGH_MILLAGE_THRESHOLD).astype(np.int8)
         df['millage_category'] = pd.cut(df['millage'], 
                                       bins=[0, 30000, 60000, 100000, 200000, float('inf')],
                                       labels=['very_low', 'low', 'medium', 'high', 'very_high'])
         
-        # 4. Normalize text data
-        df['vehicleType'] = df['vehicleType'].str.lower().fillna('sedan')
-        df['vehicleBrand'] = df['vehicleBrand'].str.lower().fillna('unknown')
-        df['repairType'] = df['repairType'].str.lower().fillna('general')
+        # 4. Normalize text data (lowercased per category, coded in the persisted vocabulary)
+        vehicle_types = recode(df['vehicleType'], self.vocabulary, 'vehicleType', fill='sedan')
+        vehicle_brands = recode(df['vehicleBrand'], self.vocabulary, 'vehicleBrand', fill='unknown')
+        repair_types = recode(df['repairType'], self.vocabulary, 'repairType', fill='general')
+        df['vehicleType'] = vehicle_types
+        df['vehicleBrand'] = vehicle_brands
+        df['repairType'] = repair_types
         
         # 5. Brand complexity
         premium_brands = ['mercedes', 'bmw', 'audi', 'lexus', 'volvo', 'jaguar']
-        df['is_premium_brand'] = df['vehicleBrand'].isin(premium_brands).astype(int)
+        df['is_premium_brand'] = category_mask(vehicle_brands, premium_brands).astype(np.int8)
         
         # 6. Repair complexity
         complex_repairs = ['engine', 'transmission', 'electrical', 'hybrid', 'ev_system']
-        df['is_complex_repair'] = df['repairType'].isin(complex_repairs).astype(int)
+        df['is_complex_repair'] = category_mask(repair_types, complex_repairs).astype(np.int8)
+        df['actual_duration_days'] = df['actual_duration_days'].astype(np.int16)
         
         # Select final features
         feature_columns = settings.MODEL_FEATURES + [
@@ -203,7 +292,7 @@ class EnhancedVehicleRepairModel:
         # Dynamically find features from our settings list
         for feature in settings.MODEL_FEATURES:
             if feature in df.columns:
-                if df[feature].dtype in ['int64', 'float64', 'int32', 'float32']:
+                if pd.api.types.is_numeric_dtype(df[feature].dtype):
                     numeric_features.append(feature)
                 else:
                     categorical_features.append(feature)
@@ -226,7 +315,7 @@ class EnhancedVehicleRepairModel:
         self.preprocessor = ColumnTransformer(
             transformers=[
                 ('num', StandardScaler(), numeric_features),
-                ('cat', OneHotEncoder(handle_unknown='ignore', sparse_output=False), categorical_features)
+                ('cat', CategoryCodeEncoder(), categorical_features)
             ])
         
         return self.preprocessor
@@ -237,6 +326,9 @@ class EnhancedVehicleRepairModel:
         if df.empty or 'actual_duration_days' not in df.columns:
             print("No data available for training.")
             return False
+        if len(df) < 2:
+            print(f"Not enough data for cross-validation: {len(df)} job(s), need at least 2.")
+            return False
         
         # Prepare features and target
         X = df.drop('actual_duration_days', axis=1)
@@ -244,7 +336,11 @@ class EnhancedVehicleRepairModel:
         
         # Create and fit preprocessor
         self.create_preprocessor(X)
+        preprocess_start = time.perf_counter()
         X_processed = self.preprocessor.fit_transform(X)
+        preprocess_seconds = time.perf_counter() - preprocess_start
+        feature_report = dict(frame_memory_report(df), engineer_seconds=self.engineer_seconds,
+                              preprocess_seconds=preprocess_seconds)
         
         # Get feature names after preprocessing
         feature_names = []
@@ -260,48 +356,90 @@ class EnhancedVehicleRepairModel:
         self.feature_names = feature_names
         
         # Train multiple models and select the best one
+        training_start = time.perf_counter()
+        early_stopping_rounds = settings.XGB_EARLY_STOPPING_ROUNDS
         models = {
             'xgboost': XGBRegressor(
-                n_estimators=100,
+                n_estimators=settings.XGB_MAX_ESTIMATORS if early_stopping_rounds else 100,
                 learning_rate=0.1,
                 max_depth=6,
                 random_state=42,
-                objective='reg:squarederror'
+                objective='reg:squarederror',
+                n_jobs=1  # Parallelism comes from evaluating folds side by side
             ),
             'random_forest': RandomForestRegressor(
                 n_estimators=100,
                 random_state=42,
-                max_depth=8
+                max_depth=8,
+                n_jobs=1
             )
         }
         
-        best_score = float('inf')
-        best_model = None
-        best_model_name = None
-        
-        for name, model in models.items():
-            try:
-                # Cross-validation
-                cv_scores = cross_val_score(model, X_processed, y, 
-                                          cv=5, scoring='neg_mean_squared_error')
-                mse_score = -cv_scores.mean()
-                
-                print(f"{name} CV MSE: {mse_score:.2f}")
-                
-                if mse_score < best_score:
-                    best_score = mse_score
-                    best_model = model
-                    best_model_name = name
-            except Exception as e:
-                print(f"Error training {name}: {e}")
-        
-        if best_model is None:
+        # Every (candidate, fold) pair is an independent task spread across cores
+        X_array = np.asarray(X_processed)
+        y_array = np.asarray(y, dtype=np.float64)
+        folds = list(KFold(n_splits=min(5, len(y_array))).split(X_array))
+        tasks = [
+            delayed(_evaluate_fold)(name, model, X_array, y_array, train_idx, val_idx, early_stopping_rounds)
+            for name, model in models.items()
+            for train_idx, val_idx in folds
+        ]
+        fold_results = Parallel(n_jobs=settings.TRAINING_N_JOBS)(tasks)
+        selection_seconds = time.perf_counter() - training_start
+        
+        candidates = {}
+        for name in models:
+            runs = [r for r in fold_results if r['name'] == name]
+            failed = [r['error'] for r in runs if r['error']]
+            if failed:
+                print(f"Error training {name}: {failed[0]}")
+                candidates[name] = {'error': failed[0]}
+                continue
+            best_iterations = [r['best_iteration'] for r in runs if r['best_iteration'] is not None]
+            candidates[name] = {
+                'cv_mse': float(np.mean([r['mse'] for r in runs])),
+                'fold_mse': [r['mse'] for r in runs],
+                'fit_seconds': float(sum(r['seconds'] for r in runs)),
+                'best_iterations': best_iterations
+            }
+            print(f"{name} CV MSE: {candidates[name]['cv_mse']:.2f} "
+                  f"({candidates[name]['fit_seconds']:.1f}s across {len(runs)} folds)")
+        
+        scored = {name: c for name, c in candidates.items() if 'cv_mse' in c}
+        if not scored:
             print("No model could be trained successfully")
             return False
         
+        best_model_name = min(scored, key=lambda name: scored[name]['cv_mse'])
+        best_model = clone(models[best_model_name])
+        if best_model_name == 'xgboost' and scored['xgboost']['best_iterations']:
+            # Refit with the number of rounds early stopping settled on
+            best_model.set_params(n_estimators=int(np.median(scored['xgboost']['best_iterations'])) + 1)
+        best_model.set_params(n_jobs=settings.TRAINING_N_JOBS)
+        
         # Train the best model on full data
+        refit_start = time.perf_counter()
         best_model.fit(X_processed, y)
+        refit_seconds = time.perf_counter() - refit_start
         self.model = best_model
+        self.feature_encoder = compile_feature_encoder(self.preprocessor)
+        quantile_report = self.train_quantile_model(X_processed, y_array)
+        
+        self.training_report = {
+            'mode': 'full',
+            'incremental_updates': 0,
+            'baseline_mse': scored[best_model_name]['cv_mse'],  # Drift reference for incremental updates
+            'selected_model': best_model_name,
+            'n_samples': int(len(y_array)),
+            'n_folds': len(folds),
+            'n_jobs': settings.TRAINING_N_JOBS,
+            'candidates': candidates,
+            'selection_seconds': selection_seconds,
+            'refit_seconds': refit_seconds,
+            'total_seconds': time.perf_counter() - training_start,
+            'features': feature_report,
+            'quantiles': quantile_report
+        }
         
         # Final evaluation
         y_pred = best_model.predict(X_processed)
@@ -315,29 +453,201 @@ class EnhancedVehicleRepairModel:
         print(f"Final MAE: {mae:.2f}")
         print(f"R² Score: {r2:.2f}")
         print(f"Feature Importance: {len(self.feature_names)} features")
+        print(f"Training time: {self.training_report['total_seconds']:.1f}s "
+              f"(selection {selection_seconds:.1f}s, refit {refit_seconds:.1f}s)")
+        print(f"Feature frame: {feature_report['memory_mb']:.1f} MB "
+              f"({feature_report['uncompacted_memory_mb']:.1f} MB as object/64-bit columns), "
+              f"preprocessing {preprocess_seconds:.2f}s")
+        
+        return True
+    
+    def train_quantile_model(self, X, y: np.ndarray) -> Optional[dict]:
+        """Fits the quantile model on the full data and reports how often each quantile covers the target.
+        
+        Coverage is measured on the training rows, so it is a sanity check
+        (P90 should cover about 90% of jobs) rather than a held-out estimate.
+        """
+        self.quantile_model = None
+        if not settings.QUANTILE_MODEL_ENABLED:
+            return None
+        start = time.perf_counter()
+        try:
+            model = _quantile_regressor(settings.QUANTILE_ESTIMATORS)
+            model.fit(X, y)
+            predicted = np.sort(model.predict(X).reshape(len(y), -1), axis=1)
+        except Exception as e:
+            print(f"Error training quantile model: {e}")
+            return {'error': str(e)}
+        self.quantile_model = model
+        report = {
+            'levels': list(QUANTILES),
+            'coverage': [float(np.mean(y <= predicted[:, i])) for i in range(len(QUANTILES))],
+            'fit_seconds': time.perf_counter() - start
+        }
+        print(f"Quantile model {QUANTILES}: training coverage "
+              f"{', '.join(f'{c:.2f}' for c in report['coverage'])} ({report['fit_seconds']:.1f}s)")
+        return report
+    
+    # --- Incremental updates ---
+    
+    def unseen_category_fraction(self, preprocessor, X: pd.DataFrame) -> float:
+        """Share of rows with a category the fitted one-hot encoder has never seen."""
+        encoder = preprocessor.named_transformers_.get('cat')
+        if encoder is None or not hasattr(encoder, 'categories_') or X.empty:
+            return 0.0
+        unseen = np.zeros(len(X), dtype=bool)
+        for col, categories in zip(encoder.feature_names_in_, encoder.categories_):
+            unseen |= ~X[col].astype(object).isin(list(categories)).to_numpy()
+        return float(unseen.mean())
+    
+    def full_retrain_reason(self, artifact: Optional[dict], new_rows: pd.DataFrame) -> Optional[str]:
+        """Why ``artifact`` cannot simply be updated with ``new_rows``, or None if it can."""
+        if artifact is None:
+            return "no current model"
+        report = artifact.get('training_report') or {}
+        if not isinstance(artifact.get('model'), (XGBRegressor, RandomForestRegressor)):
+            return f"{type(artifact.get('model')).__name__} does not support incremental updates"
+        if report.get('incremental_updates', 0) >= settings.FULL_RETRAIN_EVERY:
+            return f"{report.get('incremental_updates')} incremental updates since the last full retrain"
+        if report.get('baseline_mse') is None:
+            return "current model has no baseline error"
+        
+        X = new_rows.drop('actual_duration_days', axis=1)
+        unseen = self.unseen_category_fraction(artifact['preprocessor'], X)
+        if unseen > settings.INCREMENTAL_MAX_UNSEEN_FRACTION:
+            return f"{unseen:.0%} of new jobs have unseen categories"
+        
+        # Drift: the current model does much worse on new jobs than it did in cross-validation
+        mse = mean_squared_error(new_rows['actual_duration_days'],
+                                 artifact['model'].predict(artifact['preprocessor'].transform(X)))
+        if mse > report['baseline_mse'] * settings.INCREMENTAL_DRIFT_TOLERANCE:
+            return f"drift: MSE on new jobs {mse:.2f} vs baseline {report['baseline_mse']:.2f}"
+        return None
+    
+    def incremental_update(self, artifact: dict, new_rows: pd.DataFrame) -> bool:
+        """Continues training the model in ``artifact`` on ``new_rows`` only.
+        
+        XGBoost keeps boosting from the existing booster; a random forest grows
+        extra trees with ``warm_start``. The fitted preprocessor is reused so the
+        feature layout stays the same.
+        """
+        if new_rows.empty:
+            return False
+        start = time.perf_counter()
+        preprocessor = artifact['preprocessor']
+        X = preprocessor.transform(new_rows.drop('actual_duration_days', axis=1))
+        y = new_rows['actual_duration_days']
+        previous = artifact['model']
+        
+        try:
+            if isinstance(previous, XGBRegressor):
+                model = XGBRegressor(**previous.get_params())
+                model.set_params(n_estimators=settings.XGB_INCREMENTAL_ROUNDS, early_stopping_rounds=None,
+                                 n_jobs=settings.TRAINING_N_JOBS)
+                model.fit(X, y, xgb_model=previous.get_booster(), verbose=False)
+            else:
+                model = previous
+                model.set_params(warm_start=True, n_jobs=settings.TRAINING_N_JOBS,
+                                 n_estimators=previous.n_estimators + settings.RF_INCREMENTAL_TREES)
+                model.fit(X, y)
+                model.set_params(warm_start=False)
+        except Exception as e:
+            print(f"Incremental update failed: {e}")
+            return False
         
+        # Keep boosting the quantile model too; an artifact without one stays without
+        quantile_model = artifact.get('quantile_model')
+        if quantile_model is not None:
+            try:
+                updated = _quantile_regressor(settings.XGB_INCREMENTAL_ROUNDS)
+                updated.fit(X, y, xgb_model=quantile_model.get_booster(), verbose=False)
+                quantile_model = updated
+            except Exception as e:
+                print(f"Incremental quantile update failed, keeping the previous one: {e}")
+        
+        previous_report = artifact.get('training_report') or {}
+        self.model = model
+        self.quantile_model = quantile_model
+        self.preprocessor = preprocessor
+        self.feature_names = artifact['feature_names']
+        self.feature_encoder = compile_feature_encoder(preprocessor)
+        self.training_report = {
+            **previous_report,
+            'mode': 'incremental',
+            'incremental_updates': previous_report.get('incremental_updates', 0) + 1,
+            'base_version': artifact.get('version'),
+            'new_samples': int(len(y)),
+            'n_samples': previous_report.get('n_samples', 0) + int(len(y)),
+            'total_seconds': time.perf_counter() - start
+        }
+        print(f"Incremental update of {artifact.get('version')} on {len(y)} new jobs "
+              f"({self.training_report['total_seconds']:.1f}s)")
         return True
     
-    def save_model(self):
-        """Saves the complete model pipeline."""
+    def to_bundle(self, version: str = "unknown") -> ModelBundle:
+        """Snapshot of the trained pipeline as an immutable ModelBundle."""
+        return ModelBundle(
+            model=self.model,
+            quantile_model=self.quantile_model,
+            preprocessor=self.preprocessor,
+            feature_names=list(self.feature_names or []),
+            feature_encoder=self.feature_encoder,
+            version=version,
+            training_date=self.training_date or "Unknown",
+            training_report=self.training_report
+        )
+    
+    def save_model(self) -> str:
+        """Saves the complete model pipeline as a new registry version."""
+        self.training_date = datetime.now().isoformat()
         model_artifact = {
             'model': self.model,
+            'quantile_model': self.quantile_model,
             'preprocessor': self.preprocessor,
             'feature_names': self.feature_names,
-            'training_date': datetime.now().isoformat()
+            'training_date': self.training_date,
+            'training_report': self.training_report,
+            'category_vocabulary': self.vocabulary.to_dict(),
+            'version': new_version()
         }
         
-        joblib.dump(model_artifact, settings.MODEL_FILE)
-        print(f"Enhanced model saved to {settings.MODEL_FILE}")
+        # Memory-mappable copy for serving, when the model type can be flattened
+        serving_artifact = None
+        flat_model = flatten_model(self.model)
+        if flat_model is not None:
+            serving_artifact = {
+                'model': flat_model,
+                'quantile_model': self.quantile_model,  # Quantile objectives cannot be flattened; stored as-is
+                'preprocessor': self.preprocessor,
+                'feature_names': self.feature_names,
+                'training_date': self.training_date,
+                'training_report': self.training_report
+            }
+        
+        version = self.registry.save(model_artifact, serving_artifact)
+        print(f"Enhanced model saved to {self.registry.artifact_path(version)}")
+        return version
     
     def load_model(self):
-        """Loads the complete model pipeline."""
+        """Loads the current model pipeline and swaps it in atomically."""
         try:
-            artifact = joblib.load(settings.MODEL_FILE)
-            self.model = artifact['model']
-            self.preprocessor = artifact['preprocessor']
-            self.feature_names = artifact['feature_names']
-            print("Enhanced model loaded successfully.")
+            artifact = self.registry.load_current(mmap=settings.MODEL_MMAP)
+            if artifact is None:
+                # Pre-registry deployments wrote a single file
+                artifact = joblib.load(settings.MODEL_FILE)
+                artifact.setdefault('version', "legacy")
+            
+            self.bundle = ModelBundle(
+                model=artifact['model'],
+                quantile_model=artifact.get('quantile_model'),
+                preprocessor=artifact['preprocessor'],
+                feature_names=artifact['feature_names'],
+                feature_encoder=compile_feature_encoder(artifact['preprocessor']),
+                version=artifact['version'],
+                training_date=artifact.get('training_date', "Unknown"),
+                training_report=artifact.get('training_report')
+            )
+            print(f"Enhanced model {self.bundle.version} loaded successfully.")
             return True
         except Exception as e:
             print(f"Error loading model: {e}")
@@ -349,17 +659,45 @@ async def train_enhanced_model():
     
     trainer = EnhancedVehicleRepairModel()
     
-    # Fetch data
-    raw_data = await trainer.fetch_training_data()
-    if not raw_data:
-        print("No data fetched. Training aborted.")
-        return False
-    
-    # Create features
-    df = trainer.create_enhanced_features(raw_data)
-    if df.empty:
-        print("No valid features created. Training aborted.")
-        return False
+    if settings.TRAINING_STORE_ENABLED and parquet_available():
+        # Fetch and engineer only what is new, then train on the whole store
+        store = TrainingStore(settings.TRAINING_STORE_DIR)
+        new_rows = await sync_training_store(store, trainer)
+        
+        if settings.RETRAIN_MODE == "auto":
+            try:
+                current = trainer.registry.load_current()
+            except Exception as e:
+                print(f"Could not load current model for an incremental update: {e}")
+                current = None
+            if current is not None and new_rows.empty:
+                print(f"No new jobs since the last sync. Keeping model {current['version']}.")
+                return True
+            reason = trainer.full_retrain_reason(current, new_rows)
+            if reason is None and trainer.incremental_update(current, new_rows):
+                trainer.save_model()
+                return True
+            print(f"Full retrain: {reason or 'incremental update failed'}")
+        
+        df = store.load(trainer.vocabulary)
+        if df.empty:
+            print("Training store is empty. Training aborted.")
+            return False
+    else:
+        if settings.TRAINING_STORE_ENABLED:
+            print("WARNING: pyarrow is not installed. Training store disabled.")
+        
+        # Fetch data
+        raw_data = await trainer.fetch_training_data()
+        if raw_data is None or len(raw_data) == 0:
+            print("No data fetched. Training aborted.")
+            return False
+        
+        # Create features
+        df = trainer.create_enhanced_features(raw_data)
+        if df.empty:
+            print("No valid features created. Training aborted.")
+            return False
     
     # Train model
     success = trainer.train_model(df)
@@ -368,5 +706,9 @@ async def train_enhanced_model():
     
     return success
 
+def run_training_job() -> bool:
+    """Entry point for the training worker process: fetch, train and save the model."""
+    return asyncio.run(train_enhanced_model())
+
 if __name__ == "__main__":
     asyncio.run(train_enhanced_model())
\ No newline at end of file
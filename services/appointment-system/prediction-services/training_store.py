@@ -0,0 +1,188 @@
+# training_store.py
+
+import glob
+import json
+import os
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from category_codes import CategoryVocabulary
+from job_ingest import ID_COLUMN, frame_from_jobs
+
+STATE_FILE = "state.json"
+# Stored in place of vehicle_age, which is re-derived on load so it ages with the calendar
+MODEL_YEAR_COLUMN = "vehicle_model_year"
+MAX_VEHICLE_AGE = 30
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class TrainingStore:
+    """Local columnar store of engineered training rows, partitioned by month.
+
+    Layout::
+
+        <root>/period=YYYY-MM/part-<timestamp>.parquet
+        <root>/state.json        -> {"last_synced_at": ..., "rows": ..., "category_vocabulary": {...}}
+
+    Each retrain only fetches and engineers jobs that are new since the last
+    sync, so retrain cost tracks new data rather than total history. A job is
+    always stored under the month it started in, so checking for already
+    stored jobs only reads the id column of the months being appended. Rows keep
+    the vehicle's model year rather than its age, which is derived on load.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    # --- State ---
+
+    def _state_path(self) -> str:
+        return os.path.join(self.root, STATE_FILE)
+
+    def read_state(self) -> dict:
+        try:
+            with open(self._state_path()) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _write_state(self, state: dict):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = self._state_path() + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self._state_path())
+
+    def last_synced_at(self) -> Optional[datetime]:
+        value = self.read_state().get('last_synced_at')
+        return datetime.fromisoformat(value) if value else None
+
+    def vocabulary(self) -> CategoryVocabulary:
+        """Category codes the stored rows were engineered with."""
+        return CategoryVocabulary.from_dict(self.read_state().get('category_vocabulary'))
+
+    # --- Data ---
+
+    def partition_files(self, periods: Optional[Iterable[str]] = None) -> List[str]:
+        """Stored part files, optionally only those of the given ``periods`` (YYYY-MM)."""
+        if periods is None:
+            return sorted(glob.glob(os.path.join(self.root, "period=*", "*.parquet")))
+        return sorted(path for period in set(periods)
+                      for path in glob.glob(os.path.join(self.root, f"period={period}", "*.parquet")))
+
+    def known_ids(self, periods: Optional[Iterable[str]] = None) -> set:
+        """Ids of the stored jobs, optionally only those in the given ``periods``."""
+        ids = set()
+        for path in self.partition_files(periods):
+            ids.update(pd.read_parquet(path, columns=[ID_COLUMN])[ID_COLUMN])
+        return ids
+
+    @staticmethod
+    def _periods(start_dates: pd.Series) -> pd.Series:
+        return pd.to_datetime(start_dates, errors='coerce').dt.strftime('%Y-%m')
+
+    def append(self, raw_jobs: Union[pd.DataFrame, List[dict]], engineer) -> pd.DataFrame:
+        """Engineers only the new ``raw_jobs`` (via ``engineer(frame) -> DataFrame``) and appends them.
+
+        ``raw_jobs`` is a frame from fetch_training_data (or a list of job dicts).
+        Jobs whose id is already stored are skipped. Returns the rows written
+        (without the id column).
+        """
+        raw = raw_jobs if isinstance(raw_jobs, pd.DataFrame) else frame_from_jobs(raw_jobs)
+        if raw.empty:
+            return pd.DataFrame()
+        known = self.known_ids(self._periods(raw['startDate']).dropna().unique())
+        raw = raw[~raw[ID_COLUMN].isin(known)].reset_index(drop=True)
+        if raw.empty:
+            return pd.DataFrame()
+
+        engineered = engineer(raw.drop(columns=[ID_COLUMN]))
+        if engineered.empty:
+            return engineered
+
+        # create_enhanced_features filters rows but keeps the positional index of the input
+        engineered = engineered.copy()
+        engineered[ID_COLUMN] = raw.loc[engineered.index, ID_COLUMN].values
+        periods = self._periods(raw.loc[engineered.index, 'startDate'])
+        stored = engineered
+        if 'vehicle_age' in stored.columns:
+            model_years = (datetime.now().year - stored['vehicle_age']).astype(np.float32)
+            stored = stored.assign(vehicle_age=model_years).rename(columns={'vehicle_age': MODEL_YEAR_COLUMN})
+
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        for period, part in stored.groupby(periods.values):
+            period_dir = os.path.join(self.root, f"period={period}")
+            os.makedirs(period_dir, exist_ok=True)
+            path = os.path.join(period_dir, f"part-{stamp}.parquet")
+            part.reset_index(drop=True).to_parquet(path + ".tmp", index=False)
+            os.replace(path + ".tmp", path)
+
+        return engineered.drop(columns=[ID_COLUMN]).reset_index(drop=True)
+
+    def mark_synced(self, synced_at: datetime, vocabulary: Optional[CategoryVocabulary] = None):
+        state = self.read_state()
+        state['last_synced_at'] = synced_at.isoformat()
+        state['rows'] = self.row_count()
+        state.pop('job_ids', None)  # Written by earlier versions; ids are read from the partitions
+        if vocabulary is not None:
+            state['category_vocabulary'] = vocabulary.to_dict()
+        self._write_state(state)
+
+    def row_count(self) -> int:
+        import pyarrow.parquet as pq
+        return sum(pq.ParquetFile(path).metadata.num_rows for path in self.partition_files())
+
+    def load(self, vocabulary: Optional[CategoryVocabulary] = None) -> pd.DataFrame:
+        """All stored rows, de-duplicated by job id (latest wins), without the id column.
+
+        Each file comes back with only the categories it contains; they are
+        re-coded into one shared ``vocabulary`` (the stored one by default) so
+        the concatenated columns stay categorical. ``vehicle_age`` is computed
+        from the stored model year as of today.
+        """
+        files = self.partition_files()
+        if not files:
+            return pd.DataFrame()
+        vocabulary = vocabulary or self.vocabulary()
+        df = pd.concat((self._read_part(path, vocabulary) for path in files), ignore_index=True)
+        df = df.drop_duplicates(subset=ID_COLUMN, keep='last').reset_index(drop=True)
+        return df.drop(columns=[ID_COLUMN])
+
+    @staticmethod
+    def _read_part(path: str, vocabulary: CategoryVocabulary) -> pd.DataFrame:
+        part = pd.read_parquet(path)
+        if MODEL_YEAR_COLUMN in part.columns:
+            ages = (datetime.now().year - part[MODEL_YEAR_COLUMN]).clip(lower=0, upper=MAX_VEHICLE_AGE)
+            part = part.assign(**{MODEL_YEAR_COLUMN: ages.astype(np.float32)})
+            part = part.rename(columns={MODEL_YEAR_COLUMN: 'vehicle_age'})
+        for col in part.columns:
+            if col in vocabulary.categories and isinstance(part[col].dtype, pd.CategoricalDtype):
+                dtype = vocabulary.extend(col, part[col].cat.categories)
+                part[col] = part[col].cat.set_categories(dtype.categories)
+        return part
+
+
+async def sync_training_store(store: TrainingStore, trainer) -> pd.DataFrame:
+    """Fetches finished jobs since the last sync, appends their engineered rows and returns them."""
+    since = store.last_synced_at()
+    synced_at = datetime.now(timezone.utc)
+    raw_data = await trainer.fetch_training_data(since=since)
+    if raw_data is None:
+        return pd.DataFrame()  # Fetch failed; keep the watermark so nothing is skipped
+
+    # New categories are appended, so codes of rows already stored keep their meaning
+    trainer.vocabulary = store.vocabulary()
+    new_rows = store.append(raw_data, trainer.create_enhanced_features)
+    store.mark_synced(synced_at, trainer.vocabulary)
+    print(f"Training store: {len(raw_data)} jobs fetched, {len(new_rows)} new rows stored.")
+    return new_rows
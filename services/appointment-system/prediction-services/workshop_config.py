@@ -0,0 +1,201 @@
+# workshop_config.py
+
+import asyncio
+import json
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional
+
+DEFAULT_REQUIREMENTS_KEY = "__default__"
+
+
+@dataclass(frozen=True)
+class WorkshopConfig:
+    """One immutable version of the workshop capacity configuration.
+
+    Handlers take a single snapshot at the start of a request, so an admin
+    update mid-way through a scheduling loop cannot mix two configurations.
+    """
+    version: int
+    resources: Mapping[str, int]
+    requirements: Mapping[str, Mapping[str, int]]
+    updated_at: str
+
+    @classmethod
+    def build(cls, version: int, resources: Dict[str, int], requirements: Dict[str, Dict[str, int]],
+              updated_at: str) -> "WorkshopConfig":
+        return cls(
+            version=version,
+            resources=MappingProxyType(dict(resources)),
+            requirements=MappingProxyType({name: MappingProxyType(dict(reqs)) for name, reqs in requirements.items()}),
+            updated_at=updated_at
+        )
+
+    def requirements_for(self, repair_type: str) -> Mapping[str, int]:
+        """Resources a repair type occupies (normalized name, with the default fallback)."""
+        return self.requirements.get(repair_type.lower(), self.requirements[DEFAULT_REQUIREMENTS_KEY])
+
+    def resources_dict(self) -> Dict[str, int]:
+        return dict(self.resources)
+
+    def requirements_dict(self) -> Dict[str, Dict[str, int]]:
+        return {name: dict(reqs) for name, reqs in self.requirements.items()}
+
+
+class WorkshopConfigStore:
+    """Versioned workshop configuration in a SQLite file shared by all workers.
+
+    Every change appends a new version row. Each worker keeps the latest version
+    in memory and polls ``MAX(version)`` in the background, so an update made
+    through any worker reaches the others within ``poll_seconds``. The first
+    open seeds version 1 from the defaults in settings.
+    """
+
+    def __init__(self, path: str, default_resources: Dict[str, int],
+                 default_requirements: Dict[str, Dict[str, int]], poll_seconds: float = 2.0):
+        self.path = path
+        self.default_resources = dict(default_resources)
+        self.default_requirements = {name: dict(reqs) for name, reqs in default_requirements.items()}
+        self.poll_seconds = poll_seconds
+        self._config: Optional[WorkshopConfig] = None
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS config_versions (
+                version INTEGER PRIMARY KEY,
+                resources TEXT NOT NULL,
+                requirements TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        return conn
+
+    @staticmethod
+    def _row_to_config(row) -> WorkshopConfig:
+        version, resources, requirements, updated_at = row
+        return WorkshopConfig.build(version, json.loads(resources), json.loads(requirements), updated_at)
+
+    def _latest(self, conn: sqlite3.Connection) -> Optional[WorkshopConfig]:
+        row = conn.execute(
+            "SELECT version, resources, requirements, updated_at FROM config_versions ORDER BY version DESC LIMIT 1"
+        ).fetchone()
+        return self._row_to_config(row) if row else None
+
+    # --- Reads ---
+
+    def current(self) -> WorkshopConfig:
+        """The latest known configuration (loaded, or seeded, on first use)."""
+        config = self._config
+        if config is None:
+            with self._lock:
+                if self._config is None:
+                    self._config = self._load_or_seed()
+                config = self._config
+        return config
+
+    def _load_or_seed(self) -> WorkshopConfig:
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            config = self._latest(conn)
+            if config is None:
+                config = self._insert(conn, 1, self.default_resources, self.default_requirements)
+            conn.execute("COMMIT")
+            return config
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def reload_if_changed(self) -> bool:
+        """Picks up versions written by other workers. Returns True if the configuration changed."""
+        conn = self._connect()
+        try:
+            latest_version = conn.execute("SELECT MAX(version) FROM config_versions").fetchone()[0]
+            if latest_version is None or (self._config is not None and latest_version == self._config.version):
+                return False
+            config = self._latest(conn)
+        finally:
+            conn.close()
+        with self._lock:
+            if self._config is None or config.version > self._config.version:
+                self._config = config
+                print(f"Workshop configuration version {config.version} loaded.")
+                return True
+        return False
+
+    def history(self, limit: int = 20) -> List[WorkshopConfig]:
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT version, resources, requirements, updated_at FROM config_versions "
+                "ORDER BY version DESC LIMIT ?", (limit,)
+            ).fetchall()
+        finally:
+            conn.close()
+        return [self._row_to_config(row) for row in rows]
+
+    # --- Writes ---
+
+    def _insert(self, conn, version, resources, requirements) -> WorkshopConfig:
+        updated_at = datetime.now(timezone.utc).isoformat()
+        conn.execute(
+            "INSERT INTO config_versions (version, resources, requirements, updated_at) VALUES (?, ?, ?, ?)",
+            (version, json.dumps(resources, sort_keys=True), json.dumps(requirements, sort_keys=True), updated_at)
+        )
+        return WorkshopConfig.build(version, resources, requirements, updated_at)
+
+    def update(self, resources: Optional[Dict[str, int]] = None,
+               requirements: Optional[Dict[str, Dict[str, int]]] = None) -> WorkshopConfig:
+        """Merges the given entries into the latest version and stores the result as a new version."""
+        self.current()
+        conn = self._connect()
+        try:
+            # IMMEDIATE takes the write lock first, so concurrent updates from other workers serialize
+            conn.execute("BEGIN IMMEDIATE")
+            latest = self._latest(conn)
+            new_resources = dict(latest.resources, **(resources or {}))
+            new_requirements = latest.requirements_dict()
+            new_requirements.update({name: dict(reqs) for name, reqs in (requirements or {}).items()})
+            config = self._insert(conn, latest.version + 1, new_resources, new_requirements)
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        with self._lock:
+            self._config = config
+        return config
+
+    # --- Propagation ---
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                self.reload_if_changed()
+            except Exception as e:
+                print(f"WARNING: Could not check workshop configuration: {e}")
+
+    def start(self):
+        self.current()
+        self._task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None